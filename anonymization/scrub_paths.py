@@ -3,15 +3,34 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import hmac
+import json
 import os
 import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Deque, Dict, Iterator, Optional, Tuple
 
 PATTERNS = [
     (re.compile(r"/[\w\-_/]+"), "/anon/path"),
     (re.compile(r"[A-Za-z0-9_.-]+@[A-Za-z0-9_.-]+"), "anon@example.com"),
     (re.compile(r"hostname=[^,\s]+"), "hostname=anon"),
 ]
+# Keyed replacements, aligned with PATTERNS: (kind, format for the pseudonym).
+PSEUDONYMS = [
+    ("path", "/anon/{}"),
+    ("email", "{}@example.com"),
+    ("host", "hostname={}"),
+]
+KEY_ENV = "DEEPPARSE_SCRUB_KEY"
+DEFAULT_CHUNK_SIZE = 4 << 20
+
+# Per-process scrubber installed by the pool initializer.
+_WORKER: Optional["Scrubber"] = None
 
 
 def scrub(text: str) -> str:
@@ -21,17 +40,201 @@ def scrub(text: str) -> str:
     return result
 
 
+class Scrubber:
+    """Apply :data:`PATTERNS` with fixed or keyed replacements.
+
+    With a ``key`` every match becomes ``<kind>-<HMAC-SHA256 prefix>``, so the
+    same path or email maps to the same token in every chunk, worker and run
+    that uses the key, without any coordination between processes.  The key
+    holder can rebuild the mapping; nobody else can reverse it.  When
+    ``record`` is set the token -> original pairs seen are collected for
+    :meth:`take_mapping`.
+    """
+
+    def __init__(
+        self,
+        key: Optional[bytes] = None,
+        digest_chars: int = 12,
+        record: bool = False,
+        memo_size: int = 1 << 16,
+    ):
+        self.key = key
+        self.digest_chars = digest_chars
+        self.record = record
+        self.memo_size = memo_size
+        self._mapping: Dict[str, str] = {}
+        self._memo: Dict[Tuple[str, str], str] = {}
+
+    def __getstate__(self) -> Dict[str, object]:
+        return dict(self.__dict__, _memo={}, _mapping={})
+
+    def pseudonym(self, kind: str, value: str) -> str:
+        token = self._memo.get((kind, value))
+        if token is None:
+            assert self.key is not None
+            digest = hmac.new(self.key, f"{kind}\0{value}".encode("utf-8"), hashlib.sha256).hexdigest()
+            token = f"{kind}-{digest[: self.digest_chars]}"
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[(kind, value)] = token
+        if self.record:
+            self._mapping[token] = value
+        return token
+
+    def scrub(self, text: str) -> str:
+        if self.key is None:
+            return scrub(text)
+        result = text
+        for (pattern, _), (kind, template) in zip(PATTERNS, PSEUDONYMS):
+            result = pattern.sub(lambda match: template.format(self.pseudonym(kind, match.group(0))), result)
+        return result
+
+    def take_mapping(self) -> Dict[str, str]:
+        mapping, self._mapping = self._mapping, {}
+        return mapping
+
+
+@dataclass
+class ScrubReport:
+    bytes_in: int = 0
+    bytes_out: int = 0
+    lines: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    mapping_size: int = 0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes_in / (1 << 20) / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.lines} lines, {self.bytes_in / (1 << 20):.1f} MiB in {self.chunks} chunks "
+            f"in {self.seconds:.2f}s ({self.megabytes_per_second:.1f} MiB/s)"
+        )
+
+
+def iter_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield roughly ``chunk_size`` byte blocks of ``path`` that end on a line boundary.
+
+    None of :data:`PATTERNS` can match across a newline, so scrubbing chunks
+    independently gives the same result as scrubbing the whole file.
+    """
+
+    with path.open("rb") as fh:
+        while True:
+            block = fh.read(chunk_size)
+            if not block:
+                return
+            if not block.endswith(b"\n"):
+                block += fh.readline()
+            yield block
+
+
+def _scrub_block(block: bytes) -> Tuple[bytes, int, Dict[str, str]]:
+    assert _WORKER is not None, "scrub worker started without a scrubber"
+    text = _WORKER.scrub(block.decode("utf-8"))
+    return text.encode("utf-8"), block.count(b"\n"), _WORKER.take_mapping()
+
+
+def _install_worker(scrubber: Optional[Scrubber]) -> None:
+    global _WORKER
+    _WORKER = scrubber
+
+
+def scrub_file(
+    input_path: Path,
+    output_path: Path,
+    scrubber: Optional[Scrubber] = None,
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mapping: Optional[Dict[str, str]] = None,
+) -> ScrubReport:
+    """Stream ``input_path`` through ``scrubber`` into ``output_path``.
+
+    Chunks are scrubbed by up to ``workers`` processes and written in input
+    order; at most ``2 * workers`` chunks are in flight, so memory stays
+    bounded by the chunk size rather than the file size.  When ``mapping``
+    is given, token -> original pairs recorded by a keyed scrubber are
+    merged into it.
+    """
+
+    scrubber = scrubber or Scrubber()
+    scrubber.record = mapping is not None and scrubber.key is not None
+    report = ScrubReport()
+    started = time.perf_counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+
+    def consume(result: Tuple[bytes, int, Dict[str, str]], size: int) -> None:
+        data, lines, seen = result
+        out.write(data)
+        report.bytes_in += size
+        report.bytes_out += len(data)
+        report.lines += lines
+        report.chunks += 1
+        if mapping is not None:
+            mapping.update(seen)
+
+    with tmp_path.open("wb") as out:
+        if workers <= 1:
+            _install_worker(scrubber)
+            try:
+                for block in iter_chunks(input_path, chunk_size):
+                    consume(_scrub_block(block), len(block))
+            finally:
+                _install_worker(None)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_install_worker, initargs=(scrubber,)
+            ) as pool:
+                pending: Deque[Tuple[Future, int]] = deque()
+                for block in iter_chunks(input_path, chunk_size):
+                    pending.append((pool.submit(_scrub_block, block), len(block)))
+                    if len(pending) >= 2 * workers:
+                        future, size = pending.popleft()
+                        consume(future.result(), size)
+                while pending:
+                    future, size = pending.popleft()
+                    consume(future.result(), size)
+    os.replace(tmp_path, output_path)
+    report.seconds = time.perf_counter() - started
+    report.mapping_size = len(mapping) if mapping is not None else 0
+    return report
+
+
+def _load_key(key_file: Optional[Path]) -> Optional[bytes]:
+    if key_file is not None:
+        return key_file.read_bytes().strip()
+    value = os.environ.get(KEY_ENV)
+    return value.encode("utf-8") if value else None
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Scrub identifiable paths from files")
     parser.add_argument("input", type=Path)
     parser.add_argument("output", type=Path)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 scrubs in-process).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Bytes per chunk.")
+    parser.add_argument(
+        "--key-file", type=Path, default=None, help=f"Pseudonymisation key (default: ${KEY_ENV})."
+    )
+    parser.add_argument("--mapping", type=Path, default=None, help="JSON token -> original map to extend.")
     args = parser.parse_args()
 
-    content = args.input.read_text(encoding="utf-8")
-    scrubbed = scrub(content)
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(scrubbed, encoding="utf-8")
-    print(f"Scrubbed content written to {args.output}")
+    key = _load_key(args.key_file)
+    if args.mapping is not None and key is None:
+        parser.error(f"--mapping needs a key from --key-file or ${KEY_ENV}")
+    mapping: Optional[Dict[str, str]] = None
+    if args.mapping is not None:
+        mapping = json.loads(args.mapping.read_text(encoding="utf-8")) if args.mapping.exists() else {}
+    report = scrub_file(
+        args.input, args.output, Scrubber(key), workers=args.workers, chunk_size=args.chunk_size, mapping=mapping
+    )
+    if mapping is not None:
+        args.mapping.parent.mkdir(parents=True, exist_ok=True)
+        args.mapping.write_text(json.dumps(mapping, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"Scrubbed content written to {args.output}: {report.summary()}")
 
 
 if __name__ == "__main__":  # pragma: no cover
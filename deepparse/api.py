@@ -7,13 +7,14 @@ from typing import Iterable, List, Sequence
 from .drain.drain_engine import DrainEngine
 from .masks_types import Mask
 from .synth.r1_deepseek_stub import synthesize_offline
+from .synth.selection import select_bundle
 from .utils.regex_library import validate_regexes
-from .utils.sampling import deterministic_sample
+from .utils.sampling import deterministic_sample, held_out_sample
 
 try:  # Optional heavy dependency
-    from .synth.hf_deepseek_r1 import synthesize_hf
+    from .synth.hf_deepseek_r1 import synthesize_hf_candidates
 except Exception:  # pragma: no cover - optional path
-    synthesize_hf = None
+    synthesize_hf_candidates = None
 
 
 def _ensure_mask_objects(masks: Iterable[Mask | dict[str, str]]) -> List[Mask]:
@@ -36,13 +37,17 @@ def synth_masks(
     max_length: int = 512,
     strict: bool = False,
     model_name: str | None = None,
+    num_candidates: int = 1,
+    workers: int = 0,
 ) -> List[dict[str, str]]:
     """Synthesise regex masks from raw log lines.
 
     Parameters mirror the usage snippet provided in the paper.  The function is
     deterministic because sampling uses :func:`deterministic_sample` and the
     offline synthesiser is rule based.  When ``mode="hf"`` it falls back to the
-    optional Hugging Face pipeline with the requested generation controls.
+    optional Hugging Face pipeline with the requested generation controls;
+    ``num_candidates > 1`` returns that many beams and keeps the bundle that
+    scores best on a held-out sample (scored by up to ``workers`` processes).
     """
 
     if not logs:
@@ -52,15 +57,20 @@ def synth_masks(
     if mode == "offline":
         masks = synthesize_offline(sample)
     elif mode == "hf":
-        if synthesize_hf is None:  # pragma: no cover - optional dependency
+        if synthesize_hf_candidates is None:  # pragma: no cover - optional dependency
             raise RuntimeError("Hugging Face mode requested but transformers is unavailable")
-        masks = synthesize_hf(
+        bundles = synthesize_hf_candidates(
             sample,
             model_name=model_name or "deepseek-ai/deepseek-coder-1.3b-base",
             temperature=temperature,
             num_beams=num_beams,
             max_length=max_length,
+            num_candidates=num_candidates,
         )
+        masks = bundles[0]
+        if len(bundles) > 1:
+            held_out = held_out_sample(logs, sample_size, exclude=sample) or sample
+            masks, _ = select_bundle(bundles, held_out, workers=workers, strict=strict)
     else:
         raise ValueError(f"Unsupported synthesis mode: {mode}")
 
@@ -3,8 +3,9 @@ from __future__ import annotations
 
 import glob
 import json
+import os
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Dict, Iterable, Optional
 
 import click
 
@@ -17,6 +18,7 @@ from .synth import synthesize_masks
 from .utils.yaml_loader import load_yaml
 
 LOGGER = get_logger(__name__)
+DEFAULT_BENCH_HISTORY = "artifacts/outputs/bench_history.jsonl"
 
 
 @click.group()
@@ -37,11 +39,32 @@ def _load_base_config(path: str) -> dict:
 @click.option("--config", type=click.Path(), required=False)
 @click.option("--k", type=int, default=None)
 @click.option("--out", type=click.Path(), required=False)
-@click.option("--mode", type=click.Choice(["offline", "hf"]), default="offline")
+@click.option("--mode", type=click.Choice(["offline", "hf", "http"]), default="offline")
 @click.option("--strict", is_flag=True, default=False)
 @click.option("--seed", type=int, default=None)
+@click.option("--endpoint", default=None, help="OpenAI-compatible base URL for --mode http.")
+@click.option("--model", "model_name", default=None, help="Model name sent to the endpoint.")
+@click.option("--concurrency", type=int, default=None, help="Concurrent requests for --mode http.")
+@click.option("--candidates", type=int, default=1, show_default=True, help="Candidate bundles to score (LLM modes).")
+@click.option("--workers", type=int, default=None, help="Processes scoring candidates (default: config workers).")
+@click.option("--prompt-tokens", type=int, default=None, help="Prompt token budget (default: synth_prompt_tokens).")
 @click.pass_context
-def synth(ctx: click.Context, dataset: Optional[str], config: Optional[str], k: Optional[int], out: Optional[str], mode: str, strict: bool, seed: Optional[int]) -> None:
+def synth(
+    ctx: click.Context,
+    dataset: Optional[str],
+    config: Optional[str],
+    k: Optional[int],
+    out: Optional[str],
+    mode: str,
+    strict: bool,
+    seed: Optional[int],
+    endpoint: Optional[str],
+    model_name: Optional[str],
+    concurrency: Optional[int],
+    candidates: int,
+    workers: Optional[int],
+    prompt_tokens: Optional[int],
+) -> None:
     base = _load_base_config("configs/default.yaml")
     if config:
         conf_data = load_yaml(config)
@@ -57,21 +80,154 @@ def synth(ctx: click.Context, dataset: Optional[str], config: Optional[str], k:
     set_global_seed(seed)
     paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
     k = k or base.get("k", 50)
-    for name in datasets:
-        dataset_obj = load_dataset(name, paths)
+    selection = {"candidates": candidates, "workers": base.get("workers", 0) if workers is None else workers}
+    prompt_tokens = prompt_tokens or int(base.get("synth_prompt_tokens", 2048))
+    if mode != "http":
+        for name in datasets:
+            dataset_obj = load_dataset(name, paths)
+            out_path = Path(out or paths.mask_dir / f"{name}.json")
+            synthesize_masks(
+                dataset_obj, k, out_path, mode=mode, strict=strict, prompt_tokens=prompt_tokens, **selection
+            )
+        return
+
+    from .synth.http_backend import ENDPOINT_ENV, HttpSynthClient, HttpSynthConfig, run_concurrently
+
+    endpoint = endpoint or base.get("synth_endpoint") or os.environ.get(ENDPOINT_ENV)
+    if not endpoint:
+        raise click.ClickException(f"--mode http needs --endpoint, synth_endpoint or ${ENDPOINT_ENV}")
+    http_config = HttpSynthConfig(
+        endpoint=endpoint,
+        model=model_name or base.get("synth_model", "deepseek-r1"),
+        timeout=float(base.get("synth_timeout", 60.0)),
+        max_retries=int(base.get("synth_retries", 3)),
+        concurrency=concurrency or int(base.get("synth_concurrency", 4)),
+        cache_dir=Path(base["cache_dir"]) / "synth" if base.get("cache_dir") else None,
+        prompt_tokens=prompt_tokens,
+    )
+
+    def run_one(name: str) -> None:
         out_path = Path(out or paths.mask_dir / f"{name}.json")
-        synthesize_masks(dataset_obj, k, out_path, mode=mode, strict=strict)
+        synthesize_masks(
+            load_dataset(name, paths), k, out_path, mode=mode, strict=strict, client=client, **selection
+        )
+
+    with HttpSynthClient(http_config) as client:
+        try:
+            run_concurrently(datasets, run_one, http_config.concurrency)
+        except (RuntimeError, ValueError) as exc:
+            raise click.ClickException(str(exc)) from exc
+        click.echo(
+            f"Synthesised masks for {len(datasets)} datasets "
+            f"({client.requests} requests, {client.cache_hits} cache hits, "
+            f"~{client.prompt_tokens_saved} prompt tokens saved by packing)"
+        )
+
+
+@cli.command()
+@click.option("--name", default="Synthetic", show_default=True, help="Dataset name under dataset_dir.")
+@click.option("--lines", type=int, default=10000, show_default=True)
+@click.option("--templates", type=int, default=50, show_default=True)
+@click.option("--min-length", type=int, default=3, show_default=True)
+@click.option("--max-length", type=int, default=24, show_default=True)
+@click.option("--length-mean", type=float, default=9.0, show_default=True)
+@click.option("--length-stddev", type=float, default=3.0, show_default=True)
+@click.option("--param-fraction", type=float, default=0.3, show_default=True)
+@click.option("--cardinality", type=int, default=1000, show_default=True, help="Distinct values per slot.")
+@click.option("--zipf", type=float, default=1.1, show_default=True, help="Zipf exponent (0 = uniform).")
+@click.option("--shared-bucket", is_flag=True, default=False, help="Force every template into one Drain bucket.")
+@click.option("--structured/--no-structured", default=True, help="Write per-line ground truth CSV.")
+@click.option("--seed", type=int, default=None)
+@click.option("--config", type=click.Path(), default="configs/default.yaml")
+@click.pass_context
+def generate(
+    ctx: click.Context,
+    name: str,
+    lines: int,
+    templates: int,
+    min_length: int,
+    max_length: int,
+    length_mean: float,
+    length_stddev: float,
+    param_fraction: float,
+    cardinality: int,
+    zipf: float,
+    shared_bucket: bool,
+    structured: bool,
+    seed: Optional[int],
+    config: str,
+) -> None:
+    from .synthetic_corpus import CorpusSpec, generate_corpus
+
+    base = _load_base_config(config)
+    spec = CorpusSpec(
+        name=name,
+        lines=lines,
+        templates=templates,
+        min_length=min_length,
+        max_length=max_length,
+        length_mean=length_mean,
+        length_stddev=length_stddev,
+        param_fraction=param_fraction,
+        param_cardinality=cardinality,
+        zipf_s=zipf,
+        shared_bucket=shared_bucket,
+        seed=resolve_seed(seed or base.get("seed")),
+    )
+    try:
+        root = generate_corpus(spec, Path(base["dataset_dir"]), structured=structured)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    click.echo(f"Wrote {lines} lines from {templates} templates to {root}")
+
+
+def _write_parsed_rows(fh, logs: Iterable[str], templates: Iterable[str]) -> None:
+    for log, template in zip(logs, templates):
+        fh.write(f"\"{log}\",\"{template}\"\n")
 
 
 @cli.command()
 @click.option("--dataset", required=True, type=str)
 @click.option("--output", type=click.Path(), required=False)
 @click.option("--seed", type=int, default=None)
+@click.option("--max-clusters", type=int, default=None)
+@click.option("--max-clusters-per-bucket", type=int, default=None)
+@click.option("--eviction-policy", type=click.Choice(["lru", "lfu"]), default="lru")
+@click.option("--follow", is_flag=True, default=False, help="Tail growing inputs instead of parsing once.")
+@click.option("--input", "inputs", multiple=True, type=click.Path(), help="Files to follow (default: raw.log).")
+@click.option("--checkpoint", type=click.Path(), required=False)
+@click.option("--batch-size", type=int, default=1000)
+@click.option("--poll-interval", type=float, default=1.0)
+@click.option("--checkpoint-interval", type=float, default=30.0)
+@click.option("--weighted", is_flag=True, default=False, help="Parse '<count> <line>' records from counts.log.")
+@click.option("--compact-bucket-size", type=int, default=None, help="Compact a bucket once it holds this many clusters.")
+@click.option("--compact-every", type=int, default=None, help="Compact all buckets every N lines.")
+@click.option("--compaction-max-diff", type=int, default=1, show_default=True, help="Positions merged clusters may differ in.")
 @click.pass_context
-def parse(ctx: click.Context, dataset: str, output: Optional[str], seed: Optional[int]) -> None:
+def parse(
+    ctx: click.Context,
+    dataset: str,
+    output: Optional[str],
+    seed: Optional[int],
+    max_clusters: Optional[int],
+    max_clusters_per_bucket: Optional[int],
+    eviction_policy: str,
+    follow: bool,
+    inputs: Iterable[str],
+    checkpoint: Optional[str],
+    batch_size: int,
+    poll_interval: float,
+    checkpoint_interval: float,
+    weighted: bool,
+    compact_bucket_size: Optional[int],
+    compact_every: Optional[int],
+    compaction_max_diff: int,
+) -> None:
+    if weighted and follow:
+        raise click.UsageError("--weighted cannot be combined with --follow")
     base = _load_base_config("configs/default.yaml")
     paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
-    dataset_obj = load_dataset(dataset, paths)
+    dataset_obj = None if follow or weighted else load_dataset(dataset, paths)
     mask_path = paths.mask_dir / f"{dataset}.json"
     if not mask_path.exists():
         raise click.ClickException(f"Mask file missing at {mask_path}")
@@ -79,17 +235,329 @@ def parse(ctx: click.Context, dataset: str, output: Optional[str], seed: Optiona
     masks = [Mask(**entry) for entry in masks_data]
     from .drain.drain_engine import DrainEngine
 
-    engine = DrainEngine(masks=masks)
-    templates = engine.parse(dataset_obj.logs)
+    def make_engine() -> DrainEngine:
+        return DrainEngine(
+            masks=masks,
+            max_clusters=max_clusters,
+            max_clusters_per_bucket=max_clusters_per_bucket,
+            eviction_policy=eviction_policy,
+            compact_bucket_size=compact_bucket_size,
+            compact_every=compact_every,
+            compaction_max_diff=compaction_max_diff,
+        )
+
     output_path = Path(output or paths.output_dir / f"{dataset}_parsed.csv")
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    if follow:
+        from .follow import LogFollower
+
+        follow_paths = [Path(path) for path in inputs] or [paths.dataset_dir / dataset / "raw.log"]
+        checkpoint_path = Path(checkpoint or paths.output_dir / f"{dataset}_follow_checkpoint.json")
+        is_new = not output_path.exists() or output_path.stat().st_size == 0
+        with output_path.open("a", encoding="utf-8") as fh:
+            if is_new:
+                fh.write("log,template\n")
+
+            def on_batch(path: str, logs, templates) -> None:
+                _write_parsed_rows(fh, logs, templates)
+                fh.flush()
+
+            follower = LogFollower.resume(
+                follow_paths,
+                checkpoint_path,
+                make_engine,
+                batch_size=batch_size,
+                checkpoint_interval=checkpoint_interval,
+                on_batch=on_batch,
+            )
+            click.echo(f"Following {', '.join(map(str, follow_paths))}; appending to {output_path}")
+            follower.run(poll_interval=poll_interval)
+        return
+
+    engine = make_engine()
+    if weighted:
+        from .dataset_loader import load_weighted_dataset
+
+        try:
+            weighted_obj = load_weighted_dataset(dataset, paths)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        templates = engine.parse_weighted(weighted_obj.pairs())
+        with output_path.open("w", encoding="utf-8") as fh:
+            fh.write("count,log,template\n")
+            for count, log, template in zip(weighted_obj.counts, weighted_obj.logs, templates):
+                fh.write(f"{count},\"{log}\",\"{template}\"\n")
+        click.echo(
+            f"Wrote {len(templates)} weighted rows ({weighted_obj.total} lines) to {output_path}"
+        )
+        return
+    templates = engine.parse(dataset_obj.logs)
+    if engine.eviction_stats.evicted:
+        LOGGER.info("Eviction statistics for %s: %s", dataset, engine.eviction_stats.to_dict())
+    if engine.compaction_stats.merged:
+        LOGGER.info("Compaction statistics for %s: %s", dataset, engine.compaction_stats.to_dict())
     with output_path.open("w", encoding="utf-8") as fh:
         fh.write("log,template\n")
-        for log, template in zip(dataset_obj.logs, templates):
-            fh.write(f"\"{log}\",\"{template}\"\n")
+        _write_parsed_rows(fh, dataset_obj.logs, templates)
     click.echo(f"Wrote parsed templates to {output_path}")
 
 
+@cli.command(name="parse-pool")
+@click.option("--dataset", "datasets", multiple=True, required=True, help="Source dataset (repeatable).")
+@click.option("--max-resident", type=int, default=64, show_default=True, help="Engines kept in memory.")
+@click.option("--max-resident-clusters", type=int, default=None, help="Clusters kept in memory in total.")
+@click.option("--spill-dir", type=click.Path(), default=None, help="Idle engine snapshots (default: cache_dir/pool).")
+@click.option("--max-clusters", type=int, default=None)
+@click.option("--eviction-policy", type=click.Choice(["lru", "lfu"]), default="lru")
+@click.pass_context
+def parse_pool(
+    ctx: click.Context,
+    datasets: Iterable[str],
+    max_resident: int,
+    max_resident_clusters: Optional[int],
+    spill_dir: Optional[str],
+    max_clusters: Optional[int],
+    eviction_policy: str,
+) -> None:
+    from itertools import zip_longest
+
+    from .drain.pool import EnginePool
+
+    base = _load_base_config("configs/default.yaml")
+    paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
+    masks: Dict[str, list] = {}
+    for name in datasets:
+        mask_path = paths.mask_dir / f"{name}.json"
+        if not mask_path.exists():
+            raise click.ClickException(f"Mask file missing at {mask_path}")
+        masks[name] = [Mask(**entry) for entry in json.loads(mask_path.read_text(encoding="utf-8"))]
+    logs = {name: load_dataset(name, paths).logs for name in masks}
+    try:
+        pool = EnginePool(
+            masks.__getitem__,
+            Path(spill_dir or Path(base.get("cache_dir", paths.output_dir)) / "pool"),
+            max_resident=max_resident,
+            max_resident_clusters=max_resident_clusters,
+            engine_options={"max_clusters": max_clusters, "eviction_policy": eviction_policy},
+        )
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+    # Interleave the sources line by line, as a shared collector would deliver them.
+    templates: Dict[str, list] = {name: [] for name in masks}
+    try:
+        for row in zip_longest(*logs.values()):
+            for name, line in zip(logs, row):
+                if line is not None:
+                    templates[name].append(pool.add_log(name, line).template_str())
+    finally:
+        pool.discard_spilled()
+    for name, parsed in templates.items():
+        output_path = paths.output_dir / f"{name}_parsed.csv"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w", encoding="utf-8") as fh:
+            fh.write("log,template\n")
+            _write_parsed_rows(fh, logs[name], parsed)
+    click.echo(
+        f"Parsed {len(masks)} sources with {len(pool.appliers)} compiled mask bundles "
+        f"({pool.stats.to_dict()}); wrote {paths.output_dir}/<dataset>_parsed.csv"
+    )
+
+
+@cli.command()
+@click.option("--dataset", "datasets", multiple=True, help="Dataset to catalog (default: every directory).")
+@click.option("--verify", is_flag=True, default=False, help="Rehash even when the manifest looks current.")
+@click.option("--config", type=click.Path(), default="configs/default.yaml")
+@click.pass_context
+def catalog(ctx: click.Context, datasets: Iterable[str], verify: bool, config: str) -> None:
+    from .dataset_catalog import RAW_FILE, DatasetCatalog
+
+    base = _load_base_config(config)
+    paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
+    names = list(datasets) or sorted(p.name for p in paths.dataset_dir.iterdir() if (p / RAW_FILE).exists())
+    dataset_catalog = DatasetCatalog(paths)
+    for name in names:
+        previous = dataset_catalog.read_manifest(name)
+        try:
+            manifest = dataset_catalog.manifest(name, verify=verify)
+        except FileNotFoundError as exc:
+            raise click.ClickException(str(exc)) from exc
+        if previous is None or (previous.bytes, previous.mtime_ns) != (manifest.bytes, manifest.mtime_ns):
+            status = "refreshed"
+        elif previous.checksum != manifest.checksum:
+            status = "CHANGED"
+        else:
+            status = "verified" if verify else "trusted"
+        click.echo(f"{name:<16} {manifest.logs:>10} logs {manifest.bytes:>12} bytes  {manifest.checksum[:12]}  {status}")
+
+
+@cli.command(name="index")
+@click.option("--dataset", required=True, type=str)
+@click.option("--input", "input_path", type=click.Path(), required=False, help="Log file (default: raw.log).")
+@click.option("--out", type=click.Path(), required=False)
+@click.pass_context
+def index_cmd(ctx: click.Context, dataset: str, input_path: Optional[str], out: Optional[str]) -> None:
+    from .drain.drain_engine import DrainEngine
+    from .index import build_template_index
+
+    base = _load_base_config("configs/default.yaml")
+    paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
+    mask_path = paths.mask_dir / f"{dataset}.json"
+    if not mask_path.exists():
+        raise click.ClickException(f"Mask file missing at {mask_path}")
+    masks = [Mask(**entry) for entry in json.loads(mask_path.read_text(encoding="utf-8"))]
+    log_path = Path(input_path or paths.dataset_dir / dataset / "raw.log")
+    out_dir = Path(out or paths.output_dir / f"{dataset}_index")
+    with build_template_index(log_path, DrainEngine(masks=masks), out_dir) as index:
+        click.echo(f"Indexed {len(index.templates())} templates to {out_dir}")
+
+
+@cli.command()
+@click.option("--index", "index_dir", required=True, type=click.Path())
+@click.option("--template-id", type=int, default=None)
+@click.option("--limit", type=int, default=20)
+@click.option("--hourly", is_flag=True, default=False)
+@click.pass_context
+def query(ctx: click.Context, index_dir: str, template_id: Optional[int], limit: int, hourly: bool) -> None:
+    from .index import TemplateIndex
+
+    with TemplateIndex.open(Path(index_dir)) as index:
+        if template_id is None:
+            for entry in sorted(index.templates(), key=lambda item: -item.count)[:limit]:
+                click.echo(f"{entry.template_id}\t{entry.count}\t{entry.template}")
+            return
+        try:
+            entry = index.entry(template_id)
+        except KeyError as exc:
+            raise click.ClickException(exc.args[0]) from exc
+        click.echo(f"# template {entry.template_id} ({entry.count} lines): {entry.template}")
+        if hourly:
+            for hour, count in sorted(index.hourly_counts(template_id).items()):
+                click.echo(f"{hour}\t{count}")
+            return
+        for line_no, line in zip(index.line_numbers(template_id), index.read_lines(template_id, limit)):
+            click.echo(f"{line_no}\t{line}")
+
+
+@cli.command()
+@click.option("--dataset", required=True, type=str)
+@click.option("--out", type=click.Path(), required=False)
+@click.pass_context
+def extract(ctx: click.Context, dataset: str, out: Optional[str]) -> None:
+    from .drain.drain_engine import DrainEngine
+    from .extraction import extract_parameters
+
+    base = _load_base_config("configs/default.yaml")
+    paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
+    dataset_obj = load_dataset(dataset, paths)
+    mask_path = paths.mask_dir / f"{dataset}.json"
+    if not mask_path.exists():
+        raise click.ClickException(f"Mask file missing at {mask_path}")
+    masks = [Mask(**entry) for entry in json.loads(mask_path.read_text(encoding="utf-8"))]
+    out_dir = Path(out or paths.output_dir / f"{dataset}_params")
+    store = extract_parameters(dataset_obj.logs, DrainEngine(masks=masks), out_dir)
+    click.echo(
+        f"Wrote parameters for {len(store.template_ids())} templates to {out_dir} "
+        f"({store.unaligned} unaligned lines)"
+    )
+
+
+@cli.command()
+@click.option("--dataset", required=True, type=str)
+@click.option("--state", type=click.Path(exists=True), default=None, help="Engine state or follow checkpoint JSON.")
+@click.option("--learn", type=int, default=2000, show_default=True, help="Lines to learn from without --state.")
+@click.option("--workers", type=int, default=None, help="Worker processes (default: config workers).")
+@click.option("--output", type=click.Path(), required=False)
+@click.pass_context
+def match(
+    ctx: click.Context,
+    dataset: str,
+    state: Optional[str],
+    learn: int,
+    workers: Optional[int],
+    output: Optional[str],
+) -> None:
+    from .drain.drain_engine import DrainEngine
+    from .drain.matcher import TemplateMatcher, match_lines
+
+    base = _load_base_config("configs/default.yaml")
+    paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
+    dataset_obj = load_dataset(dataset, paths)
+    if state:
+        payload = json.loads(Path(state).read_text(encoding="utf-8"))
+        engine = DrainEngine.from_state(payload.get("engine", payload))
+    else:
+        mask_path = paths.mask_dir / f"{dataset}.json"
+        if not mask_path.exists():
+            raise click.ClickException(f"Mask file missing at {mask_path}")
+        engine = DrainEngine(masks=[Mask(**entry) for entry in json.loads(mask_path.read_text(encoding="utf-8"))])
+        engine.parse(dataset_obj.logs[:learn])
+    matcher = TemplateMatcher.from_engine(engine)
+    workers = base.get("workers", 0) if workers is None else workers
+    matches, report = match_lines(matcher, dataset_obj.logs, workers=workers)
+    output_path = Path(output or paths.output_dir / f"{dataset}_matched.csv")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8") as fh:
+        fh.write("log,template\n")
+        templates = ("" if tid is None else matcher.template(tid) for tid in matches)
+        _write_parsed_rows(fh, dataset_obj.logs, templates)
+    click.echo(
+        f"Matched {report.matched}/{report.lines} lines against {len(matcher)} templates "
+        f"({report.unmatched_fraction:.2%} unmatched); wrote {output_path}"
+    )
+
+
+@cli.command()
+@click.option("--dataset", required=True, type=str)
+@click.option("--window", type=float, default=3600.0, show_default=True, help="Window length in seconds.")
+@click.option("--windows", "max_windows", type=int, default=24, show_default=True, help="Windows retained.")
+@click.option("--budget", type=int, default=10000, show_default=True, help="Exact templates per window.")
+@click.option("--top", type=int, default=10, show_default=True)
+@click.option("--last", type=int, default=None, help="Only rank the latest N windows.")
+@click.option("--spike-factor", type=float, default=3.0, show_default=True)
+@click.pass_context
+def stats(
+    ctx: click.Context,
+    dataset: str,
+    window: float,
+    max_windows: int,
+    budget: int,
+    top: int,
+    last: Optional[int],
+    spike_factor: float,
+) -> None:
+    from .drain.drain_engine import DrainEngine
+    from .drain.stats import WindowedTemplateStats, line_clock
+
+    base = _load_base_config("configs/default.yaml")
+    paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
+    dataset_obj = load_dataset(dataset, paths)
+    mask_path = paths.mask_dir / f"{dataset}.json"
+    if not mask_path.exists():
+        raise click.ClickException(f"Mask file missing at {mask_path}")
+    try:
+        template_stats = WindowedTemplateStats(window, max_windows, exact_budget=budget)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+    engine = DrainEngine(
+        masks=[Mask(**entry) for entry in json.loads(mask_path.read_text(encoding="utf-8"))],
+        stats=template_stats,
+    )
+    templates: Dict[int, str] = {}
+    for line, timestamp in zip(dataset_obj.logs, line_clock(dataset_obj.logs)):
+        cluster = engine.add_log(line, timestamp=timestamp)
+        templates[cluster.cluster_id] = cluster.template_str()
+    # Compaction may have merged clusters since their last line; take final templates.
+    templates.update(
+        (cluster.cluster_id, cluster.template_str()) for bucket in engine.clusters.values() for cluster in bucket
+    )
+    exact = "exact" if template_stats.is_exact(last) else "estimated"
+    click.echo(f"Top {top} templates over {len(template_stats.windows())} window(s) ({exact} counts):")
+    for template_id, count in template_stats.top_k(top, last):
+        click.echo(f"{count:>10}  [{template_id}] {templates[template_id]}")
+    for template_id, count, baseline in template_stats.spikes(spike_factor):
+        click.echo(f"Spike: [{template_id}] {count} in latest window vs {baseline:.1f} mean before")
+
+
 @cli.command()
 @click.option("--config", type=click.Path(), required=True)
 @click.option("--deterministic", is_flag=True, default=False)
@@ -105,6 +573,66 @@ def eval(ctx: click.Context, config: str, deterministic: bool, seed: Optional[in
     click.echo(f"Wrote metrics CSV to {runner.config.output_csv}")
 
 
+def _parse_grid(value: str, cast):
+    try:
+        return [cast(item) for item in value.split(",") if item.strip()]
+    except ValueError as exc:
+        raise click.BadParameter(f"Invalid grid {value!r}: {exc}") from exc
+
+
+@cli.command()
+@click.option("--dataset", required=True, type=str)
+@click.option("--depths", default="3,4,5", show_default=True)
+@click.option("--thresholds", default="0.4,0.5,0.6,0.7", show_default=True)
+@click.option("--workers", type=int, default=None, help="Worker processes (default: config workers).")
+@click.option("--out", type=click.Path(), required=False)
+@click.option("--config", type=click.Path(), default="configs/default.yaml")
+@click.pass_context
+def sweep(
+    ctx: click.Context,
+    dataset: str,
+    depths: str,
+    thresholds: str,
+    workers: Optional[int],
+    out: Optional[str],
+    config: str,
+) -> None:
+    from .evaluation.eval_runner import load_masks
+    from .evaluation.sweep import run_sweep, write_sweep_csv
+    from .token_cache import TokenStreamCache
+
+    base = _load_base_config(config)
+    paths = build_paths(base["dataset_dir"], base["mask_dir"], base["output_dir"], base["log_dir"])
+    mask_path = paths.mask_dir / f"{dataset}.json"
+    if not mask_path.exists():
+        raise click.ClickException(f"Mask file missing at {mask_path}")
+    dataset_obj = load_dataset(dataset, paths)
+    cache = TokenStreamCache(Path(base.get("cache_dir", "artifacts/cache")))
+    checksum = dataset_obj.checksum
+    corpus = cache.load(dataset_obj, load_masks(mask_path), checksum)
+    truth_stream = cache.load(dataset_obj, [], checksum)
+    try:
+        results = run_sweep(
+            corpus,
+            truth_stream.joined(),
+            _parse_grid(depths, int),
+            _parse_grid(thresholds, float),
+            workers=int(base.get("workers", 0)) if workers is None else workers,
+        )
+    finally:
+        corpus.close()
+        truth_stream.close()
+    output_csv = Path(out or paths.output_dir / "sweeps" / f"{dataset}_sweep.csv")
+    write_sweep_csv(dataset, results, output_csv)
+    for result in results:
+        click.echo(
+            f"depth={result.depth} threshold={result.similarity_threshold:.2f} "
+            f"GA={result.GA:.3f} PA={result.PA:.3f} templates={result.templates} "
+            f"lines/s={result.lines_per_second:.0f}"
+        )
+    click.echo(f"Wrote sweep results to {output_csv}")
+
+
 @cli.command()
 @click.option("--inputs", multiple=True, type=click.Path())
 @click.option("--out", type=click.Path(), required=True)
@@ -120,8 +648,27 @@ def table(ctx: click.Context, inputs: Iterable[str], out: str) -> None:
 @click.option("--dataset", required=True)
 @click.option("--n", type=int, default=100)
 @click.option("--config", type=click.Path(), default="configs/default.yaml")
+@click.option("--memory", is_flag=True, default=False, help="Profile memory per stage instead of timing.")
+@click.option("--sizes", default="100,1000,10000", show_default=True, help="Corpus sizes for --memory.")
+@click.option("--repeats", type=int, default=5, show_default=True, help="Timed runs per stage.")
+@click.option("--run-id", default=None, help="Group this run with others in the benchmark history.")
+@click.option("--preprocess", is_flag=True, default=False, help="Compare fused and two-stage preprocessing.")
+@click.option("--regex", "regex_backends", is_flag=True, default=False, help="Compare installed regex backends.")
+@click.option("--threads", default=None, help="Time the concurrent engine at these thread counts, e.g. 1,2,4.")
 @click.pass_context
-def time(ctx: click.Context, dataset: str, n: int, config: str) -> None:
+def time(
+    ctx: click.Context,
+    dataset: str,
+    n: int,
+    config: str,
+    memory: bool,
+    sizes: str,
+    repeats: int,
+    run_id: Optional[str],
+    preprocess: bool,
+    regex_backends: bool,
+    threads: Optional[str],
+) -> None:
     from .evaluation.timing_bench import run_timing_benchmark
 
     base = _load_base_config(config)
@@ -129,8 +676,112 @@ def time(ctx: click.Context, dataset: str, n: int, config: str) -> None:
     mask_path = paths.mask_dir / f"{dataset}.json"
     if not mask_path.exists():
         raise click.ClickException(f"Mask file missing at {mask_path}")
+    if memory:
+        from .evaluation.memory_bench import run_memory_benchmark
+
+        output_csv = Path(base.get("memory_csv", "artifacts/outputs/memory.csv"))
+        results = run_memory_benchmark(dataset, paths, mask_path, _parse_grid(sizes, int), output_csv)
+        for result in results:
+            click.echo(
+                f"{result.n_logs:>10} {result.stage:<8} retained={result.retained_bytes} "
+                f"peak={result.peak_bytes} B/line={result.bytes_per_line:.1f}"
+            )
+        click.echo(f"Wrote memory benchmark to {output_csv}")
+        return
+    if preprocess:
+        from .evaluation.preprocess_bench import run_preprocess_benchmark
+        from .evaluation.eval_runner import load_masks
+
+        logs = load_dataset(dataset, paths).logs[:n]
+        try:
+            result = run_preprocess_benchmark(dataset, logs, load_masks(mask_path), repeats=repeats)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        click.echo(
+            f"{dataset}: {result.n_logs} logs, two-stage {result.two_stage_seconds:.4f}s, "
+            f"fused {result.fused_seconds:.4f}s ({result.speedup:.2f}x, identical output)"
+        )
+        return
+    if regex_backends:
+        from .evaluation.regex_bench import run_regex_benchmark
+        from .evaluation.eval_runner import load_masks
+
+        logs = load_dataset(dataset, paths).logs[:n]
+        for row in run_regex_benchmark(dataset, logs, load_masks(mask_path), repeats=repeats):
+            click.echo(
+                f"{row.dataset}: {row.backend:<4} {row.lines_per_second:>12.0f} lines/s "
+                f"fallbacks={row.fallbacks} mismatches={row.mismatches}"
+            )
+        return
+    if threads:
+        from .evaluation.thread_bench import run_thread_scaling
+        from .evaluation.eval_runner import load_masks
+
+        logs = load_dataset(dataset, paths).logs[:n]
+        try:
+            rows = run_thread_scaling(dataset, logs, load_masks(mask_path), _parse_grid(threads, int), repeats)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        for row in rows:
+            click.echo(
+                f"{row.dataset}: threads={row.threads:<3} {row.lines_per_second:>12.0f} lines/s "
+                f"speedup={row.speedup:.2f}x clusters={row.clusters} gil={'on' if row.gil_enabled else 'off'}"
+            )
+        return
     output_csv = Path(base.get("timing_csv", "artifacts/outputs/timing.csv"))
-    run_timing_benchmark(dataset, paths, mask_path, n, output_csv)
+    history_path = Path(base.get("bench_history", DEFAULT_BENCH_HISTORY))
+    result = run_timing_benchmark(
+        dataset, paths, mask_path, n, output_csv, repeats=repeats, history_path=history_path, run_id=run_id
+    )
+    click.echo(f"Recorded run {result.run_id} in {history_path}")
+
+
+@cli.command("bench-compare")
+@click.option("--baseline", default=None, help="Baseline run id (default: the second most recent run).")
+@click.option("--candidate", default=None, help="Candidate run id (default: the most recent run).")
+@click.option("--history", type=click.Path(), default=None, help="History file (default: config bench_history).")
+@click.option("--threshold", type=float, default=0.05, show_default=True, help="Minimum relative change.")
+@click.option("--noise-factor", type=float, default=3.0, show_default=True, help="Multiple of run noise.")
+@click.option("--config", type=click.Path(), default="configs/default.yaml")
+@click.pass_context
+def bench_compare(
+    ctx: click.Context,
+    baseline: Optional[str],
+    candidate: Optional[str],
+    history: Optional[str],
+    threshold: float,
+    noise_factor: float,
+    config: str,
+) -> None:
+    from .evaluation.bench_history import compare_runs, load_runs
+
+    base = _load_base_config(config)
+    history_path = Path(history or base.get("bench_history", DEFAULT_BENCH_HISTORY))
+    runs = load_runs(history_path)
+    run_ids = list(runs)
+    candidate = candidate or (run_ids[-1] if run_ids else None)
+    baseline = baseline or (run_ids[-2] if len(run_ids) > 1 else None)
+    for label, run_id in (("baseline", baseline), ("candidate", candidate)):
+        if run_id is None:
+            raise click.ClickException(f"Not enough runs in {history_path} to pick a {label}")
+        if run_id not in runs:
+            raise click.ClickException(f"Unknown {label} run {run_id} in {history_path}")
+    comparisons = compare_runs(
+        runs[baseline], runs[candidate], min_threshold=threshold, noise_factor=noise_factor
+    )
+    if not comparisons:
+        raise click.ClickException(f"Runs {baseline} and {candidate} share no dataset stages")
+    click.echo(f"baseline={baseline} candidate={candidate}")
+    for item in comparisons:
+        click.echo(
+            f"{item.dataset:<16} {item.stage:<10} {item.baseline_seconds:.4f}s -> "
+            f"{item.candidate_seconds:.4f}s speedup={item.speedup:.2f}x "
+            f"(threshold {item.threshold:.1%}) {item.verdict}"
+        )
+    regressions = [item for item in comparisons if item.verdict == "regression"]
+    if regressions:
+        click.echo(f"{len(regressions)} significant slowdown(s)", err=True)
+        ctx.exit(1)
 
 
 if __name__ == "__main__":  # pragma: no cover
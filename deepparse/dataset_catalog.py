@@ -0,0 +1,194 @@
+"""Dataset manifests that let repeated runs skip re-hashing unchanged corpora."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+from .dataset_loader import EXPECTED_FILES, Dataset, iter_log_lines, load_dataset, log_checksum
+from .io_paths import PathConfig
+from .logging_utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+RAW_FILE = EXPECTED_FILES[0]
+_CORE_KEYS = {"version", "name", "logs", "bytes", "mtime_ns", "checksum"}
+
+
+@dataclass
+class DatasetManifest:
+    """What a dataset's ``raw.log`` looked like when it was last hashed.
+
+    ``checksum`` equals :attr:`Dataset.checksum`; ``bytes`` and ``mtime_ns``
+    identify the file version it was computed from.  Keys written by other
+    tools (e.g. the synthetic generator's ``synthetic`` spec) are kept in
+    ``extra`` and round-trip unchanged.
+    """
+
+    name: str
+    logs: int
+    bytes: int
+    mtime_ns: int
+    checksum: str
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def matches(self, raw_path: Path) -> bool:
+        stat = raw_path.stat()
+        return stat.st_size == self.bytes and stat.st_mtime_ns == self.mtime_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "version": MANIFEST_VERSION,
+            "name": self.name,
+            "logs": self.logs,
+            "bytes": self.bytes,
+            "mtime_ns": self.mtime_ns,
+            "checksum": self.checksum,
+        }
+        payload.update(self.extra)
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> Optional["DatasetManifest"]:
+        """Parse a manifest, returning ``None`` for older formats that lack file identity."""
+
+        if payload.get("version") != MANIFEST_VERSION:
+            return None
+        try:
+            return cls(
+                name=payload["name"],
+                logs=int(payload["logs"]),
+                bytes=int(payload["bytes"]),
+                mtime_ns=int(payload["mtime_ns"]),
+                checksum=payload["checksum"],
+                extra={key: value for key, value in payload.items() if key not in _CORE_KEYS},
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class DatasetCatalog:
+    """Manifest-backed dataset loading.
+
+    Every dataset gets a ``manifest.json`` next to its ``raw.log``.  While
+    the file's size and mtime match the manifest, its checksum is trusted
+    and handed to the loaded :class:`Dataset`, so nothing downstream
+    re-hashes the corpus; otherwise the checksum is recomputed once from
+    the loaded lines and the manifest is rewritten.
+    """
+
+    def __init__(self, paths: PathConfig):
+        self.paths = paths
+
+    def _root(self, name: str) -> Path:
+        return self.paths.dataset_dir / name
+
+    def read_manifest(self, name: str) -> Optional[DatasetManifest]:
+        path = self._root(name) / MANIFEST_FILE
+        if not path.exists():
+            return None
+        try:
+            return DatasetManifest.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except ValueError:
+            LOGGER.warning("Ignoring unreadable manifest %s", path)
+            return None
+
+    def _extra(self, name: str) -> Dict[str, Any]:
+        path = self._root(name) / MANIFEST_FILE
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {key: value for key, value in payload.items() if key not in _CORE_KEYS}
+
+    def _write_manifest(self, manifest: DatasetManifest) -> None:
+        path = self._root(manifest.name) / MANIFEST_FILE
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(manifest.to_dict(), indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _current(self, name: str, raw_path: Path) -> Optional[DatasetManifest]:
+        manifest = self.read_manifest(name)
+        if manifest is not None and manifest.name == name and manifest.matches(raw_path):
+            return manifest
+        return None
+
+    def _record(
+        self, name: str, raw_path: Path, before: os.stat_result, logs: int, checksum: str
+    ) -> DatasetManifest:
+        manifest = DatasetManifest(name, logs, before.st_size, before.st_mtime_ns, checksum, self._extra(name))
+        if manifest.matches(raw_path):
+            self._write_manifest(manifest)
+            LOGGER.info("Refreshed manifest for %s (%d logs)", name, logs)
+        else:  # pragma: no cover - file changed while it was read; don't record a torn version
+            LOGGER.warning("%s changed while it was read; manifest not updated", raw_path)
+        return manifest
+
+    def manifest(self, name: str, verify: bool = False) -> DatasetManifest:
+        """Return an up-to-date manifest, rehashing only when the file changed or ``verify``.
+
+        Rehashing streams the file, so this never holds the whole corpus in memory.
+        """
+
+        raw_path = self._root(name) / RAW_FILE
+        if not raw_path.exists():
+            raise FileNotFoundError(f"Expected file {RAW_FILE} in {self._root(name)}")
+        manifest = None if verify else self._current(name, raw_path)
+        if manifest is None:
+            before = raw_path.stat()
+            logs = 0
+            digest = hashlib.sha256()
+            for line in iter_log_lines(raw_path):
+                digest.update(line.encode("utf-8") if logs == 0 else b"\n" + line.encode("utf-8"))
+                logs += 1
+            manifest = self._record(name, raw_path, before, logs, digest.hexdigest())
+        return manifest
+
+    def load(self, name: str) -> Dataset:
+        """Load ``name`` with its checksum taken from a current manifest when possible."""
+
+        raw_path = self._root(name) / RAW_FILE
+        before = raw_path.stat() if raw_path.exists() else None
+        dataset = load_dataset(name, self.paths)
+        before = before or raw_path.stat()  # the bundled demo is created on first load
+        manifest = self._current(name, raw_path)
+        if manifest is None or manifest.logs != len(dataset.logs):
+            manifest = self._record(name, raw_path, before, len(dataset.logs), log_checksum(dataset.logs))
+        dataset.known_checksum = manifest.checksum
+        return dataset
+
+    def iter_load(self, names: Iterable[str], workers: int = 4) -> Iterator[Dataset]:
+        """Yield datasets in order while up to ``workers`` more are read in the background.
+
+        At most ``workers`` datasets are in flight ahead of the consumer, so
+        memory stays bounded even when the caller evaluates them one by one.
+        """
+
+        names = list(names)
+        if workers <= 1:
+            for name in names:
+                yield self.load(name)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog") as pool:
+            pending: Deque[Future] = deque()
+            remaining = iter(names)
+            for name in remaining:
+                pending.append(pool.submit(self.load, name))
+                if len(pending) >= workers:
+                    break
+            while pending:
+                dataset = pending.popleft().result()
+                next_name = next(remaining, None)
+                if next_name is not None:
+                    pending.append(pool.submit(self.load, next_name))
+                yield dataset
+
+    def load_many(self, names: Iterable[str], workers: int = 4) -> List[Dataset]:
+        return list(self.iter_load(names, workers))
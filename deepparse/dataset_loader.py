@@ -3,9 +3,11 @@ from __future__ import annotations
 
 import hashlib
 import json
-from dataclasses import dataclass
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from .io_paths import PathConfig
 from .logging_utils import get_logger
@@ -18,14 +20,61 @@ class Dataset:
     name: str
     path: Path
     logs: Sequence[str]
+    known_checksum: Optional[str] = field(default=None, repr=False, compare=False)
 
     @property
     def checksum(self) -> str:
-        data = "\n".join(self.logs).encode("utf-8")
-        return hashlib.sha256(data).hexdigest()
+        """SHA-256 of the newline-joined logs, computed once and then cached."""
+
+        if self.known_checksum is None:
+            self.known_checksum = log_checksum(self.logs)
+        return self.known_checksum
+
+
+@dataclass
+class WeightedDataset:
+    """Distinct log lines with their occurrence counts (e.g. ``uniq -c`` output)."""
+
+    name: str
+    path: Path
+    logs: Sequence[str]
+    counts: Sequence[int]
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def pairs(self) -> Iterator[Tuple[int, str]]:
+        return zip(self.counts, self.logs)
+
+    def expanded(self) -> List[str]:
+        return [line for count, line in self.pairs() for _ in range(count)]
 
 
 EXPECTED_FILES = ["raw.log"]
+WEIGHTED_FILE = "counts.log"
+COUNTED_LINE = re.compile(r"^\s*(\d+)\s(.*)$")
+
+
+def log_checksum(logs: Iterable[str]) -> str:
+    """Hash logs exactly like ``sha256("\\n".join(logs))`` without building the joined text."""
+
+    digest = hashlib.sha256()
+    for index, line in enumerate(logs):
+        digest.update(line.encode("utf-8") if index == 0 else b"\n" + line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def iter_log_lines(path: Path) -> Iterator[str]:
+    """Stream the stripped, non-empty lines of ``path`` as :func:`load_dataset` keeps them."""
+
+    with path.open("r", encoding="utf-8") as fh:
+        for physical in fh:
+            # ``str.splitlines`` also breaks on separators such as ``\x0b``.
+            for line in physical.splitlines():
+                line = line.strip()
+                if line:
+                    yield line
 
 
 def _create_demo_dataset(path: Path) -> None:
@@ -60,11 +109,51 @@ def load_dataset(name: str, paths: PathConfig, create_demo: bool = True) -> Data
         if not file_path.exists():
             raise FileNotFoundError(f"Expected file {expected} in {dataset_root}")
 
-    logs = [line.strip() for line in (dataset_root / "raw.log").read_text(encoding="utf-8").splitlines() if line.strip()]
+    logs = list(iter_log_lines(dataset_root / "raw.log"))
     dataset = Dataset(name=name, path=dataset_root, logs=logs)
     LOGGER.info("Loaded dataset %s with %d logs", name, len(logs))
     return dataset
 
 
-def load_many(names: Iterable[str], paths: PathConfig) -> List[Dataset]:
-    return [load_dataset(name, paths) for name in names]
+def parse_counted_lines(lines: Iterable[str]) -> Tuple[List[int], List[str]]:
+    """Split ``"<count> <line>"`` records (``uniq -c`` or ``count\\tline``).
+
+    Lines are stripped like :func:`load_dataset`; zero counts and empty lines
+    are skipped, and repeated lines are kept as separate records.
+    """
+
+    counts: List[int] = []
+    logs: List[str] = []
+    for line_no, raw in enumerate(lines, start=1):
+        if not raw.strip():
+            continue
+        match = COUNTED_LINE.match(raw)
+        if match is None:
+            raise ValueError(f"Line {line_no} is not a '<count> <line>' record: {raw[:80]!r}")
+        count, line = int(match.group(1)), match.group(2).strip()
+        if count and line:
+            counts.append(count)
+            logs.append(line)
+    return counts, logs
+
+
+def load_weighted_dataset(name: str, paths: PathConfig, filename: str = WEIGHTED_FILE) -> WeightedDataset:
+    dataset_root = paths.dataset_dir / name
+    file_path = dataset_root / filename
+    if not file_path.exists():
+        raise FileNotFoundError(f"Expected file {filename} in {dataset_root}")
+    with file_path.open("r", encoding="utf-8") as fh:
+        counts, logs = parse_counted_lines(fh)
+    dataset = WeightedDataset(name=name, path=dataset_root, logs=logs, counts=counts)
+    LOGGER.info("Loaded weighted dataset %s with %d distinct lines (%d total)", name, len(logs), dataset.total)
+    return dataset
+
+
+def load_many(names: Iterable[str], paths: PathConfig, workers: int = 0) -> List[Dataset]:
+    """Load datasets in order, reading up to ``workers`` of them concurrently."""
+
+    names = list(names)
+    if workers <= 1 or len(names) <= 1:
+        return [load_dataset(name, paths) for name in names]
+    with ThreadPoolExecutor(max_workers=min(workers, len(names)), thread_name_prefix="load") as pool:
+        return list(pool.map(lambda name: load_dataset(name, paths), names))
@@ -1,5 +1,9 @@
 """Drain parser package."""
 
+from .concurrent import ConcurrentDrainEngine
 from .drain_engine import DrainEngine
+from .matcher import TemplateMatcher
+from .pool import EnginePool
+from .stats import WindowedTemplateStats
 
-__all__ = ["DrainEngine"]
+__all__ = ["ConcurrentDrainEngine", "DrainEngine", "EnginePool", "TemplateMatcher", "WindowedTemplateStats"]
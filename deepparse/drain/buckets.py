@@ -0,0 +1,145 @@
+"""Candidate cluster buckets with array based similarity scoring."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+
+from .interning import WILDCARD_ID
+
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - executed when NumPy missing
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .drain_engine import DrainCluster
+
+# Below this many candidates a Python scan beats the fixed cost of a NumPy call.
+VECTORISE_MIN_CLUSTERS = 8
+
+
+class ClusterBucket:
+    """Clusters sharing a ``(length, prefix)`` key.
+
+    Every template in a bucket has the same number of tokens, so interned
+    templates are kept as rows of one integer matrix and a line is scored
+    against all candidates with a single vectorised comparison.  Small buckets
+    (and environments without NumPy) keep plain lists scored in Python.
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        self.clusters: List["DrainCluster"] = []
+        self._lists: Optional[List[List[int]]] = []
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    def __iter__(self) -> Iterator["DrainCluster"]:
+        return iter(self.clusters)
+
+    def __getitem__(self, index: int) -> "DrainCluster":
+        return self.clusters[index]
+
+    def row(self, index: int) -> List[int]:
+        if self._lists is not None:
+            return list(self._lists[index])
+        return self._matrix[index].tolist()
+
+    def match_counts(self, token_ids: Sequence[int]) -> List[int]:
+        """Return the number of matching positions for every candidate."""
+
+        if self._lists is not None:
+            return [
+                sum(1 for tmpl, tok in zip(row, token_ids) if tmpl == tok or tmpl == WILDCARD_ID)
+                for row in self._lists
+            ]
+        block = self._matrix[: len(self.clusters)]
+        line = np.asarray(token_ids, dtype=np.int64)
+        return ((block == line) | (block == WILDCARD_ID)).sum(axis=1).tolist()
+
+    def diff_counts(self, token_ids: Sequence[int]) -> List[int]:
+        """Return the number of positions where each candidate differs from ``token_ids``.
+
+        Unlike :meth:`match_counts` a wildcard only equals another wildcard,
+        so this compares templates with templates.
+        """
+
+        if self._lists is not None:
+            return [sum(1 for tmpl, tok in zip(row, token_ids) if tmpl != tok) for row in self._lists]
+        block = self._matrix[: len(self.clusters)]
+        return (block != np.asarray(token_ids, dtype=np.int64)).sum(axis=1).tolist()
+
+    def best_match(self, token_ids: Sequence[int]) -> Tuple[Optional[int], float]:
+        """Return the index and similarity of the best candidate.
+
+        Ties resolve to the earliest cluster, matching a sequential scan.
+        ``(None, 0.0)`` is returned when no candidate shares a token.
+        """
+
+        if not self.clusters:
+            return None, 0.0
+        counts = self.match_counts(token_ids)
+        best_count = max(counts)
+        if best_count == 0:
+            return None, 0.0
+        return counts.index(best_count), best_count / max(1, self.width)
+
+    def append(self, cluster: "DrainCluster", token_ids: Sequence[int]) -> int:
+        index = len(self.clusters)
+        self.clusters.append(cluster)
+        if self._lists is not None:
+            self._lists.append(list(token_ids))
+            if np is not None and len(self._lists) >= VECTORISE_MIN_CLUSTERS:
+                self._vectorise()
+            return index
+        if index >= self._matrix.shape[0]:
+            grown = np.empty((self._matrix.shape[0] * 2, self.width), dtype=np.int64)
+            grown[:index] = self._matrix[:index]
+            self._matrix = grown
+        self._matrix[index] = token_ids
+        return index
+
+    def generalise(self, index: int, token_ids: Sequence[int]) -> List[int]:
+        """Replace positions of row ``index`` differing from ``token_ids`` with ``<*>``.
+
+        Returns the ids that were overwritten so the caller can release them.
+        """
+
+        if self._lists is not None:
+            row = self._lists[index]
+            replaced = []
+            for pos, token_id in enumerate(token_ids):
+                current = row[pos]
+                if current != token_id and current != WILDCARD_ID:
+                    replaced.append(current)
+                    row[pos] = WILDCARD_ID
+            return replaced
+        row = self._matrix[index]
+        changed = (row != np.asarray(token_ids, dtype=np.int64)) & (row != WILDCARD_ID)
+        replaced = row[changed].tolist()
+        row[changed] = WILDCARD_ID
+        return replaced
+
+    def remove(self, index: int) -> "DrainCluster":
+        """Drop the cluster at ``index`` keeping the order of the remaining rows."""
+
+        cluster = self.clusters.pop(index)
+        if self._lists is not None:
+            del self._lists[index]
+            return cluster
+        count = len(self.clusters)
+        self._matrix[index:count] = self._matrix[index + 1 : count + 1]
+        return cluster
+
+    def index_of(self, cluster_id: int) -> int:
+        for index, cluster in enumerate(self.clusters):
+            if cluster.cluster_id == cluster_id:
+                return index
+        raise KeyError(cluster_id)
+
+    def _vectorise(self) -> None:
+        rows = self._lists or []
+        self._matrix = np.empty((len(rows) * 2, self.width), dtype=np.int64)
+        self._matrix[: len(rows)] = rows
+        self._lists = None
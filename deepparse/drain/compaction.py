@@ -0,0 +1,25 @@
+"""Merging near-duplicate Drain clusters that share a bucket."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Sequence
+
+from .interning import WILDCARD
+
+
+def merge_templates(template: Sequence[str], other: Sequence[str]) -> List[str]:
+    """Return ``template`` with every position that differs from ``other`` wildcarded."""
+
+    return [tok if tok == other_tok else WILDCARD for tok, other_tok in zip(template, other)]
+
+
+@dataclass
+class CompactionStats:
+    """Counters describing clusters folded into older ones by compaction."""
+
+    passes: int = 0
+    merged: int = 0
+    merged_lines: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
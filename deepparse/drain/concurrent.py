@@ -0,0 +1,228 @@
+"""Thread-safe Drain engine for many producers feeding one template tree."""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..logging_utils import get_logger
+from .buckets import ClusterBucket
+from .drain_engine import DrainCluster, DrainEngine
+from .interning import WILDCARD, TokenInterner
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_LOCK_STRIPES = 64
+PARALLEL_CHUNK_LINES = 256
+
+
+def gil_enabled() -> bool:
+    """Return ``False`` on a free-threaded interpreter running without the GIL."""
+
+    is_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_enabled is None else bool(is_enabled())
+
+
+class LockedTokenInterner(TokenInterner):
+    """:class:`TokenInterner` whose misses and reference counts are serialised.
+
+    Known tokens are looked up without locking; a new token takes the lock
+    and re-checks, so two threads can never hand out different ids for the
+    same token or the same id for different tokens.  Taking and dropping
+    references always holds the lock.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.RLock()  # acquire_many interns while holding it
+
+    def intern(self, token: str) -> int:
+        token_id = self._ids.get(token)
+        if token_id is not None:
+            return token_id
+        with self._lock:
+            return super().intern(token)
+
+    def acquire_many(self, tokens: Iterable[str]) -> List[int]:
+        with self._lock:
+            return super().acquire_many(tokens)
+
+    def release(self, token_ids: Iterable[int]) -> None:
+        with self._lock:
+            super().release(token_ids)
+
+
+def _merge_template(template: List[str], tokens: Sequence[str]) -> List[str]:
+    # Copy-on-write counterpart of DrainCluster.update for same-length tokens.
+    for tmpl_tok, tok in zip(template, tokens):
+        if tmpl_tok != tok and tmpl_tok != WILDCARD:
+            return [t if t == tok else WILDCARD for t, tok in zip(template, tokens)]
+    return template
+
+
+@dataclass
+class ConcurrentDrainEngine(DrainEngine):
+    """:class:`DrainEngine` that accepts lines from many threads at once.
+
+    Buckets are guarded by ``lock_stripes`` locks chosen by the bucket key, so
+    producers only contend when their lines share a stripe; a short global
+    lock covers the clock, cluster ids and eviction counters.  Masking and
+    tokenising run outside every lock.
+
+    Templates are published copy-on-write: a cluster's ``template`` list is
+    replaced, never edited, so :meth:`template` and :meth:`templates` read
+    without locking and always see a complete template.  With one producer
+    the output is identical to :class:`DrainEngine`; with several, lines are
+    clustered in arrival order, which may differ between runs.
+
+    The global ``max_clusters`` cap needs a single eviction order across all
+    buckets and is not supported; ``max_clusters_per_bucket`` is.  Automatic
+    compaction triggers are rejected too, but :meth:`compact` may be called
+    at any time and briefly pauses all producers.
+    """
+
+    lock_stripes: int = DEFAULT_LOCK_STRIPES
+
+    def __post_init__(self) -> None:
+        if self.max_clusters is not None:
+            raise ValueError("ConcurrentDrainEngine does not support max_clusters; use max_clusters_per_bucket")
+        if self.compact_bucket_size is not None or self.compact_every is not None:
+            raise ValueError("ConcurrentDrainEngine compacts only on explicit compact() calls")
+        if self.lock_stripes < 1:
+            raise ValueError(f"lock_stripes must be positive, got {self.lock_stripes}")
+        super().__post_init__()
+        self.interner = LockedTokenInterner()
+        self._stripes = [threading.Lock() for _ in range(self.lock_stripes)]
+        self._global = threading.Lock()
+
+    def _stripe(self, key: Tuple[int, str]) -> threading.Lock:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def add_tokens(
+        self, tokens: Sequence[str], count: int = 1, timestamp: Optional[float] = None
+    ) -> DrainCluster:
+        if count < 1:
+            raise ValueError(f"count must be positive, got {count}")
+        cluster = self._assign(tokens, count)
+        if self.stats is not None:
+            with self._global:
+                self.stats.record(cluster.cluster_id, count, timestamp)
+        return cluster
+
+    def _assign(self, tokens: Sequence[str], count: int) -> DrainCluster:
+        key = self._cluster_key(tokens)
+        with self._stripe(key):
+            with self._global:
+                self._clock += count
+                clock = self._clock
+            bucket = self.clusters.get(key)
+            if bucket is not None:
+                # Looked up under the stripe: ids held by this bucket cannot be
+                # released and reused while we compare against them.
+                token_ids = self.interner.lookup_many(tokens)
+                best_index, best_score = bucket.best_match(token_ids)
+                if best_index is not None and best_score >= self.similarity_threshold:
+                    best_cluster = bucket[best_index]
+                    best_cluster.template = _merge_template(best_cluster.template, tokens)
+                    best_cluster.size += count
+                    best_cluster.last_seen = clock
+                    self.interner.release(bucket.generalise(best_index, token_ids))
+                    return best_cluster
+            return self._create_cluster(key, tokens, count)
+
+    def _create_cluster(self, key: Tuple[int, str], tokens: Sequence[str], count: int = 1) -> DrainCluster:
+        # Called with the key's stripe held.
+        bucket = self.clusters.get(key)
+        if bucket is not None and self.max_clusters_per_bucket is not None:
+            while len(bucket) >= self.max_clusters_per_bucket:
+                self._evict_from_bucket(key, bucket)
+        bucket = self.clusters.get(key)
+        with self._global:
+            cluster_id = self._next_cluster_id
+            self._next_cluster_id += 1
+            clock = self._clock
+        new_cluster = DrainCluster(template=list(tokens), size=count, cluster_id=cluster_id, last_seen=clock)
+        token_ids = self.interner.acquire_many(tokens)
+        if bucket is None:
+            bucket = ClusterBucket(len(tokens))
+            bucket.append(new_cluster, token_ids)
+            self.clusters[key] = bucket
+        else:
+            bucket.append(new_cluster, token_ids)
+        self._live[cluster_id] = new_cluster
+        return new_cluster
+
+    def _remove_cluster(
+        self, key: Tuple[int, str], bucket: ClusterBucket, index: int, reason: str
+    ) -> None:
+        with self._global:
+            super()._remove_cluster(key, bucket, index, reason)
+
+    def _record_merge(self, victim_id: int, survivor_id: int) -> None:
+        # Compaction holds every stripe, but stats are recorded under the global lock.
+        with self._global:
+            super()._record_merge(victim_id, survivor_id)
+
+    def template(self, cluster_id: int) -> Optional[str]:
+        """Return the current template of ``cluster_id`` without locking."""
+
+        cluster = self._live.get(cluster_id)
+        return None if cluster is None else " ".join(cluster.template)
+
+    def templates(self) -> Dict[int, str]:
+        """Snapshot every live template without locking."""
+
+        return {cluster_id: " ".join(cluster.template) for cluster_id, cluster in dict(self._live).items()}
+
+    def _quiesce(self) -> None:
+        for lock in self._stripes:
+            lock.acquire()
+
+    def _resume(self) -> None:
+        for lock in reversed(self._stripes):
+            lock.release()
+
+    def compact(self) -> int:
+        self._quiesce()
+        try:
+            return super().compact()
+        finally:
+            self._resume()
+
+    def to_state(self) -> Dict[str, Any]:
+        self._quiesce()
+        try:
+            return super().to_state()
+        finally:
+            self._resume()
+
+    def parse_parallel(self, lines: Iterable[str], threads: Optional[int] = None) -> List[str]:
+        """Parse ``lines`` on ``threads`` worker threads; one template per line.
+
+        Each template is the one the line's cluster had right after the line
+        was added, as in :meth:`parse`.  Threads take chunks of
+        :data:`PARALLEL_CHUNK_LINES` lines; ``threads=1`` parses in order on
+        the calling thread.  Extra threads only add throughput on a
+        free-threaded interpreter (see :func:`gil_enabled`).
+        """
+
+        lines = lines if isinstance(lines, list) else list(lines)
+        threads = threads or os.cpu_count() or 1
+        if threads < 1:
+            raise ValueError(f"threads must be positive, got {threads}")
+        if threads == 1:
+            return self.parse(lines)
+        templates: List[str] = [""] * len(lines)
+
+        def work(start: int) -> None:
+            for index in range(start, min(start + PARALLEL_CHUNK_LINES, len(lines))):
+                templates[index] = self.add_log(lines[index]).template_str()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for _ in pool.map(work, range(0, len(lines), PARALLEL_CHUNK_LINES)):
+                pass
+        LOGGER.debug("Parsed %d lines on %d threads (GIL enabled: %s)", len(lines), threads, gil_enabled())
+        return templates
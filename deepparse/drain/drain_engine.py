@@ -2,17 +2,27 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from ..logging_utils import get_logger
 from ..masks_types import Mask
-from ..tokenize import mask_tokens, tokenize
+from ..tokenize import preprocess_line
+from .buckets import ClusterBucket
+from .compaction import CompactionStats, merge_templates
+from .eviction import EVICTION_POLICIES, ColdClusterQueue, EvictionStats, coldness_key
+from .interning import TokenInterner
 from .masks_application import MaskApplier
+from .stats import WindowedTemplateStats
+
+LOGGER = get_logger(__name__)
 
 
 @dataclass
 class DrainCluster:
     template: List[str]
     size: int = 0
+    cluster_id: int = -1
+    last_seen: int = 0
 
     def similarity(self, tokens: Sequence[str]) -> float:
         matches = 0
@@ -21,8 +31,8 @@ class DrainCluster:
                 matches += 1
         return matches / max(1, len(self.template))
 
-    def update(self, tokens: Sequence[str]) -> None:
-        self.size += 1
+    def update(self, tokens: Sequence[str], count: int = 1) -> None:
+        self.size += count
         for idx, tok in enumerate(tokens):
             if idx >= len(self.template):
                 self.template.append(tok)
@@ -38,39 +48,335 @@ class DrainEngine:
     depth: int = 4
     similarity_threshold: float = 0.6
     masks: Sequence[Mask] = field(default_factory=list)
+    max_clusters: Optional[int] = None
+    max_clusters_per_bucket: Optional[int] = None
+    eviction_policy: str = "lru"
+    stats: Optional[WindowedTemplateStats] = None
+    applier: Optional[MaskApplier] = field(default=None, repr=False)
+    compact_bucket_size: Optional[int] = None
+    compact_every: Optional[int] = None
+    compaction_max_diff: int = 1
 
     def __post_init__(self) -> None:
-        self.applier = MaskApplier(self.masks)
-        self.clusters: Dict[Tuple[int, str], List[DrainCluster]] = {}
+        if self.eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unsupported eviction policy: {self.eviction_policy}")
+        for name in ("max_clusters", "max_clusters_per_bucket", "compact_bucket_size", "compact_every"):
+            limit = getattr(self, name)
+            if limit is not None and limit < 1:
+                raise ValueError(f"{name} must be positive, got {limit}")
+        if self.compaction_max_diff < 0:
+            raise ValueError(f"compaction_max_diff must be non-negative, got {self.compaction_max_diff}")
+        if self.applier is None:
+            self.applier = MaskApplier(self.masks)
+        self.interner = TokenInterner()
+        self.clusters: Dict[Tuple[int, str], ClusterBucket] = {}
+        self.eviction_stats = EvictionStats()
+        self._live: Dict[int, DrainCluster] = {}
+        self._clock = 0
+        self._next_cluster_id = 0
+        self._cold_queue = ColdClusterQueue(self.eviction_policy)
+        self.compaction_stats = CompactionStats()
+        # Merged-away id -> live survivor, kept flat; _absorbed is the reverse
+        # index used to re-point and prune entries when a survivor goes away.
+        self._merged_ids: Dict[int, int] = {}
+        self._absorbed: Dict[int, List[int]] = {}
+        self._compact_at: Dict[Tuple[int, str], int] = {}
+        self._since_compaction = 0
+
+    @property
+    def cluster_count(self) -> int:
+        return len(self._live)
 
     def _cluster_key(self, tokens: Sequence[str]) -> Tuple[int, str]:
         prefix = " ".join(tokens[: self.depth])
         return len(tokens), prefix
 
-    def add_log(self, line: str) -> DrainCluster:
-        masked_line = self.applier.apply(line)
-        tokens = tokenize(masked_line)
-        tokens = mask_tokens(tokens)
+    def preprocess(self, line: str) -> List[str]:
+        """Mask, tokenise and classify ``line`` into the tokens used for clustering."""
+
+        return preprocess_line(line, self.applier)
+
+    def add_log(self, line: str, count: int = 1, timestamp: Optional[float] = None) -> DrainCluster:
+        return self.add_tokens(self.preprocess(line), count, timestamp)
+
+    def add_tokens(
+        self, tokens: Sequence[str], count: int = 1, timestamp: Optional[float] = None
+    ) -> DrainCluster:
+        """Cluster an already preprocessed token sequence (see :meth:`preprocess`).
+
+        ``count`` adds the line as that many consecutive occurrences in one
+        step: the result is identical to adding it ``count`` times, because
+        a repeat always lands in the cluster that absorbed the first copy.
+        When :attr:`stats` is attached the occurrences are also recorded
+        there at ``timestamp`` (wall-clock time when omitted).  If compaction
+        merges the line's cluster away, the surviving cluster is returned.
+        """
+
+        if count < 1:
+            raise ValueError(f"count must be positive, got {count}")
+        cluster = self._assign(tokens, count)
+        if self.compact_every is not None:
+            self._since_compaction += count
+            if self._since_compaction >= self.compact_every and self.compact():
+                cluster = self.live_cluster(cluster.cluster_id)
+        if self.stats is not None:
+            self.stats.record(cluster.cluster_id, count, timestamp)
+        return cluster
+
+    def _assign(self, tokens: Sequence[str], count: int) -> DrainCluster:
+        self._clock += count
         key = self._cluster_key(tokens)
-        cluster_list = self.clusters.setdefault(key, [])
-        best_cluster = None
-        best_score = 0.0
-        for cluster in cluster_list:
-            score = cluster.similarity(tokens)
-            if score > best_score:
-                best_score = score
-                best_cluster = cluster
-        if best_cluster and best_score >= self.similarity_threshold:
-            best_cluster.update(tokens)
-            return best_cluster
-        new_cluster = DrainCluster(template=list(tokens), size=0)
-        new_cluster.update(tokens)
-        cluster_list.append(new_cluster)
+        bucket = self.clusters.get(key)
+        if bucket is not None:
+            # Tokens no template holds yet look up as MISSING_ID and match nothing.
+            token_ids = self.interner.lookup_many(tokens)
+            best_index, best_score = bucket.best_match(token_ids)
+            if best_index is not None and best_score >= self.similarity_threshold:
+                best_cluster = bucket[best_index]
+                best_cluster.update(tokens, count)
+                best_cluster.last_seen = self._clock
+                self.interner.release(bucket.generalise(best_index, token_ids))
+                return best_cluster
+        return self._create_cluster(key, tokens, count)
+
+    def _create_cluster(self, key: Tuple[int, str], tokens: Sequence[str], count: int = 1) -> DrainCluster:
+        bucket = self.clusters.get(key)
+        if bucket is not None and self.max_clusters_per_bucket is not None:
+            while len(bucket) >= self.max_clusters_per_bucket:
+                self._evict_from_bucket(key, bucket)
+        if self.max_clusters is not None:
+            while len(self._live) >= self.max_clusters:
+                self._evict_coldest()
+        bucket = self.clusters.get(key)
+        if bucket is None:
+            bucket = self.clusters[key] = ClusterBucket(len(tokens))
+        new_cluster = DrainCluster(template=list(tokens), size=0, cluster_id=self._next_cluster_id)
+        self._next_cluster_id += 1
+        new_cluster.update(tokens, count)
+        new_cluster.last_seen = self._clock
+        bucket.append(new_cluster, self.interner.acquire_many(tokens))
+        self._live[new_cluster.cluster_id] = new_cluster
+        if self.max_clusters is not None:
+            self._cold_queue.push(new_cluster)
+        if self.compact_bucket_size is not None:
+            if len(bucket) >= self._compact_at.get(key, self.compact_bucket_size):
+                self.compaction_stats.passes += 1
+                if self._compact_bucket(key, bucket):
+                    new_cluster = self.live_cluster(new_cluster.cluster_id)
+                # Distinct templates stay behind; wait for the bucket to double before rescanning.
+                self._compact_at[key] = max(self.compact_bucket_size, 2 * len(bucket))
         return new_cluster
 
+    def _evict_from_bucket(self, key: Tuple[int, str], bucket: ClusterBucket) -> None:
+        coldness = coldness_key(self.eviction_policy)
+        victim_index = min(range(len(bucket)), key=lambda index: coldness(bucket[index]))
+        self._remove_cluster(key, bucket, victim_index, reason="bucket")
+        self._cold_queue.compact(self._live)
+
+    def _evict_coldest(self) -> None:
+        victim = self._cold_queue.pop_coldest(self._live)
+        if victim is None:  # pragma: no cover - queue tracks every live cluster
+            raise RuntimeError("Cluster limit reached but no eviction candidate found")
+        key = self._cluster_key(victim.template)
+        bucket = self.clusters[key]
+        self._remove_cluster(key, bucket, bucket.index_of(victim.cluster_id), reason="global")
+
+    def _remove_cluster(
+        self, key: Tuple[int, str], bucket: ClusterBucket, index: int, reason: str
+    ) -> None:
+        self.interner.release(bucket.row(index))
+        victim = bucket.remove(index)
+        del self._live[victim.cluster_id]
+        for merged_id in self._absorbed.pop(victim.cluster_id, ()):
+            del self._merged_ids[merged_id]
+        if not len(bucket):
+            del self.clusters[key]
+            self._compact_at.pop(key, None)
+        self.eviction_stats.record(victim, reason)
+        LOGGER.debug(
+            "Evicted cluster %d (%s, size=%d): %s",
+            victim.cluster_id,
+            reason,
+            victim.size,
+            victim.template_str(),
+        )
+
+    def compact(self) -> int:
+        """Merge near-duplicate clusters in every bucket; return how many were merged.
+
+        Within a bucket, a cluster whose template differs from an older one
+        in at most :attr:`compaction_max_diff` positions is folded into it:
+        the older template wildcards those positions, absorbs the size, and
+        keeps its id.  The merged id then resolves to the survivor through
+        :meth:`resolve_cluster_id` until the survivor itself is evicted, and
+        attached :attr:`stats` move the merged id's counts to the survivor.
+        """
+
+        self.compaction_stats.passes += 1
+        self._since_compaction = 0
+        merged = sum(self._compact_bucket(key, bucket) for key, bucket in list(self.clusters.items()))
+        if merged:
+            LOGGER.debug("Compaction merged %d clusters; %d remain", merged, len(self._live))
+        return merged
+
+    def _compact_bucket(self, key: Tuple[int, str], bucket: ClusterBucket) -> int:
+        # A merge widens the survivor, which may bring other clusters within
+        # reach, so scan until a pass merges nothing.
+        merged = 0
+        while True:
+            passed = self._compact_bucket_once(bucket)
+            if not passed:
+                break
+            merged += passed
+        if merged and self.max_clusters is not None:
+            self._cold_queue.compact(self._live)
+        return merged
+
+    def _compact_bucket_once(self, bucket: ClusterBucket) -> int:
+        merged = 0
+        index = 1
+        while index < len(bucket):
+            row = bucket.row(index)
+            diffs = bucket.diff_counts(row)[:index]
+            target = next((i for i, diff in enumerate(diffs) if diff <= self.compaction_max_diff), None)
+            if target is None:
+                index += 1
+                continue
+            survivor = bucket[target]
+            victim = bucket.remove(index)
+            survivor.template = merge_templates(survivor.template, victim.template)
+            survivor.size += victim.size
+            survivor.last_seen = max(survivor.last_seen, victim.last_seen)
+            self.interner.release(bucket.generalise(target, row))
+            self.interner.release(row)
+            del self._live[victim.cluster_id]
+            self._record_merge(victim.cluster_id, survivor.cluster_id)
+            self.compaction_stats.merged += 1
+            self.compaction_stats.merged_lines += victim.size
+            merged += 1
+        return merged
+
+    def _record_merge(self, victim_id: int, survivor_id: int) -> None:
+        absorbed = self._absorbed.pop(victim_id, [])
+        absorbed.append(victim_id)
+        for merged_id in absorbed:
+            self._merged_ids[merged_id] = survivor_id
+        self._absorbed.setdefault(survivor_id, []).extend(absorbed)
+        if self.stats is not None:
+            self.stats.merge(victim_id, survivor_id)
+
+    def resolve_cluster_id(self, cluster_id: int) -> int:
+        """Return the live cluster that compaction merged ``cluster_id`` into.
+
+        Ids that were not merged, or whose survivor has since been evicted,
+        resolve to themselves.
+        """
+
+        return self._merged_ids.get(cluster_id, cluster_id)
+
+    def live_cluster(self, cluster_id: int) -> Optional[DrainCluster]:
+        """The live cluster holding ``cluster_id``'s lines, or ``None`` once evicted."""
+
+        return self._live.get(self._merged_ids.get(cluster_id, cluster_id))
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the engine configuration and clusters."""
+
+        return {
+            "depth": self.depth,
+            "similarity_threshold": self.similarity_threshold,
+            "masks": [mask.to_dict() for mask in self.masks],
+            "max_clusters": self.max_clusters,
+            "max_clusters_per_bucket": self.max_clusters_per_bucket,
+            "eviction_policy": self.eviction_policy,
+            "clock": self._clock,
+            "next_cluster_id": self._next_cluster_id,
+            "eviction_stats": self.eviction_stats.to_dict(),
+            "compact_bucket_size": self.compact_bucket_size,
+            "compact_every": self.compact_every,
+            "compaction_max_diff": self.compaction_max_diff,
+            "compaction_stats": self.compaction_stats.to_dict(),
+            "merged_ids": sorted(self._merged_ids.items()),
+            "clusters": [
+                {
+                    "template": list(cluster.template),
+                    "size": cluster.size,
+                    "cluster_id": cluster.cluster_id,
+                    "last_seen": cluster.last_seen,
+                }
+                for bucket in self.clusters.values()
+                for cluster in bucket
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], applier: Optional[MaskApplier] = None) -> "DrainEngine":
+        """Rebuild an engine from :meth:`to_state` output.
+
+        Buckets are restored in their original order so candidate tie-breaking
+        is the same as in the engine that produced the snapshot.  ``applier``
+        reuses an already compiled bundle for the snapshot's masks.
+        """
+
+        engine = cls(
+            depth=state["depth"],
+            similarity_threshold=state["similarity_threshold"],
+            masks=[Mask.from_dict(entry) for entry in state.get("masks", [])],
+            max_clusters=state.get("max_clusters"),
+            max_clusters_per_bucket=state.get("max_clusters_per_bucket"),
+            eviction_policy=state.get("eviction_policy", "lru"),
+            applier=applier,
+            compact_bucket_size=state.get("compact_bucket_size"),
+            compact_every=state.get("compact_every"),
+            compaction_max_diff=state.get("compaction_max_diff", 1),
+        )
+        engine._clock = state.get("clock", 0)
+        engine.eviction_stats = EvictionStats(**state.get("eviction_stats", {}))
+        engine.compaction_stats = CompactionStats(**state.get("compaction_stats", {}))
+        merged_ids = {int(old): int(new) for old, new in state.get("merged_ids", [])}
+        for entry in state.get("clusters", []):
+            cluster = DrainCluster(
+                template=list(entry["template"]),
+                size=entry["size"],
+                cluster_id=entry["cluster_id"],
+                last_seen=entry["last_seen"],
+            )
+            key = engine._cluster_key(cluster.template)
+            bucket = engine.clusters.get(key)
+            if bucket is None:
+                bucket = engine.clusters[key] = ClusterBucket(len(cluster.template))
+            bucket.append(cluster, engine.interner.acquire_many(cluster.template))
+            engine._live[cluster.cluster_id] = cluster
+            if engine.max_clusters is not None:
+                engine._cold_queue.push(cluster)
+        for old in merged_ids:
+            root = old
+            while root in merged_ids:  # older snapshots may hold chains
+                root = merged_ids[root]
+            if root in engine._live:
+                engine._merged_ids[old] = root
+                engine._absorbed.setdefault(root, []).append(old)
+        engine._next_cluster_id = state.get("next_cluster_id", max(engine._live, default=-1) + 1)
+        return engine
+
     def parse(self, lines: Iterable[str]) -> List[str]:
         templates: List[str] = []
         for line in lines:
             cluster = self.add_log(line)
             templates.append(cluster.template_str())
         return templates
+
+    def parse_weighted(self, pairs: Iterable[Tuple[int, str]]) -> List[str]:
+        """Parse pre-aggregated ``(count, line)`` pairs; one template per pair.
+
+        Cost is proportional to the number of pairs, not to the total count.
+        """
+
+        return [self.add_log(line, count).template_str() for count, line in pairs]
+
+    def parse_tokens(self, token_sequences: Iterable[Sequence[str]]) -> List[str]:
+        templates: List[str] = []
+        for tokens in token_sequences:
+            cluster = self.add_tokens(tokens)
+            templates.append(cluster.template_str())
+        return templates
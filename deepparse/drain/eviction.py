@@ -0,0 +1,83 @@
+"""Eviction policies bounding the number of live Drain clusters."""
+from __future__ import annotations
+
+import heapq
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .drain_engine import DrainCluster
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+def coldness_key(policy: str) -> Callable[["DrainCluster"], Tuple[int, ...]]:
+    """Return the ordering used to pick eviction victims (smallest is coldest).
+
+    ``lru`` evicts the cluster seen least recently; ``lfu`` evicts the cluster
+    with the fewest hits, breaking ties by recency.
+    """
+
+    if policy == "lru":
+        return lambda cluster: (cluster.last_seen, cluster.cluster_id)
+    if policy == "lfu":
+        return lambda cluster: (cluster.size, cluster.last_seen, cluster.cluster_id)
+    raise ValueError(f"Unsupported eviction policy: {policy}")
+
+
+@dataclass
+class EvictionStats:
+    """Counters describing clusters dropped by the engine."""
+
+    evicted: int = 0
+    bucket_evictions: int = 0
+    global_evictions: int = 0
+    evicted_lines: int = 0
+
+    def record(self, cluster: "DrainCluster", reason: str) -> None:
+        self.evicted += 1
+        self.evicted_lines += cluster.size
+        if reason == "bucket":
+            self.bucket_evictions += 1
+        else:
+            self.global_evictions += 1
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ColdClusterQueue:
+    """Min-heap of clusters ordered by a coldness key.
+
+    Both ``last_seen`` and ``size`` only grow, so an entry's stored key is a
+    lower bound of the cluster's current key.  Stale entries are refreshed
+    lazily when they surface, which keeps hits O(1) and evictions amortised
+    O(log n).
+    """
+
+    def __init__(self, policy: str):
+        self._key = coldness_key(policy)
+        self._heap: List[Tuple[Tuple[int, ...], int]] = []
+
+    def push(self, cluster: "DrainCluster") -> None:
+        heapq.heappush(self._heap, (self._key(cluster), cluster.cluster_id))
+
+    def pop_coldest(self, live: Dict[int, "DrainCluster"]) -> Optional["DrainCluster"]:
+        while self._heap:
+            key, cluster_id = heapq.heappop(self._heap)
+            cluster = live.get(cluster_id)
+            if cluster is None:
+                continue
+            current = self._key(cluster)
+            if current != key:
+                heapq.heappush(self._heap, (current, cluster_id))
+                continue
+            return cluster
+        return None
+
+    def compact(self, live: Dict[int, "DrainCluster"]) -> None:
+        """Drop entries of clusters removed outside the queue."""
+
+        if len(self._heap) > 2 * len(live) + 16:
+            self._heap = [(key, cid) for key, cid in self._heap if cid in live]
+            heapq.heapify(self._heap)
@@ -0,0 +1,82 @@
+"""Token interning for array based template matching."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+WILDCARD = "<*>"
+WILDCARD_ID = 0
+MISSING_ID = -1
+
+
+class TokenInterner:
+    """Map tokens to dense integer ids.
+
+    The wildcard token ``<*>`` is reserved as :data:`WILDCARD_ID` so templates
+    stored as id arrays can be matched without converting back to strings.
+
+    Ids are reference counted by the templates holding them: :meth:`acquire_many`
+    takes a reference per token and :meth:`release` drops it, forgetting the
+    token (and recycling its id) once no template uses it.  Lines only need
+    :meth:`lookup_many`, which never adds entries, so the table stays
+    proportional to the live templates rather than to everything ever seen.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {WILDCARD: WILDCARD_ID}
+        self._tokens: List[Optional[str]] = [WILDCARD]
+        self._refs: List[int] = [0]
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def intern(self, token: str) -> int:
+        token_id = self._ids.get(token)
+        if token_id is None:
+            if self._free:
+                token_id = self._free.pop()
+                self._tokens[token_id] = token
+            else:
+                token_id = len(self._tokens)
+                self._tokens.append(token)
+                self._refs.append(0)
+            self._ids[token] = token_id
+        return token_id
+
+    def intern_many(self, tokens: Iterable[str]) -> List[int]:
+        return [self.intern(token) for token in tokens]
+
+    def lookup_many(self, tokens: Iterable[str]) -> List[int]:
+        """Return ids without interning; unknown tokens map to :data:`MISSING_ID`."""
+
+        ids = self._ids
+        return [ids.get(token, MISSING_ID) for token in tokens]
+
+    def acquire_many(self, tokens: Iterable[str]) -> List[int]:
+        """Intern ``tokens`` and take one reference per non-wildcard token."""
+
+        token_ids = self.intern_many(tokens)
+        refs = self._refs
+        for token_id in token_ids:
+            if token_id != WILDCARD_ID:
+                refs[token_id] += 1
+        return token_ids
+
+    def release(self, token_ids: Iterable[int]) -> None:
+        """Drop one reference per id, forgetting tokens that are no longer used."""
+
+        refs = self._refs
+        for token_id in token_ids:
+            if token_id == WILDCARD_ID:
+                continue
+            refs[token_id] -= 1
+            if refs[token_id] == 0:
+                del self._ids[self._tokens[token_id]]
+                self._tokens[token_id] = None
+                self._free.append(token_id)
+
+    def token(self, token_id: int) -> str:
+        return self._tokens[token_id]
+
+    def tokens(self, token_ids: Iterable[int]) -> List[str]:
+        return [self._tokens[token_id] for token_id in token_ids]
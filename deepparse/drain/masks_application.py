@@ -1,17 +1,56 @@
 """Deterministic application of mask regexes."""
 from __future__ import annotations
 
-import re
-from typing import Iterable, Sequence
+import hashlib
+import json
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
+from ..logging_utils import get_logger
 from ..masks_types import Mask
+from ..utils.regex_backend import RegexBackend, get_backend
+
+LOGGER = get_logger(__name__)
+
+
+def mask_bundle_hash(masks: Sequence[Mask]) -> str:
+    """Hash the parts of a mask bundle that influence preprocessing."""
+
+    payload = json.dumps([[mask.label, mask.pattern] for mask in masks])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MaskedSegment(NamedTuple):
+    """Piece of a masked line together with the raw text it replaced.
+
+    Literal segments have ``label=None`` and identical ``masked``/``raw``
+    text; placeholder segments carry ``<*>`` and the label of the mask that
+    produced them.
+    """
+
+    masked: str
+    raw: str
+    label: Optional[str]
 
 
 class MaskApplier:
-    """Apply regex masks to log lines before Drain clustering."""
+    """Apply regex masks to log lines before Drain clustering.
 
-    def __init__(self, masks: Sequence[Mask]):
-        self._compiled = [(mask, re.compile(mask.pattern)) for mask in masks]
+    Patterns are compiled by ``backend`` (see :func:`get_backend`); masks the
+    backend cannot handle run on stdlib ``re`` and are listed in
+    :attr:`fallbacks`.
+    """
+
+    def __init__(self, masks: Sequence[Mask], backend: Optional[RegexBackend] = None):
+        self.backend = backend or get_backend()
+        compiled = [(mask, self.backend.compile(mask.pattern)) for mask in masks]
+        self._compiled = [(mask, entry.regex) for mask, entry in compiled]
+        self.fallbacks = [mask.label for mask, entry in compiled if entry.backend != self.backend.name]
+        if self.fallbacks:
+            LOGGER.warning(
+                "Masks %s are not supported by the %s backend; using re for them",
+                ", ".join(self.fallbacks),
+                self.backend.name,
+            )
 
     def apply(self, line: str) -> str:
         masked_line = line
@@ -23,3 +62,63 @@ class MaskApplier:
         joined = " ".join(tokens)
         masked = self.apply(joined)
         return masked.split()
+
+    def apply_tracked(self, line: str) -> List[MaskedSegment]:
+        """Apply masks like :meth:`apply` while remembering what each ``<*>`` replaced.
+
+        Joining the ``masked`` fields reproduces :meth:`apply` except when a
+        later mask matches only part of an earlier placeholder or matches the
+        empty string; callers should compare and treat such lines as opaque.
+        """
+
+        segments = [MaskedSegment(line, line, None)]
+        for mask, compiled in self._compiled:
+            masked_line = "".join(segment.masked for segment in segments)
+            spans = [match.span() for match in compiled.finditer(masked_line) if match.end() > match.start()]
+            if spans:
+                segments = _substitute(segments, spans, mask.label)
+        return segments
+
+
+def _substitute(
+    segments: Sequence[MaskedSegment], spans: Sequence[Tuple[int, int]], label: str
+) -> List[MaskedSegment]:
+    pieces: List[Tuple[MaskedSegment, Optional[int]]] = []
+    span_idx = 0
+    position = 0
+    for segment in segments:
+        start, end = position, position + len(segment.masked)
+        position = end
+        while span_idx < len(spans) and spans[span_idx][1] <= start:
+            span_idx += 1
+        if segment.label is not None:
+            overlaps = span_idx < len(spans) and spans[span_idx][0] < end
+            pieces.append((segment, span_idx if overlaps else None))
+            continue
+        cursor = start
+        idx = span_idx
+        while cursor < end:
+            if idx < len(spans) and spans[idx][0] <= cursor < spans[idx][1]:
+                cut = min(end, spans[idx][1])
+                owner: Optional[int] = idx
+            else:
+                cut = min(end, spans[idx][0]) if idx < len(spans) else end
+                owner = None
+            text = segment.masked[cursor - start : cut - start]
+            pieces.append((MaskedSegment(text, text, None), owner))
+            cursor = cut
+            if owner is not None and cut == spans[idx][1]:
+                idx += 1
+
+    merged: List[MaskedSegment] = []
+    previous_owner: Optional[int] = None
+    for piece, owner in pieces:
+        if owner is None:
+            merged.append(piece)
+        elif owner == previous_owner:
+            last = merged[-1]
+            merged[-1] = MaskedSegment("<*>", last.raw + piece.raw, label)
+        else:
+            merged.append(MaskedSegment("<*>", piece.raw, label))
+        previous_owner = owner
+    return merged
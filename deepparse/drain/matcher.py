@@ -0,0 +1,187 @@
+"""Read-only matching of lines against a frozen set of learned templates."""
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..logging_utils import get_logger
+from ..masks_types import Mask
+from ..tokenize import preprocess_line
+from .drain_engine import DrainEngine
+from .interning import WILDCARD
+from .masks_application import MaskApplier
+
+LOGGER = get_logger(__name__)
+
+# Matcher and lines shared with forked workers (see ``evaluation.sweep``).
+_SHARED: Optional[Tuple["TemplateMatcher", Sequence[str]]] = None
+
+
+class _TrieNode:
+    __slots__ = ("children", "wildcard", "template_id")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.wildcard: Optional[_TrieNode] = None
+        self.template_id: Optional[int] = None
+
+
+class TemplateMatcher:
+    """Token trie over frozen templates, one root per template length.
+
+    ``<*>`` positions become wildcard edges.  Matching follows the literal
+    edge first and only backtracks into the wildcard edge when the literal
+    branch dead-ends, so the most specific template wins and typical lines
+    cost one dictionary lookup per token.  The matcher never mutates after
+    construction, which makes it safe to share across threads and forked
+    processes.
+    """
+
+    def __init__(
+        self,
+        templates: Sequence[Sequence[str]],
+        masks: Sequence[Mask] = (),
+        template_ids: Optional[Sequence[int]] = None,
+    ):
+        ids = list(template_ids) if template_ids is not None else list(range(len(templates)))
+        if len(ids) != len(templates):
+            raise ValueError("template_ids must align with templates")
+        self.masks = list(masks)
+        self.applier = MaskApplier(self.masks)
+        self._templates: Dict[int, str] = {}
+        self._roots: Dict[int, _TrieNode] = {}
+        for template_id, template in zip(ids, templates):
+            self._insert(template_id, list(template))
+
+    @classmethod
+    def from_engine(cls, engine: DrainEngine) -> "TemplateMatcher":
+        clusters = [cluster for bucket in engine.clusters.values() for cluster in bucket]
+        return cls(
+            [cluster.template for cluster in clusters],
+            engine.masks,
+            [cluster.cluster_id for cluster in clusters],
+        )
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def _insert(self, template_id: int, tokens: List[str]) -> None:
+        node = self._roots.setdefault(len(tokens), _TrieNode())
+        for token in tokens:
+            if token == WILDCARD:
+                if node.wildcard is None:
+                    node.wildcard = _TrieNode()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(token, _TrieNode())
+        if node.template_id is None:
+            node.template_id = template_id
+            self._templates[template_id] = " ".join(tokens)
+
+    def template(self, template_id: int) -> str:
+        return self._templates[template_id]
+
+    def match_tokens(self, tokens: Sequence[str]) -> Optional[int]:
+        """Return the id of the template matching ``tokens``, or ``None``."""
+
+        root = self._roots.get(len(tokens))
+        if root is None:
+            return None
+        # Explicit stack of (node, position) alternatives still to try.
+        pending: List[Tuple[_TrieNode, int]] = []
+        node: Optional[_TrieNode] = root
+        position = 0
+        end = len(tokens)
+        while True:
+            if node is not None:
+                if position == end:
+                    if node.template_id is not None:
+                        return node.template_id
+                    node = None
+                    continue
+                if node.wildcard is not None:
+                    pending.append((node.wildcard, position + 1))
+                node = node.children.get(tokens[position])
+                position += 1
+                continue
+            if not pending:
+                return None
+            node, position = pending.pop()
+
+    def match(self, line: str) -> Optional[int]:
+        return self.match_tokens(preprocess_line(line, self.applier))
+
+    def match_many(self, lines: Sequence[str]) -> List[Optional[int]]:
+        applier = self.applier
+        match_tokens = self.match_tokens
+        return [match_tokens(preprocess_line(line, applier)) for line in lines]
+
+
+@dataclass
+class MatchReport:
+    lines: int = 0
+    matched: int = 0
+    counts: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def unmatched(self) -> int:
+        return self.lines - self.matched
+
+    @property
+    def unmatched_fraction(self) -> float:
+        return self.unmatched / self.lines if self.lines else 0.0
+
+
+def _match_range(bounds: Tuple[int, int]) -> List[Optional[int]]:
+    assert _SHARED is not None, "match worker started without a shared matcher"
+    matcher, lines = _SHARED
+    return matcher.match_many(lines[bounds[0] : bounds[1]])
+
+
+def _install_shared(shared: Optional[Tuple["TemplateMatcher", Sequence[str]]]) -> None:
+    global _SHARED
+    _SHARED = shared
+
+
+def match_lines(
+    matcher: TemplateMatcher,
+    lines: Sequence[str],
+    workers: int = 0,
+    chunk_size: int = 20000,
+) -> Tuple[List[Optional[int]], MatchReport]:
+    """Match every line, in ``workers`` forked processes when ``workers > 1``.
+
+    Results keep input order; ``None`` marks lines no frozen template covers.
+    """
+
+    if workers <= 1 or len(lines) <= chunk_size:
+        matches = matcher.match_many(lines)
+    else:
+        bounds = [(start, min(start + chunk_size, len(lines))) for start in range(0, len(lines), chunk_size)]
+        _install_shared((matcher, lines))
+        try:
+            if "fork" in multiprocessing.get_all_start_methods():
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+            else:  # pragma: no cover - platforms without fork pickle the inputs once per worker
+                pool = ProcessPoolExecutor(
+                    max_workers=workers, initializer=_install_shared, initargs=((matcher, lines),)
+                )
+            with pool:
+                matches = [match for chunk in pool.map(_match_range, bounds) for match in chunk]
+        finally:
+            _install_shared(None)
+    report = MatchReport(lines=len(lines))
+    for template_id in matches:
+        if template_id is not None:
+            report.matched += 1
+            report.counts[template_id] = report.counts.get(template_id, 0) + 1
+    LOGGER.info(
+        "Matched %d/%d lines against %d frozen templates (%.2f%% unmatched)",
+        report.matched,
+        report.lines,
+        len(matcher),
+        100 * report.unmatched_fraction,
+    )
+    return matches, report
@@ -0,0 +1,188 @@
+"""Route lines from many sources to per-source engines under a memory cap."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..logging_utils import get_logger
+from ..masks_types import Mask
+from .drain_engine import DrainCluster, DrainEngine
+from .masks_application import MaskApplier, mask_bundle_hash
+
+LOGGER = get_logger(__name__)
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class MaskApplierRegistry:
+    """Compile each distinct mask bundle once and hand out the shared applier.
+
+    Bundles are keyed by :func:`mask_bundle_hash`, so sources whose masks
+    have the same labels and patterns share one :class:`MaskApplier`.
+    """
+
+    def __init__(self) -> None:
+        self._appliers: Dict[str, MaskApplier] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._appliers)
+
+    def get(self, masks: Sequence[Mask]) -> MaskApplier:
+        key = mask_bundle_hash(masks)
+        with self._lock:
+            applier = self._appliers.get(key)
+            if applier is None:
+                applier = self._appliers[key] = MaskApplier(masks)
+            return applier
+
+
+@dataclass
+class PoolStats:
+    created: int = 0
+    spilled: int = 0
+    restored: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"created": self.created, "spilled": self.spilled, "restored": self.restored}
+
+
+class EnginePool:
+    """One :class:`DrainEngine` per source key, sharing compiled mask bundles.
+
+    ``mask_resolver`` maps a source key to its masks; engines are built with
+    ``engine_options`` (``max_clusters``, ``eviction_policy``, ...).  At most
+    ``max_resident`` engines, and when set ``max_resident_clusters`` clusters
+    in total, stay in memory; the least recently used engines beyond that
+    are written to ``spill_dir`` as :meth:`DrainEngine.to_state` snapshots
+    and restored transparently on their next line.  Spilling is lossless:
+    a restored engine continues exactly where it left off.
+    """
+
+    def __init__(
+        self,
+        mask_resolver: Callable[[str], Sequence[Mask]],
+        spill_dir: Path,
+        max_resident: int = 64,
+        max_resident_clusters: Optional[int] = None,
+        engine_options: Optional[Dict[str, Any]] = None,
+    ):
+        if max_resident < 1:
+            raise ValueError(f"max_resident must be positive, got {max_resident}")
+        self.mask_resolver = mask_resolver
+        self.spill_dir = Path(spill_dir)
+        self.max_resident = max_resident
+        self.max_resident_clusters = max_resident_clusters
+        self.engine_options = dict(engine_options or {})
+        self.appliers = MaskApplierRegistry()
+        self.stats = PoolStats()
+        self._resident: "OrderedDict[str, DrainEngine]" = OrderedDict()
+        self._spilled: Dict[str, Path] = {}
+        # Last seen cluster count of each resident engine and their running sum,
+        # so the cluster cap is checked without visiting every engine.
+        self._cluster_counts: Dict[str, int] = {}
+        self._resident_clusters = 0
+
+    def __contains__(self, source: str) -> bool:
+        return source in self._resident or source in self._spilled
+
+    def sources(self) -> List[str]:
+        return sorted(set(self._resident) | set(self._spilled))
+
+    @property
+    def resident(self) -> List[str]:
+        """Sources currently held in memory, least recently used first."""
+
+        return list(self._resident)
+
+    def engine(self, source: str) -> DrainEngine:
+        """Return the engine for ``source``, restoring or creating it as needed."""
+
+        engine = self._resident.get(source)
+        if engine is not None:
+            self._resident.move_to_end(source)
+            self._track(source, engine)
+            return engine
+        path = self._spilled.pop(source, None)
+        if path is not None:
+            state = json.loads(path.read_text(encoding="utf-8"))
+            masks = [Mask.from_dict(entry) for entry in state.get("masks", [])]
+            engine = DrainEngine.from_state(state, applier=self.appliers.get(masks))
+            path.unlink()
+            self.stats.restored += 1
+        else:
+            masks = list(self.mask_resolver(source))
+            engine = DrainEngine(masks=masks, applier=self.appliers.get(masks), **self.engine_options)
+            self.stats.created += 1
+        self._resident[source] = engine
+        self._track(source, engine)
+        self._enforce_cap(keep=source)
+        return engine
+
+    def add_log(
+        self, source: str, line: str, count: int = 1, timestamp: Optional[float] = None
+    ) -> DrainCluster:
+        engine = self.engine(source)
+        cluster = engine.add_log(line, count, timestamp)
+        if self.max_resident_clusters is not None:
+            self._track(source, engine)
+            self._enforce_cap(keep=source)
+        return cluster
+
+    def parse(self, records: Iterable[Tuple[str, str]]) -> List[str]:
+        """Parse ``(source, line)`` records in order; one template per record."""
+
+        return [self.add_log(source, line).template_str() for source, line in records]
+
+    def _spill_path(self, source: str) -> Path:
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+        return self.spill_dir / f"{_UNSAFE_CHARS.sub('_', source)[:64]}-{digest}.json"
+
+    def _track(self, source: str, engine: DrainEngine) -> None:
+        count = engine.cluster_count
+        self._resident_clusters += count - self._cluster_counts.get(source, 0)
+        self._cluster_counts[source] = count
+
+    def _over_cap(self) -> bool:
+        if len(self._resident) > self.max_resident:
+            return True
+        return self.max_resident_clusters is not None and self._resident_clusters > self.max_resident_clusters
+
+    def _enforce_cap(self, keep: str) -> None:
+        while self._over_cap():
+            victim = next(iter(self._resident))
+            if victim == keep:
+                break  # a single engine larger than the cap stays resident
+            self.spill(victim)
+
+    def spill(self, source: str) -> None:
+        """Write ``source``'s engine to disk and drop it from memory."""
+
+        engine = self._resident.pop(source)
+        self._resident_clusters -= self._cluster_counts.pop(source)
+        path = self._spill_path(source)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(engine.to_state()), encoding="utf-8")
+        os.replace(tmp_path, path)
+        self._spilled[source] = path
+        self.stats.spilled += 1
+        LOGGER.debug("Spilled engine for %s (%d clusters) to %s", source, engine.cluster_count, path)
+
+    def spill_all(self) -> None:
+        for source in list(self._resident):
+            self.spill(source)
+
+    def discard_spilled(self) -> None:
+        """Delete every spilled snapshot, forgetting those sources' engines."""
+
+        for path in self._spilled.values():
+            path.unlink(missing_ok=True)
+        self._spilled.clear()
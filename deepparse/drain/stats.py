@@ -0,0 +1,293 @@
+"""Time-windowed template frequency statistics with bounded memory."""
+from __future__ import annotations
+
+import heapq
+import re
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+TIMESTAMP_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})")
+_PRIME = (1 << 61) - 1
+_HASH_SEEDS = [(0x9E3779B97F4A7C15 + 2 * i + 1, 0xBF58476D1CE4E5B9 + 7 * i) for i in range(16)]
+
+
+def line_timestamp(line: str) -> Optional[float]:
+    """Epoch seconds (UTC) of the first ``YYYY-MM-DD HH:MM:SS`` in ``line``."""
+
+    match = TIMESTAMP_PATTERN.search(line)
+    if match is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(f"{match.group(1)}T{match.group(2)}")
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=timezone.utc).timestamp()
+
+
+def line_clock(lines: Sequence[str]) -> Iterator[float]:
+    """One timestamp per line on a single clock chosen for the whole of ``lines``.
+
+    When any line carries a timestamp, lines without one inherit the previous
+    timestamp (leading ones the first); otherwise the line number is the
+    clock.  Clocks are never mixed, so untimestamped lines cannot land in
+    windows near the epoch.
+    """
+
+    timestamp = next((ts for ts in map(line_timestamp, lines) if ts is not None), None)
+    if timestamp is None:
+        yield from map(float, range(len(lines)))
+        return
+    for line in lines:
+        parsed = line_timestamp(line)
+        timestamp = timestamp if parsed is None else parsed
+        yield timestamp
+
+
+class CountMinSketch:
+    """Count-Min sketch over integer keys; estimates never undercount."""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        if width < 1 or not 1 <= depth <= len(_HASH_SEEDS):
+            raise ValueError(f"Invalid sketch shape {width}x{depth}")
+        self.width = width
+        self.depth = depth
+        self._rows = [array("q", bytes(8 * width)) for _ in range(depth)]
+
+    def _columns(self, key: int) -> Iterable[Tuple[array, int]]:
+        for row, (a, b) in zip(self._rows, _HASH_SEEDS):
+            yield row, ((a * key + b) % _PRIME) % self.width
+
+    def add(self, key: int, count: int = 1) -> None:
+        for row, column in self._columns(key):
+            row[column] += count
+
+    def estimate(self, key: int) -> int:
+        return min(row[column] for row, column in self._columns(key))
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary tracking at most ``capacity`` keys.
+
+    A new key replaces the tracked key with the smallest count and inherits
+    that count as its error, so tracked counts overestimate by at most
+    ``error`` and untracked keys occurred at most :meth:`min_count` times.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts: Dict[int, int] = {}
+        self.errors: Dict[int, int] = {}
+        # Lazy min-heap: counts only grow, so stale entries are skipped on pop.
+        self._heap: List[Tuple[int, int]] = []
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.counts
+
+    def add(self, key: int, count: int = 1) -> None:
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            floor = self._pop_min()
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(value, item) for item, value in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, key: int) -> int:
+        """Stop tracking ``key`` and return its count (0 when untracked)."""
+
+        self.errors.pop(key, None)
+        return self.counts.pop(key, 0)  # its heap entries go stale and are skipped
+
+    def _pop_min(self) -> int:
+        while True:
+            value, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == value:
+                del self.counts[key]
+                del self.errors[key]
+                return value
+
+    def min_count(self) -> int:
+        if len(self.counts) < self.capacity:
+            return 0
+        while self.counts.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0]
+
+
+class _Window:
+    """Counts for one time window: exact until the budget, then sketched."""
+
+    __slots__ = ("start", "total", "exact", "top", "sketch")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.total = 0
+        self.exact: Optional[Dict[int, int]] = {}
+        self.top: Optional[SpaceSaving] = None
+        self.sketch: Optional[CountMinSketch] = None
+
+    def add(self, key: int, count: int, budget: int, width: int, depth: int) -> None:
+        self.total += count
+        if self.exact is not None:
+            if key in self.exact or len(self.exact) < budget:
+                self.exact[key] = self.exact.get(key, 0) + count
+                return
+            self.top, self.sketch = SpaceSaving(budget), CountMinSketch(width, depth)
+            for item, value in self.exact.items():
+                self.top.add(item, value)
+                self.sketch.add(item, value)
+            self.exact = None
+        self.top.add(key, count)
+        self.sketch.add(key, count)
+
+    def merge(self, old: int, new: int, budget: int, width: int, depth: int) -> None:
+        """Move ``old``'s count to ``new``; sketched windows keep over-estimating."""
+
+        if self.exact is not None:
+            count = self.exact.pop(old, 0)
+        else:
+            count = self.top.discard(old) if old in self.top else self.estimate(old)
+        if count:
+            self.total -= count
+            self.add(new, count, budget, width, depth)
+
+    def estimate(self, key: int) -> int:
+        if self.exact is not None:
+            return self.exact.get(key, 0)
+        if key in self.top:
+            return self.top.counts[key]
+        return min(self.sketch.estimate(key), self.top.min_count())
+
+    def keys(self) -> Iterable[int]:
+        return self.exact.keys() if self.exact is not None else self.top.counts.keys()
+
+
+@dataclass
+class TemplateRate:
+    template_id: int
+    count: int
+    per_second: float
+
+
+class WindowedTemplateStats:
+    """Per-template counts over tumbling windows of ``window_seconds``.
+
+    Only the latest ``max_windows`` windows are kept.  Each window counts
+    templates exactly until it has seen ``exact_budget`` distinct ones, then
+    switches to a Space-Saving summary of ``exact_budget`` heavy hitters
+    backed by a ``sketch_width`` x ``sketch_depth`` Count-Min sketch, so
+    memory stays bounded however many templates a stream produces.  Counts
+    from sketched windows are upper-bound estimates (see :meth:`is_exact`).
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 3600.0,
+        max_windows: int = 24,
+        exact_budget: int = 10000,
+        sketch_width: int = 2048,
+        sketch_depth: int = 4,
+        clock: Callable[[], float] = time.time,
+    ):
+        if window_seconds <= 0 or max_windows < 1 or exact_budget < 1:
+            raise ValueError("window_seconds, max_windows and exact_budget must be positive")
+        self.window_seconds = window_seconds
+        self.max_windows = max_windows
+        self.exact_budget = exact_budget
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.clock = clock
+        self._windows: "OrderedDict[int, _Window]" = OrderedDict()
+
+    def record(self, template_id: int, count: int = 1, timestamp: Optional[float] = None) -> None:
+        timestamp = self.clock() if timestamp is None else timestamp
+        slot = int(timestamp // self.window_seconds)
+        window = self._windows.get(slot)
+        if window is None:
+            if len(self._windows) >= self.max_windows and slot < next(iter(self._windows)):
+                return  # older than everything retained and no room left
+            newest = next(reversed(self._windows), None)
+            window = self._windows[slot] = _Window(slot * self.window_seconds)
+            if newest is not None and slot < newest:
+                self._windows = OrderedDict(sorted(self._windows.items()))
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        window.add(template_id, count, self.exact_budget, self.sketch_width, self.sketch_depth)
+
+    def merge(self, old_id: int, new_id: int) -> None:
+        """Fold every count recorded for ``old_id`` into ``new_id`` (see :meth:`DrainEngine.compact`)."""
+
+        for window in self._windows.values():
+            window.merge(old_id, new_id, self.exact_budget, self.sketch_width, self.sketch_depth)
+
+    def windows(self) -> List[float]:
+        """Start times of the retained windows, oldest first."""
+
+        return [window.start for window in self._windows.values()]
+
+    def _latest(self, last: Optional[int]) -> List[_Window]:
+        windows = list(self._windows.values())
+        return windows if last is None else windows[-last:] if last > 0 else []
+
+    def is_exact(self, last: Optional[int] = None) -> bool:
+        return all(window.exact is not None for window in self._latest(last))
+
+    def count(self, template_id: int, last: Optional[int] = None) -> int:
+        """Occurrences of ``template_id`` in the latest ``last`` windows (all when ``None``)."""
+
+        return sum(window.estimate(template_id) for window in self._latest(last))
+
+    def total(self, last: Optional[int] = None) -> int:
+        return sum(window.total for window in self._latest(last))
+
+    def top_k(self, k: int = 10, last: Optional[int] = None) -> List[Tuple[int, int]]:
+        """The ``k`` most frequent templates over the latest ``last`` windows."""
+
+        windows = self._latest(last)
+        candidates = set()
+        for window in windows:
+            candidates.update(window.keys())
+        totals = ((key, sum(window.estimate(key) for window in windows)) for key in candidates)
+        return heapq.nsmallest(k, totals, key=lambda item: (-item[1], item[0]))
+
+    def rate(self, template_id: int, last: int = 1) -> TemplateRate:
+        """Average occurrences per second of ``template_id`` over ``last`` full window spans."""
+
+        windows = self._latest(last)
+        count = sum(window.estimate(template_id) for window in windows)
+        span = max(1, len(windows)) * self.window_seconds
+        return TemplateRate(template_id, count, count / span)
+
+    def spikes(self, factor: float = 3.0, min_count: int = 10) -> List[Tuple[int, int, float]]:
+        """Templates whose latest-window count exceeds ``factor`` x their earlier mean.
+
+        Returns ``(template_id, latest_count, baseline_mean)`` sorted by the
+        size of the jump.  Templates unseen before count against a baseline
+        of one occurrence per window.
+        """
+
+        windows = list(self._windows.values())
+        if not windows:
+            return []
+        latest, history = windows[-1], windows[:-1]
+        found = []
+        for key in latest.keys():
+            current = latest.estimate(key)
+            if current < min_count:
+                continue
+            baseline = sum(window.estimate(key) for window in history) / max(1, len(history))
+            if current > factor * max(baseline, 1.0):
+                found.append((key, current, baseline))
+        return sorted(found, key=lambda item: (-(item[1] / max(item[2], 1.0)), item[0]))
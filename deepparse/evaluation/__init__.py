@@ -1,6 +1,7 @@
 """Evaluation helpers."""
 
 from .eval_runner import EvaluationRunner
+from .memory_bench import run_memory_benchmark
 from .timing_bench import run_timing_benchmark
 
-__all__ = ["EvaluationRunner", "run_timing_benchmark"]
+__all__ = ["EvaluationRunner", "run_memory_benchmark", "run_timing_benchmark"]
@@ -0,0 +1,183 @@
+"""Append-only benchmark history and noise-aware run comparison."""
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from ..logging_utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+HISTORY_VERSION = 1
+
+
+def git_revision(cwd: Optional[Path] = None) -> str:
+    """Short revision of the working tree, suffixed with ``-dirty`` when modified."""
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty else revision
+
+
+def cpu_info() -> Dict[str, Any]:
+    model = platform.processor()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("model name"):
+                    model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {"model": model or platform.machine(), "count": os.cpu_count()}
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu": cpu_info(),
+    }
+
+
+def new_run_id() -> str:
+    return time.strftime("%Y%m%dT%H%M%S") + f"-{git_revision()}"
+
+
+def append_run(
+    history_path: Path,
+    run_id: str,
+    dataset: str,
+    n_logs: int,
+    stages: Mapping[str, Sequence[float]],
+    config: Mapping[str, Any],
+) -> Dict[str, Any]:
+    """Append one dataset's stage timings for ``run_id`` to the JSONL history."""
+
+    record = {
+        "version": HISTORY_VERSION,
+        "run_id": run_id,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "dataset": dataset,
+        "n_logs": n_logs,
+        "config": dict(config),
+        "environment": environment_info(),
+        "stages": {stage: list(samples) for stage, samples in stages.items()},
+    }
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with history_path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+    LOGGER.info("Recorded benchmark run %s for %s in %s", run_id, dataset, history_path)
+    return record
+
+
+def load_runs(history_path: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Group history records by run id, preserving the order runs were first seen."""
+
+    runs: Dict[str, List[Dict[str, Any]]] = {}
+    if not history_path.exists():
+        return runs
+    with history_path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                record = json.loads(line)
+                runs.setdefault(record["run_id"], []).append(record)
+    return runs
+
+
+def relative_noise(samples: Sequence[float]) -> float:
+    """Robust relative spread (scaled MAD over median) of repeated timings."""
+
+    if len(samples) < 2:
+        return 0.0
+    median = statistics.median(samples)
+    if median <= 0:
+        return 0.0
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    return 1.4826 * mad / median
+
+
+@dataclass
+class StageComparison:
+    dataset: str
+    stage: str
+    baseline_seconds: float
+    candidate_seconds: float
+    speedup: float
+    threshold: float
+    verdict: str
+
+
+def compare_runs(
+    baseline: Sequence[Mapping[str, Any]],
+    candidate: Sequence[Mapping[str, Any]],
+    *,
+    min_threshold: float = 0.05,
+    noise_factor: float = 3.0,
+) -> List[StageComparison]:
+    """Compare median stage timings of two runs for every shared dataset/stage.
+
+    A change is significant when the relative difference exceeds both
+    ``min_threshold`` and ``noise_factor`` times the combined relative noise
+    of the two sample sets.  ``speedup`` is baseline over candidate time, so
+    values below one are slowdowns.
+    """
+
+    baseline_by_dataset = {record["dataset"]: record for record in baseline}
+    comparisons: List[StageComparison] = []
+    for record in candidate:
+        reference = baseline_by_dataset.get(record["dataset"])
+        if reference is None:
+            continue
+        for stage, samples in record["stages"].items():
+            reference_samples = reference["stages"].get(stage)
+            if not reference_samples or not samples:
+                continue
+            old = statistics.median(reference_samples)
+            new = statistics.median(samples)
+            noise = math.hypot(relative_noise(reference_samples), relative_noise(samples))
+            threshold = max(min_threshold, noise_factor * noise)
+            change = (new - old) / old if old > 0 else 0.0
+            if change > threshold:
+                verdict = "regression"
+            elif change < -threshold:
+                verdict = "improvement"
+            else:
+                verdict = "unchanged"
+            comparisons.append(
+                StageComparison(
+                    dataset=record["dataset"],
+                    stage=stage,
+                    baseline_seconds=old,
+                    candidate_seconds=new,
+                    speedup=old / new if new > 0 else float("inf"),
+                    threshold=threshold,
+                    verdict=verdict,
+                )
+            )
+    return comparisons
@@ -5,40 +5,42 @@ import csv
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
-from ..dataset_loader import Dataset, load_dataset
+from ..dataset_catalog import DatasetCatalog
+from ..dataset_loader import Dataset
 from ..drain.drain_engine import DrainEngine
 from ..logging_utils import get_logger
 from ..masks_types import Mask
-from ..metrics import grouping_accuracy, parsing_accuracy
+from ..ground_truth import load_ground_truth
+from ..metrics import OnlineAccuracy, normalize_template
 from ..tokenize import mask_tokens, tokenize
 from ..utils.regex_library import validate_regexes
 from ..seeds import resolve_seed, set_global_seed
 from ..io_paths import build_paths
 from ..synth import synthesize_masks
+from ..token_cache import TokenStreamCache
 from ..utils.yaml_loader import load_yaml
 
 LOGGER = get_logger(__name__)
 
 
-def _load_masks(path: Path) -> List[Mask]:
+def load_masks(path: Path) -> List[Mask]:
+    """Read and validate a mask bundle JSON file."""
+
     data = json.loads(path.read_text(encoding="utf-8"))
     masks = [Mask(**entry) for entry in data]
     validate_regexes([mask.pattern for mask in masks])
     return masks
 
 
-def _ground_truth_templates(dataset: Dataset) -> List[str]:
-    templates = []
+def _iter_ground_truth_templates(dataset: Dataset) -> Iterator[str]:
     for line in dataset.logs:
-        tokens = mask_tokens(tokenize(line))
-        templates.append(" ".join(tokens))
-    return templates
+        yield " ".join(mask_tokens(tokenize(line)))
 
 
-def _group_ids(templates: Sequence[str]) -> List[str]:
-    return [str(hash(template)) for template in templates]
+def _ground_truth_templates(dataset: Dataset) -> List[str]:
+    return list(_iter_ground_truth_templates(dataset))
 
 
 @dataclass
@@ -72,6 +74,11 @@ class EvaluationRunner:
         self.mode = base_data.get("mode", "offline")
         self.k = int(base_data.get("k", 50))
         self.strict = bool(base_data.get("strict", False))
+        cache_dir = base_data.get("cache_dir")
+        self.token_cache = TokenStreamCache(Path(cache_dir)) if cache_dir else None
+        self.catalog = DatasetCatalog(self.paths)
+        self.load_workers = int(base_data.get("load_workers", 4))
+        self.progress_every = int(base_data.get("eval_progress_every", 0))
 
     def _ensure_masks(self, dataset: Dataset) -> Path:
         mask_path = self.paths.mask_dir / f"{dataset.name}.json"
@@ -80,21 +87,76 @@ class EvaluationRunner:
             synthesize_masks(dataset, self.k, mask_path, mode=self.mode, strict=self.strict)
         return mask_path
 
-    def evaluate_dataset(self, dataset_name: str) -> Dict[str, float]:
-        dataset = load_dataset(dataset_name, self.paths)
+    def evaluate_dataset(self, dataset_name: str, dataset: Optional[Dataset] = None) -> Dict[str, float]:
+        """Score one dataset against LogHub labels when present, else derived templates.
+
+        With ``*_structured.csv`` labels GA is the partition-based LogPAI
+        metric over EventIds and PA compares templates after
+        :func:`normalize_template`, since LogHub writes every parameter as
+        ``<*>`` where DeepParse keeps token classes; without labels the
+        tokenised-log templates are used as before.  Lines are scored as they are parsed, so neither the
+        predicted nor the true templates are held as lists.
+        """
+
+        dataset = dataset or self.catalog.load(dataset_name)
         mask_path = self._ensure_masks(dataset)
-        masks = _load_masks(mask_path)
+        masks = load_masks(mask_path)
         engine = DrainEngine(masks=masks)
-        predicted = engine.parse(dataset.logs)
-        ground_truth = _ground_truth_templates(dataset)
-        ga = grouping_accuracy(_group_ids(ground_truth), _group_ids(predicted))
-        pa = parsing_accuracy(ground_truth, predicted)
+        labels = load_ground_truth(dataset.path, dataset.name)
+        accuracy = OnlineAccuracy("exact" if labels is None else "partition")
+        if labels is not None and len(labels) != len(dataset.logs):
+            raise ValueError(
+                f"Ground truth for {dataset_name} has {len(labels)} lines but the dataset has {len(dataset.logs)}"
+            )
+        streams = []
+        try:
+            if self.token_cache is None:
+                predicted = (engine.add_log(line).template_str() for line in dataset.logs)
+                if labels is None:
+                    truths: Iterable[str] = _iter_ground_truth_templates(dataset)
+            else:
+                checksum = dataset.checksum
+                streams.append(self.token_cache.load(dataset, masks, checksum))
+                predicted = (engine.add_tokens(tokens).template_str() for tokens in streams[0])
+                if labels is None:
+                    streams.append(self.token_cache.load(dataset, [], checksum))
+                    truths = (" ".join(tokens) for tokens in streams[1])
+            if labels is not None:
+                templates = [normalize_template(template) for template in labels.templates]
+                normalized: Dict[str, str] = {}
+                for code, template in zip(labels.codes, predicted):
+                    # Few distinct templates repeat across many lines; normalise each once.
+                    norm = normalized.get(template)
+                    if norm is None:
+                        norm = normalized[template] = normalize_template(template)
+                    accuracy.add(code, template, templates[code], predicted_template=norm)
+                    self._report_progress(dataset_name, accuracy)
+            else:
+                for truth, template in zip(truths, predicted):
+                    accuracy.add(truth, template)
+                    self._report_progress(dataset_name, accuracy)
+        finally:
+            for stream in streams:
+                stream.close()
+        ga, pa = accuracy.GA, accuracy.PA
         LOGGER.info("Dataset %s: GA=%.3f PA=%.3f", dataset_name, ga, pa)
         return {"dataset": dataset_name, "method": "DeepParse", "GA": ga, "PA": pa}
 
+    def _report_progress(self, dataset_name: str, accuracy: OnlineAccuracy) -> None:
+        if self.progress_every and accuracy.lines % self.progress_every == 0:
+            LOGGER.info(
+                "Dataset %s: %d lines, running GA=%.3f PA=%.3f",
+                dataset_name,
+                accuracy.lines,
+                accuracy.GA,
+                accuracy.PA,
+            )
+
     def run(self) -> List[Dict[str, float | str]]:
         set_global_seed(self.seed)
-        rows = [self.evaluate_dataset(name) for name in self.config.datasets]
+        # Upcoming datasets are read (and their manifests checked) while the current one is parsed.
+        datasets = self.catalog.iter_load(self.config.datasets, self.load_workers)
+        rows = [self.evaluate_dataset(dataset.name, dataset) for dataset in datasets]
         if rows:
             ga_avg = sum(row["GA"] for row in rows) / len(rows)
             pa_avg = sum(row["PA"] for row in rows) / len(rows)
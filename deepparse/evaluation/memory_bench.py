@@ -0,0 +1,175 @@
+"""Memory benchmark harness for loading, masking, clustering and metrics."""
+from __future__ import annotations
+
+import csv
+import gc
+import itertools
+import sys
+import tracemalloc
+from array import array
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from ..drain.drain_engine import DrainEngine
+from ..io_paths import PathConfig
+from ..logging_utils import get_logger
+from ..metrics import grouping_accuracy, parsing_accuracy, template_group_ids
+from ..tokenize import mask_tokens, tokenize
+from .eval_runner import load_masks
+
+try:  # ``resource`` is POSIX only
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+LOGGER = get_logger(__name__)
+
+STAGES = ("load", "mask", "cluster", "metrics")
+_IGNORE_TRACEMALLOC = [tracemalloc.Filter(False, tracemalloc.__file__)]
+T = TypeVar("T")
+
+
+@dataclass
+class MemoryResult:
+    dataset: str
+    n_logs: int
+    stage: str
+    retained_bytes: int
+    peak_bytes: int
+    peak_rss_bytes: int
+    bytes_per_line: float
+    clusters: int
+    bytes_per_cluster: float
+    top_allocation: str
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process (0 when unavailable)."""
+
+    if resource is None:  # pragma: no cover - Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux and the BSDs report KiB.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(stage: Callable[[], T]) -> Tuple[T, int, int, str]:
+    """Run ``stage`` under tracemalloc; return its result, retained and peak bytes, top site."""
+
+    gc.collect()
+    tracemalloc.reset_peak()
+    before_snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORE_TRACEMALLOC)
+    before, _ = tracemalloc.get_traced_memory()
+    result = stage()
+    current, peak = tracemalloc.get_traced_memory()
+    after_snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORE_TRACEMALLOC)
+    diff = after_snapshot.compare_to(before_snapshot, "lineno")
+    top = ""
+    if diff:
+        frame = diff[0].traceback[0]
+        top = f"{Path(frame.filename).name}:{frame.lineno}"
+    return result, current - before, peak - before, top
+
+
+def _read_lines(path: Path, n: int) -> List[str]:
+    with path.open("r", encoding="utf-8") as fh:
+        stripped = (line.strip() for line in fh)
+        return list(itertools.islice((line for line in stripped if line), n))
+
+
+def _preprocess_all(engine: DrainEngine, logs: Sequence[str]) -> List[List[str]]:
+    return [engine.preprocess(line) for line in logs]
+
+
+def _cluster_all(engine: DrainEngine, corpus: Sequence[Sequence[str]]) -> array:
+    # Only the cluster id of each line is kept, so the stage retains the engine plus 4 bytes/line.
+    return array("i", (engine.add_tokens(tokens).cluster_id for tokens in corpus))
+
+
+def _score(engine: DrainEngine, logs: Sequence[str], cluster_ids: Sequence[int]) -> Tuple[float, float]:
+    templates = {
+        cluster.cluster_id: cluster.template_str() for bucket in engine.clusters.values() for cluster in bucket
+    }
+    predicted = [templates[cluster_id] for cluster_id in cluster_ids]
+    truth = [" ".join(mask_tokens(tokenize(line))) for line in logs]
+    return (
+        grouping_accuracy(template_group_ids(truth), template_group_ids(predicted)),
+        parsing_accuracy(truth, predicted),
+    )
+
+
+def run_memory_benchmark(
+    dataset_name: str,
+    paths: PathConfig,
+    mask_path: Path,
+    sizes: Sequence[int],
+    output_csv: Optional[Path] = None,
+) -> List[MemoryResult]:
+    """Measure memory per pipeline stage at several corpus sizes.
+
+    Each size is processed from scratch.  ``retained_bytes`` is what a stage
+    still holds when it finishes (for example the engine after clustering),
+    ``peak_bytes`` the transient high-water mark above the stage's starting
+    point, both as seen by :mod:`tracemalloc`.  ``peak_rss_bytes`` is the
+    process-wide peak RSS so far and therefore only grows across rows.  The
+    cluster stage's ``retained_bytes`` excludes the per-line cluster-id array
+    it hands to the metrics stage, so ``bytes_per_cluster`` is the engine's.
+    Metrics score each line against its cluster's final template.
+    """
+
+    masks = load_masks(mask_path)
+    raw_path = paths.dataset_dir / dataset_name / "raw.log"
+    if not raw_path.exists():
+        raise FileNotFoundError(f"Expected file raw.log in {raw_path.parent}")
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    results: List[MemoryResult] = []
+    try:
+        for size in sizes:
+            logs, *load_stats = _measure(partial(_read_lines, raw_path, size))
+            engine = DrainEngine(masks=masks)
+            corpus, *mask_stats = _measure(partial(_preprocess_all, engine, logs))
+            cluster_ids, *cluster_stats = _measure(partial(_cluster_all, engine, corpus))
+            cluster_stats[0] -= sys.getsizeof(cluster_ids)
+            _, *metric_stats = _measure(partial(_score, engine, logs, cluster_ids))
+            clusters = engine.cluster_count
+            rss = peak_rss_bytes()
+            stage_stats = (load_stats, mask_stats, cluster_stats, metric_stats)
+            for stage, (retained, peak, top) in zip(STAGES, stage_stats):
+                results.append(
+                    MemoryResult(
+                        dataset=dataset_name,
+                        n_logs=len(logs),
+                        stage=stage,
+                        retained_bytes=retained,
+                        peak_bytes=peak,
+                        peak_rss_bytes=rss,
+                        bytes_per_line=retained / max(1, len(logs)),
+                        clusters=clusters,
+                        bytes_per_cluster=retained / max(1, clusters) if stage == "cluster" else 0.0,
+                        top_allocation=top,
+                    )
+                )
+            LOGGER.info(
+                "Memory benchmark for %s at %d logs: cluster stage retains %d bytes (%d clusters)",
+                dataset_name,
+                len(logs),
+                cluster_stats[0],
+                clusters,
+            )
+            del logs, corpus, cluster_ids, engine
+    finally:
+        if not started:
+            tracemalloc.stop()
+
+    if output_csv is not None:
+        output_csv.parent.mkdir(parents=True, exist_ok=True)
+        with output_csv.open("w", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(MemoryResult.__dataclass_fields__))
+            writer.writeheader()
+            for result in results:
+                writer.writerow(asdict(result))
+    return results
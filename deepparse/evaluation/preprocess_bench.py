@@ -0,0 +1,68 @@
+"""Benchmark of fused preprocessing against the original two-stage path."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Sequence
+
+from ..drain.masks_application import MaskApplier
+from ..logging_utils import get_logger
+from ..masks_types import Mask
+from ..tokenize import TOKEN_CLASS_CACHE, mask_tokens_reference, preprocess_line, tokenize
+
+LOGGER = get_logger(__name__)
+
+
+@dataclass
+class PreprocessBenchResult:
+    dataset: str
+    n_logs: int
+    two_stage_seconds: float
+    fused_seconds: float
+    speedup: float
+    identical: bool
+
+
+def two_stage_preprocess(line: str, applier: MaskApplier) -> List[str]:
+    """The original pipeline: mask the line, split it, then try every class per token."""
+
+    return mask_tokens_reference(tokenize(applier.apply(line)))
+
+
+def _best_of(repeats: int, run: Callable[[], List[List[str]]]) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        TOKEN_CLASS_CACHE.clear()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_preprocess_benchmark(
+    dataset_name: str, logs: Sequence[str], masks: Sequence[Mask], repeats: int = 3
+) -> PreprocessBenchResult:
+    """Time both preprocessing paths over ``logs`` (best of ``repeats``, cold token cache).
+
+    Raises ``ValueError`` if the fused output differs from the two-stage one.
+    """
+
+    applier = MaskApplier(masks)
+    expected = [two_stage_preprocess(line, applier) for line in logs]
+    TOKEN_CLASS_CACHE.clear()
+    identical = [preprocess_line(line, applier) for line in logs] == expected
+    if not identical:
+        raise ValueError(f"Fused preprocessing diverged from the two-stage path on {dataset_name}")
+    two_stage = _best_of(repeats, lambda: [two_stage_preprocess(line, applier) for line in logs])
+    fused = _best_of(repeats, lambda: [preprocess_line(line, applier) for line in logs])
+    LOGGER.info(
+        "Preprocessing %s (%d logs): two-stage %.4fs, fused %.4fs", dataset_name, len(logs), two_stage, fused
+    )
+    return PreprocessBenchResult(
+        dataset=dataset_name,
+        n_logs=len(logs),
+        two_stage_seconds=two_stage,
+        fused_seconds=fused,
+        speedup=two_stage / fused if fused > 0 else float("inf"),
+        identical=identical,
+    )
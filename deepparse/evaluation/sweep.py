@@ -0,0 +1,112 @@
+"""Hyperparameter sweeps over Drain settings with shared preprocessing."""
+from __future__ import annotations
+
+import csv
+import itertools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from ..drain.drain_engine import DrainEngine
+from ..logging_utils import get_logger
+from ..masks_types import Mask
+from ..metrics import grouping_accuracy, parsing_accuracy, template_group_ids
+
+LOGGER = get_logger(__name__)
+
+TokenCorpus = Sequence[Tuple[str, ...]]
+
+# Populated in the parent before workers start so forked workers inherit the
+# preprocessed corpus copy-on-write instead of receiving it through pickling.
+_SHARED: Optional[Tuple[TokenCorpus, Sequence[str]]] = None
+
+
+@dataclass
+class SweepResult:
+    depth: int
+    similarity_threshold: float
+    GA: float
+    PA: float
+    templates: int
+    seconds: float
+    lines_per_second: float
+
+
+def preprocess_corpus(logs: Sequence[str], masks: Sequence[Mask]) -> TokenCorpus:
+    """Mask and tokenise every line once; the result is independent of Drain settings."""
+
+    engine = DrainEngine(masks=masks)
+    return [tuple(engine.preprocess(line)) for line in logs]
+
+
+def _evaluate_setting(setting: Tuple[int, float]) -> SweepResult:
+    assert _SHARED is not None, "sweep worker started without a shared corpus"
+    corpus, ground_truth = _SHARED
+    depth, threshold = setting
+    engine = DrainEngine(depth=depth, similarity_threshold=threshold)
+    start = time.perf_counter()
+    predicted = engine.parse_tokens(corpus)
+    elapsed = time.perf_counter() - start
+    return SweepResult(
+        depth=depth,
+        similarity_threshold=threshold,
+        GA=grouping_accuracy(template_group_ids(ground_truth), template_group_ids(predicted)),
+        PA=parsing_accuracy(ground_truth, predicted),
+        templates=len(set(predicted)),
+        seconds=elapsed,
+        lines_per_second=len(corpus) / elapsed if elapsed > 0 else float("inf"),
+    )
+
+
+def _install_shared(shared: Optional[Tuple[TokenCorpus, Sequence[str]]]) -> None:
+    global _SHARED
+    _SHARED = shared
+
+
+def run_sweep(
+    corpus: TokenCorpus,
+    ground_truth: Sequence[str],
+    depths: Sequence[int],
+    thresholds: Sequence[float],
+    workers: int = 0,
+) -> List[SweepResult]:
+    """Evaluate every ``(depth, threshold)`` pair over one preprocessed corpus.
+
+    ``workers <= 1`` runs in-process.  Otherwise settings are spread over a
+    process pool; with the ``fork`` start method the corpus is shared with the
+    workers rather than copied per task.
+    """
+
+    if len(corpus) != len(ground_truth):
+        raise ValueError("Corpus and ground truth lengths differ")
+    settings = list(itertools.product(depths, thresholds))
+    _install_shared((corpus, ground_truth))
+    try:
+        if workers <= 1:
+            return [_evaluate_setting(setting) for setting in settings]
+        methods = multiprocessing.get_all_start_methods()
+        if "fork" in methods:
+            context = multiprocessing.get_context("fork")
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        else:  # pragma: no cover - platforms without fork pickle the corpus once per worker
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_install_shared, initargs=((corpus, ground_truth),)
+            )
+        with pool:
+            return list(pool.map(_evaluate_setting, settings))
+    finally:
+        _install_shared(None)
+
+
+def write_sweep_csv(dataset: str, results: Sequence[SweepResult], output_csv: Path) -> None:
+    output_csv.parent.mkdir(parents=True, exist_ok=True)
+    fieldnames = ["dataset"] + list(SweepResult.__dataclass_fields__)
+    with output_csv.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fieldnames)
+        writer.writeheader()
+        for result in results:
+            writer.writerow({"dataset": dataset, **asdict(result)})
+    LOGGER.info("Wrote %d sweep rows for %s to %s", len(results), dataset, output_csv)
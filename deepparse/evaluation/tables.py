@@ -76,3 +76,12 @@ def build_tables(csv_paths: Iterable[Path], output_dir: Path) -> None:
                     writer.writeheader()
                     writer.writerows(rows)
                 LOGGER.info("Generated Table II from %s", csv_path)
+        if "peak_bytes" in headers and "stage" in headers:
+            latex = _latex_table(rows, "Table III: Memory Benchmark", "tab:memory")
+            if latex:
+                (output_dir / "table_III.tex").write_text(latex, encoding="utf-8")
+                with (output_dir / "table_III_memory.csv").open("w", encoding="utf-8", newline="") as fh:
+                    writer = csv.DictWriter(fh, fieldnames=list(headers))
+                    writer.writeheader()
+                    writer.writerows(rows)
+                LOGGER.info("Generated Table III from %s", csv_path)
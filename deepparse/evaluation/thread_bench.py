@@ -0,0 +1,78 @@
+"""Throughput of the concurrent Drain engine across thread counts."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from ..drain.concurrent import ConcurrentDrainEngine, gil_enabled
+from ..drain.masks_application import MaskApplier
+from ..logging_utils import get_logger
+from ..masks_types import Mask
+
+LOGGER = get_logger(__name__)
+
+
+@dataclass
+class ThreadBenchResult:
+    dataset: str
+    threads: int
+    n_logs: int
+    seconds: float
+    lines_per_second: float
+    speedup: float
+    clusters: int
+    gil_enabled: bool
+
+
+def run_thread_scaling(
+    dataset_name: str,
+    logs: Sequence[str],
+    masks: Sequence[Mask],
+    threads: Sequence[int] = (1, 2, 4),
+    repeats: int = 3,
+) -> List[ThreadBenchResult]:
+    """Time :meth:`ConcurrentDrainEngine.parse_parallel` once per thread count.
+
+    Every run starts from a fresh engine sharing one compiled mask bundle;
+    the best of ``repeats`` is kept and ``speedup`` is relative to the first
+    entry of ``threads``.  On a GIL build extra threads mostly measure lock
+    overhead; scaling shows up on free-threaded interpreters.
+    """
+
+    if not threads:
+        raise ValueError("threads must not be empty")
+    applier = MaskApplier(masks)
+    logs = list(logs)
+    gil = gil_enabled()
+    results: List[ThreadBenchResult] = []
+    for count in threads:
+        best = float("inf")
+        clusters = 0
+        for _ in range(repeats):
+            engine = ConcurrentDrainEngine(masks=masks, applier=applier)
+            start = time.perf_counter()
+            engine.parse_parallel(logs, threads=count)
+            best = min(best, time.perf_counter() - start)
+            clusters = engine.cluster_count
+        baseline = results[0].seconds if results else best
+        result = ThreadBenchResult(
+            dataset=dataset_name,
+            threads=count,
+            n_logs=len(logs),
+            seconds=best,
+            lines_per_second=len(logs) / best if best > 0 else float("inf"),
+            speedup=baseline / best if best > 0 else float("inf"),
+            clusters=clusters,
+            gil_enabled=gil,
+        )
+        LOGGER.info(
+            "Concurrent engine on %s with %d threads: %.0f lines/s (%.2fx, GIL enabled: %s)",
+            dataset_name,
+            count,
+            result.lines_per_second,
+            result.speedup,
+            gil,
+        )
+        results.append(result)
+    return results
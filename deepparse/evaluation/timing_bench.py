@@ -2,46 +2,77 @@
 from __future__ import annotations
 
 import csv
-import json
+import statistics
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from ..dataset_loader import load_dataset
 from ..drain.drain_engine import DrainEngine
 from ..io_paths import PathConfig
 from ..logging_utils import get_logger
-from ..masks_types import Mask
-from ..utils.regex_library import validate_regexes
+from ..token_cache import mask_bundle_hash
+from .bench_history import append_run, new_run_id
+from .eval_runner import load_masks
 
 LOGGER = get_logger(__name__)
 
 
-def _load_masks(path: Path) -> list[Mask]:
-    data = json.loads(path.read_text(encoding="utf-8"))
-    masks = [Mask(**entry) for entry in data]
-    validate_regexes([mask.pattern for mask in masks])
-    return masks
+TIMING_STAGES = ("preprocess", "cluster", "total")
 
 
 @dataclass
 class TimingResult:
     dataset: str
     seconds: float
+    stages: Dict[str, List[float]] = field(default_factory=dict)
+    run_id: Optional[str] = None
 
 
-def run_timing_benchmark(dataset_name: str, paths: PathConfig, mask_path: Path, n: int, output_csv: Path) -> TimingResult:
+def run_timing_benchmark(
+    dataset_name: str,
+    paths: PathConfig,
+    mask_path: Path,
+    n: int,
+    output_csv: Path,
+    repeats: int = 1,
+    history_path: Optional[Path] = None,
+    run_id: Optional[str] = None,
+) -> TimingResult:
+    """Time masking/tokenisation and clustering over the first ``n`` logs.
+
+    Each of the ``repeats`` runs uses a fresh engine.  ``output_csv`` keeps
+    the median total for Table II; when ``history_path`` is given the raw
+    samples of every stage are also appended to the benchmark history under
+    ``run_id`` (generated from the time and git revision when omitted).
+    """
+
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1")
     dataset = load_dataset(dataset_name, paths)
-    masks = _load_masks(mask_path)
-    engine = DrainEngine(masks=masks)
+    masks = load_masks(mask_path)
     sample_logs = dataset.logs[:n]
-    start = time.perf_counter()
-    engine.parse(sample_logs)
-    elapsed = time.perf_counter() - start
+    stages: Dict[str, List[float]] = {stage: [] for stage in TIMING_STAGES}
+    for _ in range(repeats):
+        engine = DrainEngine(masks=masks)
+        start = time.perf_counter()
+        corpus = [engine.preprocess(line) for line in sample_logs]
+        masked = time.perf_counter()
+        engine.parse_tokens(corpus)
+        end = time.perf_counter()
+        stages["preprocess"].append(masked - start)
+        stages["cluster"].append(end - masked)
+        stages["total"].append(end - start)
+    elapsed = statistics.median(stages["total"])
     output_csv.parent.mkdir(parents=True, exist_ok=True)
     with output_csv.open("w", encoding="utf-8", newline="") as fh:
         writer = csv.DictWriter(fh, fieldnames=["dataset", "seconds", "n_logs"])
         writer.writeheader()
         writer.writerow({"dataset": dataset_name, "seconds": elapsed, "n_logs": len(sample_logs)})
-    LOGGER.info("Timing benchmark for %s: %.4fs", dataset_name, elapsed)
-    return TimingResult(dataset=dataset_name, seconds=elapsed)
+    LOGGER.info("Timing benchmark for %s: %.4fs (median of %d)", dataset_name, elapsed, repeats)
+    if history_path is not None:
+        run_id = run_id or new_run_id()
+        config = {"n": n, "repeats": repeats, "mask_bundle": mask_bundle_hash(masks)}
+        append_run(history_path, run_id, dataset_name, len(sample_logs), stages, config)
+    return TimingResult(dataset=dataset_name, seconds=elapsed, stages=stages, run_id=run_id)
@@ -0,0 +1,12 @@
+"""Parameter extraction and columnar storage."""
+
+from .column_store import ParameterStore, ParameterStoreWriter, extract_parameters
+from .parameters import ParameterExtractor, ParameterValue
+
+__all__ = [
+    "ParameterExtractor",
+    "ParameterStore",
+    "ParameterStoreWriter",
+    "ParameterValue",
+    "extract_parameters",
+]
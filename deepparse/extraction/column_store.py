@@ -0,0 +1,239 @@
+"""Column-wise on-disk storage of extracted template parameters."""
+from __future__ import annotations
+
+import json
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from ..drain.drain_engine import DrainCluster, DrainEngine
+from ..logging_utils import get_logger
+from .parameters import ParameterExtractor, ParameterValue
+
+LOGGER = get_logger(__name__)
+
+STORE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+NUMERIC_CLASSES = {"NUMBER"}
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+ColumnValues = Union[array, List[str]]
+
+
+def _as_int(value: str) -> Optional[int]:
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    if str(number) != value or not INT64_MIN <= number <= INT64_MAX:
+        return None
+    return number
+
+
+def _as_float(value: str) -> Optional[float]:
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if repr(number) == value else None
+
+
+def _code_typecode(size: int) -> str:
+    if size <= 1 << 8:
+        return "B"
+    if size <= 1 << 16:
+        return "H"
+    return "I"
+
+
+class _ColumnBuilder:
+    """Accumulate one slot of one template.
+
+    Numeric classes are stored as ``int64``/``float64`` arrays as long as every
+    value round-trips exactly; anything else (or a numeric column that meets
+    a non-canonical value) is dictionary encoded.
+    """
+
+    def __init__(self, value_class: Optional[str]):
+        self.value_class = value_class
+        self.kind: Optional[str] = None
+        self._numbers: Optional[array] = None
+        self._codes = array("I")
+        self._dictionary: Dict[str, int] = {}
+
+    def add(self, value: str) -> None:
+        if self.kind is None:
+            self.kind = "dict"
+            if self.value_class in NUMERIC_CLASSES:
+                if _as_int(value) is not None:
+                    self.kind, self._numbers = "int64", array("q")
+                elif _as_float(value) is not None:
+                    self.kind, self._numbers = "float64", array("d")
+        if self.kind == "int64":
+            number = _as_int(value)
+            if number is not None:
+                self._numbers.append(number)
+                return
+            self._demote()
+        elif self.kind == "float64":
+            number = _as_float(value)
+            if number is not None:
+                self._numbers.append(number)
+                return
+            self._demote()
+        self._codes.append(self._dictionary.setdefault(value, len(self._dictionary)))
+
+    def _demote(self) -> None:
+        formatter = str if self.kind == "int64" else repr
+        numbers, self._numbers, self.kind = self._numbers, None, "dict"
+        for number in numbers:
+            self._codes.append(self._dictionary.setdefault(formatter(number), len(self._dictionary)))
+
+    def write(self, out_dir: Path, stem: str) -> Dict[str, object]:
+        info: Dict[str, object] = {"value_class": self.value_class, "kind": self.kind or "dict"}
+        if self._numbers is not None:
+            info["file"] = f"{stem}.bin"
+            (out_dir / info["file"]).write_bytes(self._numbers.tobytes())
+            return info
+        typecode = _code_typecode(len(self._dictionary))
+        info["file"] = f"{stem}.codes"
+        info["code_type"] = typecode
+        info["dictionary_file"] = f"{stem}.dict.json"
+        (out_dir / info["file"]).write_bytes(array(typecode, self._codes).tobytes())
+        (out_dir / info["dictionary_file"]).write_text(json.dumps(list(self._dictionary)), encoding="utf-8")
+        return info
+
+
+@dataclass
+class _TemplateBuilder:
+    template: List[str]
+    rows: array
+    columns: List[_ColumnBuilder]
+
+
+class ParameterStoreWriter:
+    """Collect parameter rows per template and write them column by column."""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.unaligned = 0
+        self._templates: Dict[int, _TemplateBuilder] = {}
+
+    def add(
+        self,
+        template_id: int,
+        template: Sequence[str],
+        line_no: int,
+        values: Optional[Sequence[ParameterValue]],
+    ) -> bool:
+        builder = self._templates.get(template_id)
+        if builder is None and values is not None:
+            builder = self._templates[template_id] = _TemplateBuilder(
+                template=list(template),
+                rows=array("Q"),
+                columns=[_ColumnBuilder(value.value_class) for value in values],
+            )
+        if values is None or builder is None or len(values) != len(builder.columns):
+            self.unaligned += 1
+            return False
+        builder.rows.append(line_no)
+        for column, value in zip(builder.columns, values):
+            column.add(value.value)
+        return True
+
+    def close(self) -> "ParameterStore":
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        templates = []
+        for template_id in sorted(self._templates):
+            builder = self._templates[template_id]
+            row_file = f"t{template_id}.rows"
+            (self.out_dir / row_file).write_bytes(builder.rows.tobytes())
+            templates.append(
+                {
+                    "template_id": template_id,
+                    "template": " ".join(builder.template),
+                    "rows": len(builder.rows),
+                    "row_file": row_file,
+                    "columns": [
+                        column.write(self.out_dir, f"t{template_id}_p{index}")
+                        for index, column in enumerate(builder.columns)
+                    ],
+                }
+            )
+        manifest = {"version": STORE_VERSION, "unaligned": self.unaligned, "templates": templates}
+        (self.out_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        LOGGER.info(
+            "Wrote parameters for %d templates to %s (%d unaligned lines)",
+            len(templates),
+            self.out_dir,
+            self.unaligned,
+        )
+        return ParameterStore.open(self.out_dir)
+
+
+class ParameterStore:
+    """Read access to a store written by :class:`ParameterStoreWriter`."""
+
+    def __init__(self, root: Path, manifest: Dict[str, object]):
+        self.root = root
+        self.unaligned = int(manifest.get("unaligned", 0))
+        self._templates = {entry["template_id"]: entry for entry in manifest["templates"]}
+
+    @classmethod
+    def open(cls, root: Path) -> "ParameterStore":
+        manifest = json.loads((root / MANIFEST_FILE).read_text(encoding="utf-8"))
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported parameter store version in {root}")
+        return cls(root, manifest)
+
+    def template_ids(self) -> List[int]:
+        return sorted(self._templates)
+
+    def template(self, template_id: int) -> str:
+        return self._entry(template_id)["template"]
+
+    def columns(self, template_id: int) -> List[Dict[str, object]]:
+        return list(self._entry(template_id)["columns"])
+
+    def rows(self, template_id: int) -> array:
+        return self._read_array("Q", self._entry(template_id)["row_file"])
+
+    def column(self, template_id: int, index: int) -> ColumnValues:
+        """Return a column as a typed array (numeric kinds) or decoded strings."""
+
+        info = self._entry(template_id)["columns"][index]
+        if info["kind"] == "int64":
+            return self._read_array("q", info["file"])
+        if info["kind"] == "float64":
+            return self._read_array("d", info["file"])
+        dictionary = json.loads((self.root / info["dictionary_file"]).read_text(encoding="utf-8"))
+        return [dictionary[code] for code in self._read_array(info["code_type"], info["file"])]
+
+    def _entry(self, template_id: int) -> Dict[str, object]:
+        try:
+            return self._templates[template_id]
+        except KeyError:
+            raise KeyError(f"Unknown template id {template_id}") from None
+
+    def _read_array(self, typecode: str, name: str) -> array:
+        values = array(typecode)
+        values.frombytes((self.root / name).read_bytes())
+        return values
+
+
+def extract_parameters(lines: Sequence[str], engine: DrainEngine, out_dir: Path) -> ParameterStore:
+    """Parse ``lines`` and store their parameters against each line's final template.
+
+    Templates keep generalising while lines are added, so values are extracted
+    in a second pass once every cluster has reached its final template; lines
+    of clusters that compaction merged are stored under the survivor.
+    """
+
+    clusters: List[DrainCluster] = [engine.add_log(line) for line in lines]
+    extractor = ParameterExtractor(engine.applier)
+    writer = ParameterStoreWriter(out_dir)
+    for line_no, (line, cluster) in enumerate(zip(lines, clusters)):
+        cluster = engine.live_cluster(cluster.cluster_id) or cluster
+        writer.add(cluster.cluster_id, cluster.template, line_no, extractor.extract(line, cluster.template))
+    return writer.close()
@@ -0,0 +1,102 @@
+"""Recover variable values from a log line and its final template."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from ..drain.masks_application import MaskApplier, MaskedSegment
+from ..tokenize import mask_tokens
+
+WILDCARD = "<*>"
+
+
+@dataclass(frozen=True)
+class ParameterValue:
+    """One variable slot of a template filled from a concrete line."""
+
+    value: str
+    value_class: Optional[str]
+
+
+def _is_class_token(token: str) -> bool:
+    if len(token) < 3 or token[0] != "<" or token[-1] != ">":
+        return False
+    inner = token[1:-1]
+    return "<" not in inner and ">" not in inner
+
+
+def template_slot_count(template: Sequence[str]) -> int:
+    """Number of variable slots a template exposes."""
+
+    return sum(1 if _is_class_token(token) else token.count(WILDCARD) for token in template)
+
+
+def _split_tokens(segments: Sequence[MaskedSegment]) -> List[List[MaskedSegment]]:
+    tokens: List[List[MaskedSegment]] = []
+    current: List[MaskedSegment] = []
+    for segment in segments:
+        if segment.label is not None:
+            current.append(segment)
+            continue
+        text = segment.masked
+        start = None
+        for pos, char in enumerate(text):
+            if char.isspace():
+                if start is not None:
+                    current.append(MaskedSegment(text[start:pos], text[start:pos], None))
+                    start = None
+                if current:
+                    tokens.append(current)
+                    current = []
+            elif start is None:
+                start = pos
+        if start is not None:
+            current.append(MaskedSegment(text[start:], text[start:], None))
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+class ParameterExtractor:
+    """Align a line with its template and return the values behind each slot.
+
+    The line is masked again with the engine's :class:`MaskApplier`, keeping
+    the raw text behind every ``<*>``; tokens are then compared position by
+    position with the template.  Whole-token variables (``<*>`` or token
+    classes such as ``<NUMBER>``) yield the raw token, while literals with
+    embedded placeholders (``Worker<*>``) yield one value per placeholder.
+    """
+
+    def __init__(self, applier: MaskApplier):
+        self.applier = applier
+
+    def extract(self, line: str, template: Sequence[str]) -> Optional[List[ParameterValue]]:
+        """Return slot values in template order, or ``None`` if the line does not fit."""
+
+        segments = self.applier.apply_tracked(line)
+        if "".join(segment.masked for segment in segments) != self.applier.apply(line):
+            return None
+        tokens = _split_tokens(segments)
+        if len(tokens) != len(template):
+            return None
+        values: List[ParameterValue] = []
+        for template_token, token_segments in zip(template, tokens):
+            masked = "".join(segment.masked for segment in token_segments)
+            raw = "".join(segment.raw for segment in token_segments)
+            classed = mask_tokens([masked])[0]
+            placeholders = [segment for segment in token_segments if segment.label is not None]
+            if template_token == classed and classed != masked:
+                values.append(ParameterValue(raw, classed[1:-1]))
+            elif template_token == masked:
+                values.extend(ParameterValue(segment.raw, segment.label) for segment in placeholders)
+            elif template_token == WILDCARD or _is_class_token(template_token):
+                if classed != masked:
+                    value_class: Optional[str] = classed[1:-1]
+                elif len(placeholders) == 1 and masked == WILDCARD:
+                    value_class = placeholders[0].label
+                else:
+                    value_class = None
+                values.append(ParameterValue(raw, value_class))
+            else:
+                return None
+        return values
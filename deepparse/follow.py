@@ -0,0 +1,236 @@
+"""Incremental parsing of growing log files with resumable checkpoints."""
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .drain.drain_engine import DrainEngine
+from .logging_utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+BatchCallback = Callable[[str, Sequence[str], Sequence[str]], None]
+CHECKPOINT_VERSION = 1
+# Engine state entries that change while parsing; everything else is configuration.
+ENGINE_RUNTIME_KEYS = frozenset(
+    {"clock", "next_cluster_id", "eviction_stats", "compaction_stats", "merged_ids", "clusters"}
+)
+
+
+@dataclass
+class FileCursor:
+    """Read position within a followed file."""
+
+    path: str
+    offset: int = 0
+    inode: Optional[int] = None
+
+
+class LogFollower:
+    """Tail one or more files and feed new lines to a persistent engine.
+
+    Only complete (newline terminated) lines are consumed; a trailing partial
+    line is re-read once it is finished.  A file whose inode changes is treated
+    as rotated: the remainder of the old file is drained before switching to
+    the new one from offset zero.  A file that shrinks below the stored offset
+    is treated as truncated and re-read from the start.
+
+    Offsets and the engine state are written to ``checkpoint_path`` once
+    ``checkpoint_interval`` seconds have passed, checked after every batch
+    of at most ``batch_size`` lines and on every poll, and on :meth:`close`.  Output is delivered
+    to ``on_batch`` before the checkpoint that covers it, so a crash between
+    the two replays at most one checkpoint interval (at-least-once delivery).
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Path],
+        engine: DrainEngine,
+        checkpoint_path: Optional[Path] = None,
+        *,
+        batch_size: int = 1000,
+        checkpoint_interval: float = 30.0,
+        on_batch: Optional[BatchCallback] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self.engine = engine
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.checkpoint_interval = checkpoint_interval
+        self.on_batch = on_batch
+        self.cursors: Dict[str, FileCursor] = {str(path): FileCursor(path=str(path)) for path in paths}
+        self.lines_processed = 0
+        self._handles: Dict[str, BinaryIO] = {}
+        self._last_checkpoint = time.monotonic()
+
+    @classmethod
+    def resume(
+        cls,
+        paths: Sequence[Path],
+        checkpoint_path: Path,
+        engine_factory: Callable[[], DrainEngine],
+        **kwargs,
+    ) -> "LogFollower":
+        """Restore offsets and engine state from ``checkpoint_path`` when it exists.
+
+        The engine is always built by ``engine_factory`` and the checkpointed
+        clusters are loaded into an engine of the same class, reusing its
+        compiled masks and attached stats.  A checkpoint written with a
+        different engine configuration (masks, depth, limits, ...) is
+        rejected with :class:`ValueError` rather than silently overriding it.
+        """
+
+        engine = engine_factory()
+        if not checkpoint_path.exists():
+            return cls(paths, engine, checkpoint_path, **kwargs)
+        payload = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+        if payload.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {checkpoint_path}")
+        state = payload["engine"]
+        expected = engine.to_state()
+        mismatched = sorted(
+            key
+            for key in set(state) | set(expected)
+            if key not in ENGINE_RUNTIME_KEYS and state.get(key) != expected.get(key)
+        )
+        if mismatched:
+            raise ValueError(
+                f"Checkpoint {checkpoint_path} was written with a different engine configuration "
+                f"({', '.join(mismatched)}); remove it or restore the original settings"
+            )
+        restored = type(engine).from_state(state, applier=engine.applier)
+        restored.stats = engine.stats
+        follower = cls(paths, restored, checkpoint_path, **kwargs)
+        for path, cursor in payload.get("files", {}).items():
+            if path in follower.cursors:
+                follower.cursors[path] = FileCursor(**cursor)
+        follower.lines_processed = payload.get("lines_processed", 0)
+        LOGGER.info(
+            "Resumed from %s after %d lines (%d clusters)",
+            checkpoint_path,
+            follower.lines_processed,
+            follower.engine.cluster_count,
+        )
+        return follower
+
+    def poll_once(self) -> int:
+        """Consume every complete line currently available; return the number parsed."""
+
+        total = 0
+        for path in self.cursors:
+            total += self._poll_file(path)
+        self._maybe_checkpoint()
+        return total
+
+    def run(
+        self,
+        poll_interval: float = 1.0,
+        max_idle_polls: Optional[int] = None,
+    ) -> None:
+        """Poll until interrupted, or until ``max_idle_polls`` consecutive empty polls."""
+
+        idle = 0
+        try:
+            while max_idle_polls is None or idle < max_idle_polls:
+                if self.poll_once():
+                    idle = 0
+                else:
+                    idle += 1
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:  # pragma: no cover - interactive stop
+            LOGGER.info("Follow mode interrupted after %d lines", self.lines_processed)
+        finally:
+            self.close()
+
+    def checkpoint(self) -> None:
+        if self.checkpoint_path is None:
+            return
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "lines_processed": self.lines_processed,
+            "files": {path: asdict(cursor) for path, cursor in self.cursors.items()},
+            "engine": self.engine.to_state(),
+        }
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, self.checkpoint_path)
+        self._last_checkpoint = time.monotonic()
+        LOGGER.debug("Checkpointed %d lines to %s", self.lines_processed, self.checkpoint_path)
+
+    def _maybe_checkpoint(self) -> None:
+        if self.checkpoint_path is not None:
+            if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                self.checkpoint()
+
+    def close(self) -> None:
+        self.checkpoint()
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+    def _poll_file(self, path: str) -> int:
+        cursor = self.cursors[path]
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        handle = self._handles.get(path)
+        processed = 0
+        if cursor.inode is not None and cursor.inode != stat.st_ino:
+            if handle is not None:
+                processed += self._drain(path, handle, cursor)
+                handle.close()
+                self._handles.pop(path)
+                handle = None
+            LOGGER.info("Detected rotation of %s", path)
+            cursor.offset = 0
+        elif stat.st_size < cursor.offset:
+            LOGGER.info("Detected truncation of %s", path)
+            cursor.offset = 0
+        cursor.inode = stat.st_ino
+        if handle is None:
+            handle = self._handles[path] = open(path, "rb")
+        processed += self._drain(path, handle, cursor)
+        return processed
+
+    def _drain(self, path: str, handle: BinaryIO, cursor: FileCursor) -> int:
+        processed = 0
+        while True:
+            handle.seek(cursor.offset)
+            lines, consumed = _read_complete_lines(handle, self.batch_size)
+            if not consumed:
+                return processed
+            cursor.offset += consumed
+            if lines:
+                self._feed(path, lines)
+                processed += len(lines)
+                # A long backlog is drained in one poll; keep checkpointing through it.
+                self._maybe_checkpoint()
+
+    def _feed(self, path: str, lines: List[str]) -> None:
+        templates = self.engine.parse(lines)
+        self.lines_processed += len(lines)
+        if self.on_batch is not None:
+            self.on_batch(path, lines, templates)
+
+
+def _read_complete_lines(handle: BinaryIO, limit: int) -> Tuple[List[str], int]:
+    """Read up to ``limit`` complete lines, returning non-empty ones and bytes consumed."""
+
+    lines: List[str] = []
+    consumed = 0
+    for _ in range(limit):
+        raw = handle.readline()
+        if not raw.endswith(b"\n"):
+            break
+        consumed += len(raw)
+        line = raw.decode("utf-8", errors="replace").strip()
+        if line:
+            lines.append(line)
+    return lines, consumed
@@ -0,0 +1,121 @@
+"""Streaming loader for LogHub ``*_structured.csv`` / ``*_templates.csv`` labels."""
+from __future__ import annotations
+
+import csv
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, overload
+
+from .logging_utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+STRUCTURED_SUFFIX = "_structured.csv"
+TEMPLATES_SUFFIX = "_templates.csv"
+CODE_TYPECODE = "i"
+
+
+class _LineTemplates(Sequence[str]):
+    """Per-line template view that shares one string per event."""
+
+    def __init__(self, codes: array, templates: Sequence[str]):
+        self._codes = codes
+        self._templates = templates
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._templates[code] for code in self._codes[index]]
+        return self._templates[self._codes[index]]
+
+    def __iter__(self):
+        templates = self._templates
+        return (templates[code] for code in self._codes)
+
+
+@dataclass
+class GroundTruth:
+    """Per-line event labels as integer codes into ``event_ids``/``templates``.
+
+    Only the code array grows with the corpus (4 bytes per line); each
+    EventId and template string is stored once.
+    """
+
+    name: str
+    codes: array
+    event_ids: List[str]
+    templates: List[str]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def line_templates(self) -> Sequence[str]:
+        return _LineTemplates(self.codes, self.templates)
+
+
+def find_ground_truth(root: Path, name: str) -> Optional[Tuple[Path, Optional[Path]]]:
+    """Locate ``(structured, templates)`` files for ``name`` under ``root``.
+
+    Prefers ``{name}_structured.csv`` and falls back to a single LogHub-style
+    ``*_structured.csv`` (e.g. ``HDFS_2k.log_structured.csv``).
+    """
+
+    structured = root / f"{name}{STRUCTURED_SUFFIX}"
+    if not structured.exists():
+        candidates = sorted(root.glob(f"*{STRUCTURED_SUFFIX}"))
+        if len(candidates) != 1:
+            if len(candidates) > 1:
+                LOGGER.warning("Ambiguous ground truth in %s: %s", root, [p.name for p in candidates])
+            return None
+        structured = candidates[0]
+    templates = structured.with_name(structured.name[: -len(STRUCTURED_SUFFIX)] + TEMPLATES_SUFFIX)
+    return structured, templates if templates.exists() else None
+
+
+def load_ground_truth(root: Path, name: str) -> Optional[GroundTruth]:
+    """Stream the structured CSV, interning EventIds; ``None`` when no labels exist.
+
+    Templates come from the ``EventTemplate`` column and, when present, the
+    templates CSV (which wins on conflicts).  ``Content`` and the other
+    columns are never kept.
+    """
+
+    located = find_ground_truth(root, name)
+    if located is None:
+        return None
+    structured_path, templates_path = located
+    codes = array(CODE_TYPECODE)
+    index: Dict[str, int] = {}
+    event_ids: List[str] = []
+    templates: List[str] = []
+    with structured_path.open("r", encoding="utf-8", newline="") as fh:
+        reader = csv.DictReader(fh)
+        if reader.fieldnames is None or "EventId" not in reader.fieldnames:
+            raise ValueError(f"{structured_path} has no EventId column")
+        for row in reader:
+            event_id = row["EventId"]
+            code = index.get(event_id)
+            if code is None:
+                code = index[event_id] = len(event_ids)
+                event_ids.append(event_id)
+                templates.append(row.get("EventTemplate") or "")
+            codes.append(code)
+    if templates_path is not None:
+        with templates_path.open("r", encoding="utf-8", newline="") as fh:
+            for row in csv.DictReader(fh):
+                code = index.get(row.get("EventId", ""))
+                if code is not None and row.get("EventTemplate"):
+                    templates[code] = row["EventTemplate"]
+    LOGGER.info(
+        "Loaded ground truth for %s: %d lines, %d events from %s", name, len(codes), len(event_ids), structured_path
+    )
+    return GroundTruth(name=name, codes=codes, event_ids=event_ids, templates=templates)
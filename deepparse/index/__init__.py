@@ -0,0 +1,5 @@
+"""Template to log line inverted index."""
+
+from .template_index import TemplateIndex, build_template_index
+
+__all__ = ["TemplateIndex", "build_template_index"]
@@ -0,0 +1,98 @@
+"""Delta + varint encoded posting lists and value columns."""
+from __future__ import annotations
+
+from typing import Iterable, List
+
+
+class PostingListBuilder:
+    """Accumulate a sorted posting list as LEB128 varints of successive deltas."""
+
+    __slots__ = ("_buffer", "_last", "count")
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._last = 0
+        self.count = 0
+
+    def add(self, value: int) -> None:
+        delta = value - self._last
+        if delta < 0:
+            raise ValueError(f"Posting values must be non-decreasing: {value} after {self._last}")
+        self._last = value
+        self.count += 1
+        _append_varint(self._buffer, delta)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+
+class ColumnBuilder:
+    """Accumulate unsorted integers as varints of zigzag encoded deltas.
+
+    Stored parallel to a posting list (one value per posting), so mostly
+    increasing columns such as timestamps still take a byte or two per line.
+    """
+
+    __slots__ = ("_buffer", "_last", "count")
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._last = 0
+        self.count = 0
+
+    def add(self, value: int) -> None:
+        delta = value - self._last
+        self._last = value
+        self.count += 1
+        _append_varint(self._buffer, 2 * delta if delta >= 0 else -2 * delta - 1)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+
+def _append_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def encode_postings(values: Iterable[int]) -> bytes:
+    builder = PostingListBuilder()
+    for value in values:
+        builder.add(value)
+    return builder.to_bytes()
+
+
+def decode_postings(data: bytes | memoryview) -> List[int]:
+    values: List[int] = []
+    current = 0
+    delta = 0
+    shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += delta
+        values.append(current)
+        delta = 0
+        shift = 0
+    return values
+
+
+def decode_column(data: bytes | memoryview) -> List[int]:
+    values: List[int] = []
+    current = 0
+    raw = 0
+    shift = 0
+    for byte in data:
+        raw |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += raw >> 1 if not raw & 1 else -((raw + 1) >> 1)
+        values.append(current)
+        raw = 0
+        shift = 0
+    return values
@@ -0,0 +1,261 @@
+"""Build and query an on-disk inverted index from templates to log lines."""
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+import mmap
+import re
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..drain.drain_engine import DrainCluster, DrainEngine
+from ..logging_utils import get_logger
+from .postings import ColumnBuilder, PostingListBuilder, decode_column, decode_postings
+
+LOGGER = get_logger(__name__)
+
+INDEX_VERSION = 2
+INDEX_FILE = "index.json"
+POSTINGS_FILE = "postings.bin"
+TEMPLATES_FILE = "templates.csv"
+HOUR_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})[ T](\d{2}):\d{2}:\d{2}")
+UNKNOWN_HOUR = 0
+
+_Postings = Tuple[DrainCluster, PostingListBuilder, PostingListBuilder, ColumnBuilder]
+
+
+@dataclass(frozen=True)
+class TemplateEntry:
+    """Template table row plus the location of its postings in ``postings.bin``."""
+
+    template_id: int
+    template: str
+    count: int
+    lines: Tuple[int, int]
+    offsets: Tuple[int, int]
+    hours: Tuple[int, int]
+
+
+def hour_code(line: str) -> int:
+    """Hours since 0001-01-01 of the first timestamp in ``line``, or :data:`UNKNOWN_HOUR`."""
+
+    match = HOUR_PATTERN.search(line)
+    if match is None:
+        return UNKNOWN_HOUR
+    hour = int(match.group(2))
+    try:
+        day = date.fromisoformat(match.group(1)).toordinal()
+    except ValueError:
+        return UNKNOWN_HOUR
+    return day * 24 + hour if hour < 24 else UNKNOWN_HOUR
+
+
+def hour_label(code: int) -> str:
+    if code == UNKNOWN_HOUR:
+        return "unknown"
+    day, hour = divmod(code, 24)
+    return f"{date.fromordinal(day).isoformat()} {hour:02d}:00"
+
+
+def build_template_index(log_path: Path, engine: DrainEngine, out_dir: Path) -> "TemplateIndex":
+    """Parse ``log_path`` with ``engine`` and write a template index to ``out_dir``.
+
+    Each template gets two posting lists: physical line numbers (0-based) and
+    byte offsets of its lines in ``log_path``.  Both are stored as varint
+    encoded deltas, and templates are recorded with their final text.  A
+    parallel column holds each line's :func:`hour_code`, so hourly counts are
+    answered from the index without reading the log again.  When ``engine``
+    compacts while indexing, merged clusters' postings are folded into the
+    survivor's.
+    """
+
+    postings: Dict[int, _Postings] = {}
+    merged = engine.compaction_stats.merged
+    offset = 0
+    with log_path.open("rb") as fh:
+        for line_no, raw in enumerate(fh):
+            line = raw.decode("utf-8", errors="replace").strip()
+            if line:
+                cluster = engine.add_log(line)
+                entry = postings.get(cluster.cluster_id)
+                if entry is None:
+                    entry = postings[cluster.cluster_id] = (
+                        cluster,
+                        PostingListBuilder(),
+                        PostingListBuilder(),
+                        ColumnBuilder(),
+                    )
+                entry[1].add(line_no)
+                entry[2].add(offset)
+                entry[3].add(hour_code(line))
+                if engine.compaction_stats.merged != merged:
+                    merged = engine.compaction_stats.merged
+                    _fold_merged(postings, engine)
+            offset += len(raw)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries: List[TemplateEntry] = []
+    position = 0
+    with (out_dir / POSTINGS_FILE).open("wb") as fh:
+        for template_id in sorted(postings):
+            cluster, lines, offsets, hours = postings[template_id]
+            line_bytes = lines.to_bytes()
+            offset_bytes = offsets.to_bytes()
+            hour_bytes = hours.to_bytes()
+            fh.write(line_bytes)
+            fh.write(offset_bytes)
+            fh.write(hour_bytes)
+            hours_at = position + len(line_bytes) + len(offset_bytes)
+            entries.append(
+                TemplateEntry(
+                    template_id=template_id,
+                    template=cluster.template_str(),
+                    count=lines.count,
+                    lines=(position, len(line_bytes)),
+                    offsets=(position + len(line_bytes), len(offset_bytes)),
+                    hours=(hours_at, len(hour_bytes)),
+                )
+            )
+            position = hours_at + len(hour_bytes)
+
+    with (out_dir / TEMPLATES_FILE).open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["template_id", "count", "template"])
+        for entry in entries:
+            writer.writerow([entry.template_id, entry.count, entry.template])
+
+    metadata = {
+        "version": INDEX_VERSION,
+        "source": str(log_path),
+        "source_bytes": offset,
+        "templates": [
+            {
+                "template_id": entry.template_id,
+                "template": entry.template,
+                "count": entry.count,
+                "lines": list(entry.lines),
+                "offsets": list(entry.offsets),
+                "hours": list(entry.hours),
+            }
+            for entry in entries
+        ],
+    }
+    (out_dir / INDEX_FILE).write_text(json.dumps(metadata), encoding="utf-8")
+    LOGGER.info(
+        "Indexed %d templates from %s into %s (%d posting bytes)", len(entries), log_path, out_dir, position
+    )
+    return TemplateIndex.open(out_dir)
+
+
+def _fold_merged(postings: Dict[int, _Postings], engine: DrainEngine) -> None:
+    # Compaction folded clusters into older ones; move their postings along so
+    # every line is listed once, under the surviving template.
+    for cluster_id in [cluster_id for cluster_id in postings if engine.resolve_cluster_id(cluster_id) != cluster_id]:
+        survivor_id = engine.resolve_cluster_id(cluster_id)
+        survivor = engine.live_cluster(survivor_id)
+        victim = postings.pop(cluster_id)
+        target = postings.get(survivor_id)
+        rows = heapq.merge(*(_rows(entry) for entry in (victim, target) if entry is not None))
+        merged: _Postings = (survivor, PostingListBuilder(), PostingListBuilder(), ColumnBuilder())
+        for line_no, offset, hour in rows:
+            merged[1].add(line_no)
+            merged[2].add(offset)
+            merged[3].add(hour)
+        postings[survivor_id] = merged
+
+
+def _rows(entry: _Postings) -> Iterator[Tuple[int, int, int]]:
+    _, lines, offsets, hours = entry
+    return zip(
+        decode_postings(lines.to_bytes()),
+        decode_postings(offsets.to_bytes()),
+        decode_column(hours.to_bytes()),
+    )
+
+
+class TemplateIndex:
+    """Read-only view over an index written by :func:`build_template_index`.
+
+    Postings are memory mapped, so a lookup only touches the bytes of the
+    requested template.
+    """
+
+    def __init__(self, root: Path, source: Path, entries: Dict[int, TemplateEntry]):
+        self.root = root
+        self.source = source
+        self._entries = entries
+        self._file = (root / POSTINGS_FILE).open("rb")
+        self._postings: mmap.mmap | bytes = b""
+        if (root / POSTINGS_FILE).stat().st_size:
+            self._postings = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def open(cls, root: Path) -> "TemplateIndex":
+        metadata = json.loads((root / INDEX_FILE).read_text(encoding="utf-8"))
+        if metadata.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported template index version in {root}")
+        entries = {
+            item["template_id"]: TemplateEntry(
+                template_id=item["template_id"],
+                template=item["template"],
+                count=item["count"],
+                lines=tuple(item["lines"]),
+                offsets=tuple(item["offsets"]),
+                hours=tuple(item["hours"]),
+            )
+            for item in metadata["templates"]
+        }
+        return cls(root, Path(metadata["source"]), entries)
+
+    def __enter__(self) -> "TemplateIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._postings, mmap.mmap):
+            self._postings.close()
+        self._file.close()
+
+    def templates(self) -> List[TemplateEntry]:
+        return list(self._entries.values())
+
+    def entry(self, template_id: int) -> TemplateEntry:
+        try:
+            return self._entries[template_id]
+        except KeyError:
+            raise KeyError(f"Unknown template id {template_id}") from None
+
+    def line_numbers(self, template_id: int) -> List[int]:
+        return self._decode(self.entry(template_id).lines)
+
+    def byte_offsets(self, template_id: int) -> List[int]:
+        return self._decode(self.entry(template_id).offsets)
+
+    def read_lines(self, template_id: int, limit: Optional[int] = None) -> List[str]:
+        offsets = self.byte_offsets(template_id)
+        if limit is not None:
+            offsets = offsets[:limit]
+        lines: List[str] = []
+        with self.source.open("rb") as fh:
+            for offset in offsets:
+                fh.seek(offset)
+                lines.append(fh.readline().decode("utf-8", errors="replace").strip())
+        return lines
+
+    def hourly_counts(self, template_id: int) -> Dict[str, int]:
+        """Count occurrences per ``YYYY-MM-DD HH:00`` using each line's first timestamp."""
+
+        codes: Dict[int, int] = {}
+        start, length = self.entry(template_id).hours
+        for code in decode_column(self._postings[start : start + length]):
+            codes[code] = codes.get(code, 0) + 1
+        return {hour_label(code): count for code, count in codes.items()}
+
+    def _decode(self, span: Tuple[int, int]) -> List[int]:
+        start, length = span
+        return decode_postings(self._postings[start : start + length])
@@ -1,6 +1,14 @@
 """Metric exports."""
 
-from .grouping_accuracy import grouping_accuracy
-from .parsing_accuracy import parsing_accuracy
+from .grouping_accuracy import grouping_accuracy, partition_grouping_accuracy, template_group_ids
+from .online import OnlineAccuracy
+from .parsing_accuracy import normalize_template, parsing_accuracy
 
-__all__ = ["grouping_accuracy", "parsing_accuracy"]
+__all__ = [
+    "OnlineAccuracy",
+    "grouping_accuracy",
+    "normalize_template",
+    "parsing_accuracy",
+    "partition_grouping_accuracy",
+    "template_group_ids",
+]
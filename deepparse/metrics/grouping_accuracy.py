@@ -1,13 +1,65 @@
 """Grouping accuracy metric."""
 from __future__ import annotations
 
-from typing import Sequence
+from collections import Counter
+from typing import Hashable, List, Optional, Sequence
 
 
-def grouping_accuracy(true_group_ids: Sequence[str], predicted_group_ids: Sequence[str]) -> float:
+def grouping_accuracy(
+    true_group_ids: Sequence[str],
+    predicted_group_ids: Sequence[str],
+    weights: Optional[Sequence[int]] = None,
+) -> float:
+    """Fraction of lines whose predicted group id equals the true one.
+
+    ``weights`` gives each position an occurrence count, so deduplicated
+    ``(count, line)`` corpora score exactly like their expanded form.
+    """
+
     if len(true_group_ids) != len(predicted_group_ids):
         raise ValueError("Mismatched lengths for GA computation")
     if not true_group_ids:
         return 0.0
-    correct = sum(1 for a, b in zip(true_group_ids, predicted_group_ids) if a == b)
-    return correct / len(true_group_ids)
+    if weights is None:
+        correct = sum(1 for a, b in zip(true_group_ids, predicted_group_ids) if a == b)
+        return correct / len(true_group_ids)
+    if len(weights) != len(true_group_ids):
+        raise ValueError("Mismatched lengths for GA weights")
+    total = sum(weights)
+    correct = sum(w for a, b, w in zip(true_group_ids, predicted_group_ids, weights) if a == b)
+    return correct / total if total else 0.0
+
+
+def template_group_ids(templates: Sequence[str]) -> List[str]:
+    """Group id per template string, for :func:`grouping_accuracy` over templates."""
+
+    return [str(hash(template)) for template in templates]
+
+
+def partition_grouping_accuracy(
+    true_groups: Sequence[Hashable], predicted_groups: Sequence[Hashable]
+) -> float:
+    """LogPAI grouping accuracy: labels only need to induce the same partition.
+
+    A line counts as correct when the set of lines sharing its predicted
+    group is exactly the set sharing its true group, so predicted templates
+    can be compared with arbitrary ground-truth ids (e.g. LogHub EventIds).
+    Runs in one pass over the labels using contingency counts.
+    """
+
+    if len(true_groups) != len(predicted_groups):
+        raise ValueError("Mismatched lengths for GA computation")
+    if not true_groups:
+        return 0.0
+    pairs = Counter(zip(true_groups, predicted_groups))
+    true_sizes: Counter = Counter()
+    predicted_sizes: Counter = Counter()
+    for (true, predicted), count in pairs.items():
+        true_sizes[true] += count
+        predicted_sizes[predicted] += count
+    correct = sum(
+        count
+        for (true, predicted), count in pairs.items()
+        if count == true_sizes[true] == predicted_sizes[predicted]
+    )
+    return correct / len(true_groups)
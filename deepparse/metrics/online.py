@@ -0,0 +1,103 @@
+"""Running GA/PA over streamed ``(truth, predicted)`` pairs."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, Hashable, Optional
+
+GROUPING_MODES = ("partition", "exact")
+
+
+class OnlineAccuracy:
+    """Accumulate grouping and parsing accuracy one line at a time.
+
+    Only contingency counts are kept: one counter per distinct
+    ``(truth, predicted)`` pair and per group on either side, so memory grows
+    with the number of groups rather than the number of lines.  ``GA`` and
+    ``PA`` can be read at any point; after the last line they equal the
+    batch metrics over the same pairs.
+
+    ``grouping="partition"`` reproduces :func:`partition_grouping_accuracy`
+    (labels only need to induce the same partition); ``"exact"`` reproduces
+    :func:`grouping_accuracy` (group ids must be equal).
+    """
+
+    def __init__(self, grouping: str = "partition"):
+        if grouping not in GROUPING_MODES:
+            raise ValueError(f"Unsupported grouping mode: {grouping}")
+        self.grouping = grouping
+        self.lines = 0
+        self._parsed = 0
+        self._grouped = 0
+        self._pairs: Counter = Counter()
+        self._true_sizes: Counter = Counter()
+        self._partners: Dict[Hashable, int] = {}
+        self._predicted_partners: Dict[Hashable, int] = {}
+        # Counts only grow, so a group with one partner keeps its first one.
+        self._first_predicted: Dict[Hashable, Hashable] = {}
+        self._first_true: Dict[Hashable, Hashable] = {}
+
+    @property
+    def groups(self) -> int:
+        return len(self._true_sizes)
+
+    @property
+    def GA(self) -> float:
+        return self._grouped / self.lines if self.lines else 0.0
+
+    @property
+    def PA(self) -> float:
+        return self._parsed / self.lines if self.lines else 0.0
+
+    def add(
+        self,
+        truth: Hashable,
+        predicted: str,
+        truth_template: Optional[str] = None,
+        count: int = 1,
+        predicted_template: Optional[str] = None,
+    ) -> None:
+        """Record ``count`` lines with true group ``truth`` parsed to ``predicted``.
+
+        ``truth_template`` is the labelled template used for PA; it defaults
+        to ``truth`` for corpora whose group ids are the templates themselves.
+        ``predicted_template`` is compared with it in place of ``predicted``
+        (e.g. a normalised form), leaving the grouping by ``predicted`` intact.
+        """
+
+        if count < 1:
+            raise ValueError(f"count must be positive, got {count}")
+        self.lines += count
+        expected = truth if truth_template is None else truth_template
+        if expected == (predicted if predicted_template is None else predicted_template):
+            self._parsed += count
+        if self.grouping == "exact":
+            if truth == predicted:
+                self._grouped += count
+            return
+        self._grouped -= self._correct_near(truth, predicted)
+        pair = (truth, predicted)
+        if pair not in self._pairs:
+            self._partners[truth] = self._partners.get(truth, 0) + 1
+            self._predicted_partners[predicted] = self._predicted_partners.get(predicted, 0) + 1
+            self._first_predicted.setdefault(truth, predicted)
+            self._first_true.setdefault(predicted, truth)
+        self._pairs[pair] += count
+        self._true_sizes[truth] += count
+        self._grouped += self._correct_near(truth, predicted)
+
+    def _correct_near(self, truth: Hashable, predicted: Hashable) -> int:
+        # Correct lines among pairs sharing ``truth`` or ``predicted``: a pair is
+        # correct when each side has exactly one partner, i.e. the other.
+        correct = 0
+        if self._partners.get(truth) == 1:
+            partner = self._first_predicted[truth]
+            if self._predicted_partners[partner] == 1:
+                correct += self._pairs[(truth, partner)]
+        if self._predicted_partners.get(predicted) == 1:
+            partner = self._first_true[predicted]
+            if partner != truth and self._partners[partner] == 1:
+                correct += self._pairs[(partner, predicted)]
+        return correct
+
+    def result(self) -> Dict[str, float]:
+        return {"GA": self.GA, "PA": self.PA, "lines": self.lines}
@@ -1,13 +1,44 @@
 """Parsing accuracy metric."""
 from __future__ import annotations
 
-from typing import Sequence
+import re
+from typing import Optional, Sequence
 
+WILDCARD = "<*>"
+_PLACEHOLDER = re.compile(r"<[A-Z][A-Z0-9_]*>")
+
+
+def parsing_accuracy(
+    true_templates: Sequence[str],
+    predicted_templates: Sequence[str],
+    weights: Optional[Sequence[int]] = None,
+) -> float:
+    """Fraction of lines parsed to exactly the true template, optionally count-weighted."""
 
-def parsing_accuracy(true_templates: Sequence[str], predicted_templates: Sequence[str]) -> float:
     if len(true_templates) != len(predicted_templates):
         raise ValueError("Mismatched lengths for PA computation")
     if not true_templates:
         return 0.0
-    correct = sum(1 for true, pred in zip(true_templates, predicted_templates) if true == pred)
-    return correct / len(true_templates)
+    if weights is None:
+        correct = sum(1 for true, pred in zip(true_templates, predicted_templates) if true == pred)
+        return correct / len(true_templates)
+    if len(weights) != len(true_templates):
+        raise ValueError("Mismatched lengths for PA weights")
+    total = sum(weights)
+    correct = sum(w for true, pred, w in zip(true_templates, predicted_templates, weights) if true == pred)
+    return correct / total if total else 0.0
+
+
+def normalize_template(template: str) -> str:
+    """Rewrite every parameter token as ``<*>`` so templates compare token-wise.
+
+    Token classes (``<NUMBER>``, ``<PATH>``, ...), mask placeholders and
+    LogHub tokens embedding ``<*>`` (``blk_<*>``, ``<*>:<*>``) all become
+    ``<*>``; runs of whitespace collapse to one space.
+    """
+
+    return " ".join(WILDCARD if _is_parameter(token) else token for token in template.split())
+
+
+def _is_parameter(token: str) -> bool:
+    return WILDCARD in token or _PLACEHOLDER.fullmatch(token) is not None
@@ -1,5 +1,6 @@
 """Mask synthesis backends."""
 
+from .http_backend import HttpSynthClient, HttpSynthConfig
 from .llm_adapter import synthesize_masks
 
-__all__ = ["synthesize_masks"]
+__all__ = ["HttpSynthClient", "HttpSynthConfig", "synthesize_masks"]
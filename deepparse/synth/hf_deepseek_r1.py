@@ -2,38 +2,90 @@
 from __future__ import annotations
 
 import json
-from typing import Sequence
+import time
+from typing import List, Sequence
 
 from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
 
 from ..masks_types import Mask
 from ..logging_utils import get_logger
-from .prompt_templates import MASK_SYNTH_PROMPT
+from .prompt_packing import DEFAULT_MAX_LINE_CHARS, DEFAULT_PROMPT_TOKENS, pack_prompt, tokenizer_counter
 from ..utils.regex_library import validate_regexes
 
 LOGGER = get_logger(__name__)
 
 
-def synthesize_hf(
+def _parse_masks(output: str) -> List[Mask]:
+    masks_json = json.loads(output)
+    regexes = [entry["pattern"] for entry in masks_json]
+    validate_regexes(regexes)
+    return [Mask(label=entry["label"], pattern=entry["pattern"], justification=entry["justification"]) for entry in masks_json]
+
+
+def synthesize_hf_candidates(
     logs: Sequence[str],
     *,
     model_name: str = "deepseek-ai/deepseek-coder-1.3b-base",
     temperature: float = 0.0,
     num_beams: int = 2,
     max_length: int = 512,
-) -> Sequence[Mask]:
-    prompt = MASK_SYNTH_PROMPT.format(logs="\n".join(logs))
+    num_candidates: int = 1,
+    prompt_tokens: int = DEFAULT_PROMPT_TOKENS,
+    max_line_chars: int = DEFAULT_MAX_LINE_CHARS,
+) -> List[List[Mask]]:
+    """Return up to ``num_candidates`` parseable bundles (one per returned beam).
+
+    The sample is packed into at most ``prompt_tokens`` model tokens (see
+    :func:`pack_prompt`).
+    """
+
     LOGGER.info("Loading Hugging Face model %s", model_name)
     tokenizer = AutoTokenizer.from_pretrained(model_name)
+    packed = pack_prompt(logs, prompt_tokens, max_line_chars, tokenizer_counter(tokenizer))
     model = AutoModelForCausalLM.from_pretrained(model_name)
     generator = pipeline("text-generation", model=model, tokenizer=tokenizer, device=-1)
-    output = generator(
-        prompt,
+    start = time.perf_counter()
+    outputs = generator(
+        packed.prompt,
         max_new_tokens=max_length,
-        num_beams=num_beams,
+        num_beams=max(num_beams, num_candidates),
+        num_return_sequences=num_candidates,
         temperature=temperature,
-    )[0]["generated_text"]
-    masks_json = json.loads(output)
-    regexes = [entry["pattern"] for entry in masks_json]
-    validate_regexes(regexes)
-    return [Mask(label=entry["label"], pattern=entry["pattern"], justification=entry["justification"]) for entry in masks_json]
+    )
+    elapsed = time.perf_counter() - start
+    LOGGER.info(
+        "Generation took %.2fs; packing saved %d prompt tokens (~%.2fs)",
+        elapsed,
+        packed.saved_tokens,
+        packed.estimated_saved_seconds(elapsed),
+    )
+    candidates: List[List[Mask]] = []
+    for output in outputs:
+        try:
+            candidates.append(_parse_masks(output["generated_text"]))
+        except (ValueError, KeyError) as exc:
+            LOGGER.warning("Discarding unparseable candidate: %s", exc)
+    if not candidates:
+        raise ValueError("Model returned no parseable mask bundle")
+    return candidates
+
+
+def synthesize_hf(
+    logs: Sequence[str],
+    *,
+    model_name: str = "deepseek-ai/deepseek-coder-1.3b-base",
+    temperature: float = 0.0,
+    num_beams: int = 2,
+    max_length: int = 512,
+    prompt_tokens: int = DEFAULT_PROMPT_TOKENS,
+    max_line_chars: int = DEFAULT_MAX_LINE_CHARS,
+) -> Sequence[Mask]:
+    return synthesize_hf_candidates(
+        logs,
+        model_name=model_name,
+        temperature=temperature,
+        num_beams=num_beams,
+        max_length=max_length,
+        prompt_tokens=prompt_tokens,
+        max_line_chars=max_line_chars,
+    )[0]
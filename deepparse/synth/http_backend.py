@@ -0,0 +1,299 @@
+"""Mask synthesis through an OpenAI-compatible HTTP inference endpoint."""
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+from ..logging_utils import get_logger
+from ..masks_types import Mask
+from ..utils.regex_library import validate_regexes
+from .prompt_packing import DEFAULT_MAX_LINE_CHARS, DEFAULT_PROMPT_TOKENS, PackedPrompt, pack_prompt
+
+LOGGER = get_logger(__name__)
+
+API_KEY_ENV = "DEEPPARSE_SYNTH_API_KEY"
+ENDPOINT_ENV = "DEEPPARSE_SYNTH_ENDPOINT"
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class SynthHTTPError(RuntimeError):
+    """Raised when the endpoint keeps failing or returns an unusable response."""
+
+
+@dataclass
+class HttpSynthConfig:
+    endpoint: str
+    model: str = "deepseek-r1"
+    timeout: float = 60.0
+    max_retries: int = 3
+    backoff: float = 0.5
+    concurrency: int = 4
+    temperature: float = 0.0
+    max_tokens: int = 512
+    cache_dir: Optional[Path] = None
+    api_key: Optional[str] = None
+    prompt_tokens: int = DEFAULT_PROMPT_TOKENS
+    max_line_chars: int = DEFAULT_MAX_LINE_CHARS
+
+
+class ConnectionPool:
+    """Bounded pool of keep-alive connections to a single host.
+
+    Connections are handed out LIFO so the warmest socket is reused first.
+    A connection that saw an error is closed and dropped instead of being
+    returned; a fresh one is created on the next checkout.
+    """
+
+    def __init__(self, endpoint: str, size: int, timeout: float):
+        parts = urlsplit(endpoint)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported synthesis endpoint: {endpoint}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.created = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.created += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self) -> http.client.HTTPConnection:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        if reusable:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HttpSynthClient:
+    """Chat-completions client with retries and a prompt-keyed response cache.
+
+    Cached responses live in memory and, when ``cache_dir`` is set, as one
+    JSON file per request hash so re-running synthesis is free.
+    """
+
+    def __init__(self, config: HttpSynthConfig, sleep: Callable[[float], None] = time.sleep):
+        if config.max_retries < 0 or config.concurrency < 1:
+            raise ValueError("max_retries must be >= 0 and concurrency >= 1")
+        self.config = config
+        self.pool = ConnectionPool(config.endpoint, config.concurrency, config.timeout)
+        self.requests = 0
+        self.cache_hits = 0
+        self.prompt_tokens_saved = 0
+        self._sleep = sleep
+        self._memory: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "HttpSynthClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def _payload(self, prompt: str, n: int) -> Dict[str, object]:
+        payload: Dict[str, object] = {
+            "model": self.config.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+        }
+        if n > 1:
+            payload["n"] = n
+        return payload
+
+    def _cache_path(self, key: str) -> Optional[Path]:
+        return self.config.cache_dir / f"{key}.json" if self.config.cache_dir is not None else None
+
+    def _cached(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        path = self._cache_path(key)
+        if path is not None and path.exists():
+            choices = json.loads(path.read_text(encoding="utf-8"))["choices"]
+            with self._lock:
+                self._memory[key] = choices
+            return choices
+        return None
+
+    def _store(self, key: str, choices: List[str]) -> None:
+        with self._lock:
+            self._memory[key] = choices
+        path = self._cache_path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.tmp{threading.get_ident()}")
+            tmp_path.write_text(json.dumps({"choices": choices}), encoding="utf-8")
+            os.replace(tmp_path, path)
+
+    def complete(self, prompt: str) -> str:
+        """Return the assistant message for ``prompt``, from cache when possible."""
+
+        return self.complete_choices(prompt)[0]
+
+    def complete_choices(self, prompt: str, n: int = 1) -> List[str]:
+        """Request ``n`` alternative completions (the endpoint may return fewer)."""
+
+        body = json.dumps(self._payload(prompt, n), sort_keys=True)
+        key = hashlib.sha256(f"{self.config.endpoint}\n{body}".encode("utf-8")).hexdigest()
+        cached = self._cached(key)
+        if cached is not None:
+            with self._lock:
+                self.cache_hits += 1
+            return cached
+        choices = self._post(body)
+        self._store(key, choices)
+        return choices
+
+    def complete_logs(self, logs: Sequence[str], n: int = 1) -> List[str]:
+        """Pack ``logs`` into the mask synthesis prompt and request ``n`` completions.
+
+        No tokenizer is available client-side, so the ``prompt_tokens`` budget
+        is measured with :func:`~.prompt_packing.approx_token_count`; tokens saved by packing
+        accumulate in :attr:`prompt_tokens_saved`.
+        """
+
+        packed: PackedPrompt = pack_prompt(logs, self.config.prompt_tokens, self.config.max_line_chars)
+        start = time.perf_counter()
+        choices = self.complete_choices(packed.prompt, n)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.prompt_tokens_saved += packed.saved_tokens
+        LOGGER.info(
+            "Completion took %.2fs; packing saved ~%d prompt tokens (~%.2fs)",
+            elapsed,
+            packed.saved_tokens,
+            packed.estimated_saved_seconds(elapsed),
+        )
+        return choices
+
+    def _post(self, body: str) -> List[str]:
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        api_key = self.config.api_key or os.environ.get(API_KEY_ENV)
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        path = f"{self.pool.base_path}/v1/chat/completions"
+        last_error = ""
+        for attempt in range(self.config.max_retries + 1):
+            if attempt:
+                self._sleep(self.config.backoff * 2 ** (attempt - 1))
+            conn = self.pool.acquire()
+            reusable = False
+            try:
+                with self._lock:
+                    self.requests += 1
+                conn.request("POST", path, body=body.encode("utf-8"), headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                reusable = not response.will_close
+            except (OSError, socket.timeout, http.client.HTTPException) as exc:
+                last_error = f"{type(exc).__name__}: {exc}"
+                LOGGER.warning("Synthesis request failed (attempt %d): %s", attempt + 1, last_error)
+                continue
+            finally:
+                self.pool.release(conn, reusable)
+            if response.status in RETRYABLE_STATUS:
+                last_error = f"HTTP {response.status}"
+                LOGGER.warning("Synthesis endpoint returned %d (attempt %d)", response.status, attempt + 1)
+                continue
+            if response.status != 200:
+                raise SynthHTTPError(f"Synthesis endpoint returned HTTP {response.status}: {data[:200]!r}")
+            try:
+                choices = [choice["message"]["content"] for choice in json.loads(data)["choices"]]
+            except (ValueError, KeyError, TypeError) as exc:
+                raise SynthHTTPError(f"Malformed completion response: {data[:200]!r}") from exc
+            if not choices:
+                raise SynthHTTPError(f"Completion response had no choices: {data[:200]!r}")
+            return choices
+        raise SynthHTTPError(f"Synthesis endpoint failed after {self.config.max_retries + 1} attempts: {last_error}")
+
+
+def parse_mask_response(content: str) -> List[Mask]:
+    """Extract the JSON mask array from a completion, tolerating surrounding prose."""
+
+    match = _JSON_ARRAY.search(content)
+    if match is None:
+        raise SynthHTTPError("Completion did not contain a JSON array of masks")
+    try:
+        entries = json.loads(match.group(0))
+        masks = [Mask.from_dict(entry) for entry in entries]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise SynthHTTPError(f"Completion is not a valid mask array: {exc}") from exc
+    validate_regexes([mask.pattern for mask in masks])
+    return masks
+
+
+def synthesize_http(logs: Sequence[str], client: HttpSynthClient) -> List[Mask]:
+    return parse_mask_response(client.complete_logs(logs)[0])
+
+
+def synthesize_http_candidates(logs: Sequence[str], client: HttpSynthClient, n: int) -> List[List[Mask]]:
+    """Request ``n`` completions and keep every one that parses into a mask bundle."""
+
+    candidates: List[List[Mask]] = []
+    for content in client.complete_logs(logs, n):
+        try:
+            candidates.append(parse_mask_response(content))
+        except (SynthHTTPError, ValueError) as exc:
+            LOGGER.warning("Discarding unparseable candidate: %s", exc)
+    if not candidates:
+        raise SynthHTTPError("Endpoint returned no parseable mask bundle")
+    return candidates
+
+
+def run_concurrently(jobs: Sequence[T], work: Callable[[T], R], limit: int) -> List[R]:
+    """Apply ``work`` to every job with at most ``limit`` in flight, preserving order."""
+
+    if limit <= 1 or len(jobs) <= 1:
+        return [work(job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=min(limit, len(jobs)), thread_name_prefix="synth") as pool:
+        return list(pool.map(work, jobs))
+
+
+def synthesize_many_http(
+    samples: Sequence[Tuple[str, Sequence[str]]], client: HttpSynthClient
+) -> Dict[str, List[Mask]]:
+    """Synthesise masks for several ``(dataset, sample)`` pairs concurrently."""
+
+    results = run_concurrently(
+        list(samples), lambda item: synthesize_http(item[1], client), client.config.concurrency
+    )
+    return {name: masks for (name, _), masks in zip(samples, results)}
@@ -3,15 +3,20 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Sequence
+from typing import TYPE_CHECKING, List, Optional, Sequence
 
 from ..dataset_loader import Dataset
 from ..logging_utils import get_logger
 from ..masks_types import Mask, MaskBundle
 from ..utils.regex_library import validate_regexes
-from ..utils.sampling import deterministic_sample
+from ..utils.sampling import deterministic_sample, held_out_sample
+from .prompt_packing import DEFAULT_PROMPT_TOKENS
 from .prompt_templates import MASK_SYNTH_PROMPT
 from .r1_deepseek_stub import synthesize_offline
+from .selection import select_bundle
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .http_backend import HttpSynthClient
 
 LOGGER = get_logger(__name__)
 
@@ -26,19 +31,42 @@ def synthesize_masks(
     out_path: Path,
     mode: str = "offline",
     strict: bool = False,
+    client: Optional["HttpSynthClient"] = None,
+    candidates: int = 1,
+    workers: int = 0,
+    prompt_tokens: int = DEFAULT_PROMPT_TOKENS,
 ) -> MaskBundle:
+    """Synthesise, validate and write the mask bundle for ``dataset``.
+
+    With ``candidates > 1`` the LLM backends return several bundles, which
+    are scored on ``k`` held-out lines (see :func:`select_bundle`) using up
+    to ``workers`` processes; the offline stub always yields one bundle.
+    ``prompt_tokens`` bounds the packed prompt for ``hf`` mode; ``http``
+    mode uses the client's own budget.
+    """
+
     LOGGER.info("Synthesising masks for %s with mode=%s", dataset.name, mode)
     sample = deterministic_sample(dataset.logs, k)
-    masks: Sequence[Mask]
+    bundles: List[List[Mask]]
     if mode == "offline":
-        masks = synthesize_offline(sample)
+        bundles = [synthesize_offline(sample)]
     elif mode == "hf":  # pragma: no cover - optional heavy path
-        from .hf_deepseek_r1 import synthesize_hf
+        from .hf_deepseek_r1 import synthesize_hf_candidates
+
+        bundles = synthesize_hf_candidates(sample, num_candidates=candidates, prompt_tokens=prompt_tokens)
+    elif mode == "http":
+        from .http_backend import synthesize_http_candidates
 
-        masks = synthesize_hf(sample)
+        if client is None:
+            raise ValueError("mode='http' requires an HttpSynthClient")
+        bundles = synthesize_http_candidates(sample, client, candidates)
     else:  # pragma: no cover - argument validation
         raise UnsupportedModeError(mode)
 
+    masks: Sequence[Mask] = bundles[0]
+    if len(bundles) > 1:
+        held_out = held_out_sample(dataset.logs, k, exclude=sample) or list(sample)
+        masks, _ = select_bundle(bundles, held_out, workers=workers, strict=strict)
     validate_regexes([mask.pattern for mask in masks], strict=strict)
     bundle = MaskBundle(dataset=dataset.name, masks=list(masks))
     out_path.parent.mkdir(parents=True, exist_ok=True)
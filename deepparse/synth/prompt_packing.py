@@ -0,0 +1,127 @@
+"""Token-budgeted packing of sample log lines into the synthesis prompt."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Set, Tuple
+
+from ..logging_utils import get_logger
+from ..tokenize import mask_tokens, tokenize
+from .prompt_templates import MASK_SYNTH_PROMPT
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_PROMPT_TOKENS = 2048
+DEFAULT_MAX_LINE_CHARS = 400
+TRUNCATION_MARK = " ..."
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+TokenCounter = Callable[[str], int]
+
+
+def approx_token_count(text: str) -> int:
+    """Count words and punctuation marks, a tokenizer-free stand-in for BPE lengths."""
+
+    return len(_APPROX_TOKEN.findall(text))
+
+
+def tokenizer_counter(tokenizer) -> TokenCounter:
+    """Measure prompts with a Hugging Face tokenizer (no special tokens)."""
+
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def line_signature(line: str) -> Tuple[str, ...]:
+    """Token-class signature: lines differing only in numbers, IPs, ids, ... share one."""
+
+    return tuple(mask_tokens(tokenize(line)))
+
+
+@dataclass
+class PackedPrompt:
+    prompt: str
+    lines: List[str]
+    sample_lines: int
+    unique_lines: int
+    truncated: int
+    prompt_tokens: int
+    unpacked_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.unpacked_tokens - self.prompt_tokens)
+
+    @property
+    def saved_fraction(self) -> float:
+        return self.saved_tokens / self.unpacked_tokens if self.unpacked_tokens else 0.0
+
+    def estimated_saved_seconds(self, elapsed: float) -> float:
+        """Latency saved by a request that took ``elapsed`` seconds, assuming cost linear in prompt tokens."""
+
+        return elapsed * self.saved_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+
+def pack_prompt(
+    logs: Sequence[str],
+    token_budget: int = DEFAULT_PROMPT_TOKENS,
+    max_line_chars: int = DEFAULT_MAX_LINE_CHARS,
+    count_tokens: Optional[TokenCounter] = None,
+    template: str = MASK_SYNTH_PROMPT,
+) -> PackedPrompt:
+    """Fill ``template`` with as many distinct sample lines as ``token_budget`` allows.
+
+    Lines are kept in sample order, skipping any whose token-class signature
+    was already seen; lines longer than ``max_line_chars`` are cut and
+    marked with :data:`TRUNCATION_MARK`.  A line that would overflow the
+    budget is skipped and later, shorter lines may still fit.  At least one
+    line is always kept.  ``count_tokens`` defaults to
+    :func:`approx_token_count`; pass :func:`tokenizer_counter` to measure
+    with the model's own tokenizer.
+    """
+
+    if token_budget < 1 or max_line_chars < 1:
+        raise ValueError("token_budget and max_line_chars must be positive")
+    count = count_tokens or approx_token_count
+    available = token_budget - count(template.format(logs=""))
+    seen: Set[Tuple[str, ...]] = set()
+    kept: List[str] = []
+    truncated = 0
+    unique = 0
+    used = 0
+    for line in logs:
+        signature = line_signature(line)
+        if signature in seen:
+            continue
+        seen.add(signature)
+        unique += 1
+        if len(line) > max_line_chars:
+            line = line[:max_line_chars] + TRUNCATION_MARK
+            truncated += 1
+        cost = count(line) + 1
+        if used + cost > available and kept:
+            continue
+        kept.append(line)
+        used += cost
+    prompt = template.format(logs="\n".join(kept))
+    packed = PackedPrompt(
+        prompt=prompt,
+        lines=kept,
+        sample_lines=len(logs),
+        unique_lines=unique,
+        truncated=truncated,
+        prompt_tokens=count(prompt),
+        unpacked_tokens=count(template.format(logs="\n".join(logs))),
+    )
+    if packed.prompt_tokens > token_budget:
+        LOGGER.warning("Prompt needs %d tokens, over the %d budget", packed.prompt_tokens, token_budget)
+    LOGGER.info(
+        "Packed %d/%d sample lines (%d distinct, %d truncated): %d -> %d prompt tokens (%.0f%% saved)",
+        len(kept),
+        len(logs),
+        unique,
+        truncated,
+        packed.unpacked_tokens,
+        packed.prompt_tokens,
+        100 * packed.saved_fraction,
+    )
+    return packed
@@ -0,0 +1,159 @@
+"""Score candidate mask bundles on a held-out sample and keep the best one."""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from ..drain.drain_engine import DrainEngine
+from ..drain.masks_application import MaskApplier
+from ..logging_utils import get_logger
+from ..masks_types import Mask
+from ..tokenize import TOKEN_CLASS_CACHE, WILDCARD
+from ..utils.regex_library import validate_regexes
+
+LOGGER = get_logger(__name__)
+
+# Bundles masking more than this share of sample tokens wipe out the constant
+# words templates are made of (``\S+``, ``\w+``, ...) and are ranked last.
+MAX_MASKED_SHARE = 0.5
+
+# Held-out sample of a scoring worker process, set by the pool initializer only;
+# the caller never touches it, so concurrent select_bundle calls cannot clash.
+_SHARED: Optional[Tuple[Sequence[str], int]] = None
+
+
+@dataclass
+class BundleScore:
+    candidate: int
+    masks: int
+    templates: int
+    coverage: float
+    lines_per_second: float
+    masked_share: float = 0.0
+
+    @property
+    def over_generalised(self) -> bool:
+        return self.masked_share > MAX_MASKED_SHARE
+
+    def rank_key(self) -> Tuple[bool, int, float, float]:
+        """Over-generalised bundles last; then fewest templates, widest coverage, cheapest to apply."""
+
+        return self.over_generalised, self.templates, -self.coverage, -self.lines_per_second
+
+
+def score_bundle(candidate: int, masks: Sequence[Mask], sample: Sequence[str], repeats: int = 3) -> BundleScore:
+    """Parse ``sample`` with ``masks``; throughput is the best of ``repeats`` cold runs.
+
+    ``coverage`` is the fraction of sample lines changed by at least one mask
+    and ``masked_share`` the fraction of sample tokens a mask touched.
+    """
+
+    applier = MaskApplier(masks)
+    changed = tokens = masked = 0
+    for line in sample:
+        masked_line = applier.apply(line)
+        changed += masked_line != line
+        parts = masked_line.split()
+        tokens += len(parts)
+        masked += sum(WILDCARD in part for part in parts)
+    coverage = changed / max(1, len(sample))
+    best = float("inf")
+    templates = 0
+    for _ in range(max(1, repeats)):
+        TOKEN_CLASS_CACHE.clear()
+        engine = DrainEngine(masks=masks)
+        start = time.perf_counter()
+        for line in sample:
+            engine.add_log(line)
+        best = min(best, time.perf_counter() - start)
+        templates = engine.cluster_count
+    return BundleScore(
+        candidate=candidate,
+        masks=len(masks),
+        templates=templates,
+        coverage=coverage,
+        lines_per_second=len(sample) / best if best > 0 else float("inf"),
+        masked_share=masked / max(1, tokens),
+    )
+
+
+def _score_shared(item: Tuple[int, Sequence[Mask]]) -> BundleScore:
+    assert _SHARED is not None, "scoring worker started without a shared sample"
+    sample, repeats = _SHARED
+    return score_bundle(item[0], item[1], sample, repeats)
+
+
+def _install_shared(shared: Optional[Tuple[Sequence[str], int]]) -> None:
+    global _SHARED
+    _SHARED = shared
+
+
+def _worker_context() -> multiprocessing.context.BaseContext:
+    # Forking a process that already runs other threads (e.g. concurrent HTTP
+    # synthesis) can copy locks mid-acquire, so fork only when single-threaded.
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods and threading.active_count() == 1:
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def select_bundle(
+    candidates: Sequence[Sequence[Mask]],
+    sample: Sequence[str],
+    *,
+    workers: int = 0,
+    repeats: int = 3,
+    strict: bool = False,
+) -> Tuple[List[Mask], List[BundleScore]]:
+    """Return the best valid candidate bundle and the scores of every valid one.
+
+    Candidates with invalid regexes (or greedy ones under ``strict``) are
+    dropped before scoring.  Bundles masking more than
+    :data:`MAX_MASKED_SHARE` of the sample's tokens lose to any bundle that
+    does not, however few templates they yield.  ``workers > 1`` scores bundles in parallel
+    processes that receive the sample once through the pool initializer
+    (inherited without pickling when the pool can ``fork``).  Safe to call
+    from several threads at once.
+    """
+
+    valid: List[Tuple[int, Sequence[Mask]]] = []
+    for index, masks in enumerate(candidates):
+        try:
+            validate_regexes([mask.pattern for mask in masks], strict=strict)
+        except ValueError as exc:
+            LOGGER.warning("Dropping candidate bundle %d: %s", index, exc)
+            continue
+        valid.append((index, masks))
+    if not valid:
+        raise ValueError("No valid candidate mask bundle to select from")
+    if len(valid) == 1:
+        return list(valid[0][1]), []
+
+    if workers <= 1:
+        scores = [score_bundle(index, masks, sample, repeats) for index, masks in valid]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(valid)),
+            mp_context=_worker_context(),
+            initializer=_install_shared,
+            initargs=((list(sample), repeats),),
+        ) as pool:
+            scores = list(pool.map(_score_shared, valid))
+
+    best = min(scores, key=BundleScore.rank_key)
+    for score in scores:
+        LOGGER.info(
+            "Candidate %d: %d masks, %d templates, coverage %.3f, masked %.3f, %.0f lines/s%s",
+            score.candidate,
+            score.masks,
+            score.templates,
+            score.coverage,
+            score.masked_share,
+            score.lines_per_second,
+            " (selected)" if score is best else "",
+        )
+    return list(dict(valid)[best.candidate]), scores
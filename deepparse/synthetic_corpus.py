@@ -0,0 +1,206 @@
+"""Deterministic synthetic LogHub-shaped corpora for scaling benchmarks."""
+from __future__ import annotations
+
+import bisect
+import csv
+import hashlib
+import itertools
+import json
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .dataset_catalog import MANIFEST_FILE, DatasetManifest
+from .logging_utils import get_logger
+from .seeds import resolve_seed
+
+LOGGER = get_logger(__name__)
+
+WILDCARD = "<*>"
+PARAMETER_KINDS = ("NUMBER", "IPV4", "HEX", "PATH", "ID")
+_SYLLABLES = ("ka", "lo", "mi", "nu", "re", "sa", "ti", "vo", "xe", "zu", "bra", "den", "fil", "gor")
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a generated corpus.
+
+    Template lengths are drawn from a normal distribution with
+    ``length_mean``/``length_stddev`` clipped to ``[min_length, max_length]``.
+    Template ``k`` (1-based rank) occurs with weight ``1 / k**zipf_s``, so
+    ``zipf_s=0`` is uniform.  Every parameter slot draws from
+    ``param_cardinality`` distinct values.  ``shared_bucket`` gives all
+    templates the same length and the same leading ``shared_prefix`` tokens,
+    the worst case for Drain where every template competes in one bucket.
+    """
+
+    name: str = "Synthetic"
+    lines: int = 10000
+    templates: int = 50
+    min_length: int = 3
+    max_length: int = 24
+    length_mean: float = 9.0
+    length_stddev: float = 3.0
+    param_fraction: float = 0.3
+    param_cardinality: int = 1000
+    zipf_s: float = 1.1
+    shared_bucket: bool = False
+    shared_prefix: int = 4
+    seed: Optional[int] = None
+
+    def validate(self) -> None:
+        if self.lines < 0:
+            raise ValueError("lines must be non-negative")
+        if self.templates < 1:
+            raise ValueError("templates must be at least 1")
+        if not 1 <= self.min_length <= self.max_length:
+            raise ValueError("Expected 1 <= min_length <= max_length")
+        if not 0.0 <= self.param_fraction < 1.0:
+            raise ValueError("param_fraction must be in [0, 1)")
+        if self.param_cardinality < 1:
+            raise ValueError("param_cardinality must be at least 1")
+        if self.zipf_s < 0:
+            raise ValueError("zipf_s must be non-negative")
+
+
+@dataclass
+class SyntheticTemplate:
+    event_id: str
+    tokens: List[Optional[str]]
+    slots: List[Tuple[int, str]]
+
+    @property
+    def template(self) -> str:
+        return " ".join(WILDCARD if token is None else token for token in self.tokens)
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3)))
+
+
+def _length(spec: CorpusSpec, rng: random.Random) -> int:
+    value = round(rng.gauss(spec.length_mean, spec.length_stddev))
+    return min(spec.max_length, max(spec.min_length, value))
+
+
+def build_templates(spec: CorpusSpec, rng: random.Random) -> List[SyntheticTemplate]:
+    """Draw ``spec.templates`` distinct templates (constant words plus parameter slots)."""
+
+    shared_length = _length(spec, rng)
+    prefix = [_word(rng) for _ in range(min(spec.shared_prefix, shared_length))]
+    templates: List[SyntheticTemplate] = []
+    seen = set()
+    attempts = 0
+    while len(templates) < spec.templates:
+        attempts += 1
+        if attempts > spec.templates * 100:
+            raise ValueError("Could not draw enough distinct templates; widen the length range")
+        length = shared_length if spec.shared_bucket else _length(spec, rng)
+        fixed = len(prefix) if spec.shared_bucket else 0
+        tokens: List[Optional[str]] = prefix[:fixed] + [_word(rng) for _ in range(length - fixed)]
+        slots: List[Tuple[int, str]] = []
+        for position in range(fixed, length):
+            # Keep at least one constant token so templates stay distinguishable.
+            if rng.random() < spec.param_fraction and len(slots) < length - fixed - 1:
+                tokens[position] = None
+                slots.append((position, rng.choice(PARAMETER_KINDS)))
+        key = tuple(tokens)
+        if key in seen:
+            continue
+        seen.add(key)
+        templates.append(SyntheticTemplate(f"E{len(templates) + 1}", tokens, slots))
+    return templates
+
+
+def parameter_value(kind: str, slot_salt: int, index: int) -> str:
+    """Render value ``index`` of a slot; distinct indices give distinct values."""
+
+    mixed = (index * 2654435761 + slot_salt) & 0xFFFFFFFF
+    if kind == "NUMBER":
+        return str(index + (slot_salt % 1000))
+    if kind == "IPV4":
+        return f"{10 + ((index >> 24) & 127)}.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+    if kind == "HEX":
+        return f"0x{mixed:08x}{index:x}"
+    if kind == "PATH":
+        return f"/var/data/{slot_salt % 97}/part-{index}"
+    return f"blk_{slot_salt % 9973}{index}"
+
+
+def zipf_cumulative_weights(count: int, s: float) -> List[float]:
+    return list(itertools.accumulate(1.0 / rank**s for rank in range(1, count + 1)))
+
+
+def generate_lines(
+    spec: CorpusSpec, templates: Sequence[SyntheticTemplate], rng: random.Random
+) -> Iterator[Tuple[int, str]]:
+    """Yield ``(template_index, line)`` pairs following the Zipf frequencies."""
+
+    cumulative = zipf_cumulative_weights(len(templates), spec.zipf_s)
+    total = cumulative[-1]
+    salts = [[rng.getrandbits(32) for _ in template.slots] for template in templates]
+    last = len(templates) - 1
+    for _ in range(spec.lines):
+        index = min(bisect.bisect_right(cumulative, rng.random() * total), last)
+        template = templates[index]
+        tokens: List[str] = list(template.tokens)  # type: ignore[arg-type]
+        for (position, kind), salt in zip(template.slots, salts[index]):
+            tokens[position] = parameter_value(kind, salt, rng.randrange(spec.param_cardinality))
+        yield index, " ".join(tokens)
+
+
+def generate_corpus(spec: CorpusSpec, dataset_dir: Path, structured: bool = True) -> Path:
+    """Write ``raw.log``, ``manifest.json`` and LogHub-style ground truth under ``dataset_dir/spec.name``.
+
+    Lines are streamed to disk, so memory stays flat regardless of
+    ``spec.lines``.  ``{name}_templates.csv`` lists every template with its
+    occurrence count; ``{name}_structured.csv`` (skipped when ``structured``
+    is false) maps each ``LineId`` to its ``EventId``.  The manifest checksum
+    equals :attr:`Dataset.checksum` of the loaded corpus.
+    """
+
+    spec.validate()
+    seed = resolve_seed(spec.seed)
+    rng = random.Random(seed)
+    templates = build_templates(spec, rng)
+    root = dataset_dir / spec.name
+    root.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    counts = [0] * len(templates)
+    structured_path = root / f"{spec.name}_structured.csv"
+    structured_fh = structured_path.open("w", encoding="utf-8", newline="") if structured else None
+    try:
+        writer = None
+        if structured_fh is not None:
+            writer = csv.writer(structured_fh)
+            writer.writerow(["LineId", "Content", "EventId", "EventTemplate"])
+        with (root / "raw.log").open("w", encoding="utf-8") as raw:
+            for line_id, (index, line) in enumerate(generate_lines(spec, templates, rng), start=1):
+                chunk = line if line_id == 1 else "\n" + line
+                raw.write(chunk)
+                digest.update(chunk.encode("utf-8"))
+                counts[index] += 1
+                if writer is not None:
+                    template = templates[index]
+                    writer.writerow([line_id, line, template.event_id, template.template])
+    finally:
+        if structured_fh is not None:
+            structured_fh.close()
+    with (root / f"{spec.name}_templates.csv").open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["EventId", "EventTemplate", "Occurrences"])
+        for template, count in zip(templates, counts):
+            writer.writerow([template.event_id, template.template, count])
+    stat = (root / "raw.log").stat()
+    manifest = DatasetManifest(
+        name=spec.name,
+        logs=spec.lines,
+        bytes=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        checksum=digest.hexdigest(),
+        extra={"synthetic": dict(asdict(spec), seed=seed)},
+    )
+    (root / MANIFEST_FILE).write_text(json.dumps(manifest.to_dict(), indent=2), encoding="utf-8")
+    LOGGER.info("Generated synthetic corpus %s: %d lines, %d templates", spec.name, spec.lines, len(templates))
+    return root
@@ -0,0 +1,173 @@
+"""Memory-mappable cache of preprocessed token streams."""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .dataset_loader import Dataset
+from .drain.masks_application import MaskApplier, mask_bundle_hash
+from .logging_utils import get_logger
+from .masks_types import Mask
+from .tokenize import preprocess_line
+from .utils.regex_backend import get_backend
+from .utils.regex_library import REGEX_CLASSES
+
+LOGGER = get_logger(__name__)
+
+CACHE_VERSION = 2
+META_FILE = "meta.json"
+VOCAB_FILE = "vocab.json"
+TOKENS_FILE = "tokens.bin"
+OFFSETS_FILE = "offsets.bin"
+TOKEN_TYPECODE = "I"
+OFFSET_TYPECODE = "Q"
+
+
+def _classes_hash() -> str:
+    payload = json.dumps([[cls.name, cls.pattern] for cls in REGEX_CLASSES])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_key(dataset_checksum: str, masks: Sequence[Mask], backend: Optional[str] = None) -> str:
+    """Key a cache entry; ``backend`` defaults to the active regex backend's name.
+
+    RE2 and stdlib ``re`` can tokenise the same line differently (RE2's
+    ``\\d``/``\\w`` are ASCII-only), so streams built by one are never
+    served to the other.
+    """
+
+    backend = backend or get_backend().name
+    material = f"{CACHE_VERSION}:{dataset_checksum}:{mask_bundle_hash(masks)}:{_classes_hash()}:{backend}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+
+class TokenStream(Sequence[Tuple[str, ...]]):
+    """Read-only view over a cached corpus.
+
+    Token ids and per-line offsets are memory mapped, so opening a cached
+    corpus costs only the vocabulary load; lines are materialised as token
+    tuples on access.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.meta = json.loads((root / META_FILE).read_text(encoding="utf-8"))
+        self.vocab: List[str] = json.loads((root / VOCAB_FILE).read_text(encoding="utf-8"))
+        self._handles = []
+        self._ids = self._map(TOKENS_FILE, TOKEN_TYPECODE)
+        self._offsets = self._map(OFFSETS_FILE, OFFSET_TYPECODE)
+
+    def _map(self, name: str, typecode: str):
+        path = self.root / name
+        if path.stat().st_size == 0:
+            return memoryview(array(typecode))
+        fh = path.open("rb")
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._handles.append((fh, mapped))
+        return memoryview(mapped).cast(typecode)
+
+    def close(self) -> None:
+        self._ids.release()
+        self._offsets.release()
+        for fh, mapped in self._handles:
+            mapped.close()
+            fh.close()
+        self._handles = []
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        vocab = self.vocab
+        return tuple(vocab[token_id] for token_id in self.token_ids(index))
+
+    def __iter__(self) -> Iterator[Tuple[str, ...]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def token_ids(self, index: int) -> memoryview:
+        return self._ids[self._offsets[index] : self._offsets[index + 1]]
+
+    def joined(self) -> List[str]:
+        """Return each line's tokens joined by single spaces."""
+
+        return [" ".join(tokens) for tokens in self]
+
+
+def _write_stream(root: Path, logs: Sequence[str], masks: Sequence[Mask], meta: Dict[str, object]) -> None:
+    applier = MaskApplier(masks) if masks else None
+    vocab: Dict[str, int] = {}
+    ids = array(TOKEN_TYPECODE)
+    offsets = array(OFFSET_TYPECODE, [0])
+    for line in logs:
+        for token in preprocess_line(line, applier):
+            ids.append(vocab.setdefault(token, len(vocab)))
+        offsets.append(len(ids))
+    root.mkdir(parents=True, exist_ok=True)
+    with (root / TOKENS_FILE).open("wb") as fh:
+        ids.tofile(fh)
+    with (root / OFFSETS_FILE).open("wb") as fh:
+        offsets.tofile(fh)
+    (root / VOCAB_FILE).write_text(json.dumps(list(vocab)), encoding="utf-8")
+    meta = dict(meta, lines=len(logs), tokens=len(ids), vocab=len(vocab))
+    (root / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+class TokenStreamCache:
+    """Build-once store of preprocessed corpora under ``root``.
+
+    Entries are keyed by the dataset checksum, the mask bundle hash, the
+    canonical token classes and the regex backend, so any change to the
+    data, the masks, :data:`REGEX_CLASSES` or the engine matching them
+    produces a new entry.  An empty mask bundle caches
+    the unmasked stream used for derived ground truth.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path_for(self, dataset: Dataset, masks: Sequence[Mask], checksum: Optional[str] = None) -> Path:
+        return self.root / dataset.name / cache_key(checksum or dataset.checksum, masks)
+
+    def load(self, dataset: Dataset, masks: Sequence[Mask], checksum: Optional[str] = None) -> TokenStream:
+        checksum = checksum or dataset.checksum
+        backend = get_backend().name
+        path = self.path_for(dataset, masks, checksum)
+        if (path / META_FILE).exists():
+            stream = TokenStream(path)
+            meta = stream.meta
+            if (
+                meta.get("version") == CACHE_VERSION
+                and meta.get("regex_backend") == backend
+                and len(stream) == len(dataset.logs)
+            ):
+                LOGGER.debug("Token cache hit for %s at %s", dataset.name, path)
+                return stream
+            stream.close()
+            LOGGER.warning("Discarding inconsistent token cache at %s", path)
+            shutil.rmtree(path)
+        LOGGER.info("Building token cache for %s (%d masks) at %s", dataset.name, len(masks), path)
+        tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        meta = {
+            "version": CACHE_VERSION,
+            "dataset": dataset.name,
+            "dataset_checksum": checksum,
+            "mask_bundle": mask_bundle_hash(masks),
+            "regex_backend": backend,
+        }
+        _write_stream(tmp_path, dataset.logs, masks, meta)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:  # pragma: no cover - another process published the entry first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return TokenStream(path)
@@ -2,20 +2,82 @@
 from __future__ import annotations
 
 import re
-from typing import List, Sequence
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
 
-from .utils.regex_library import classify_token
+from .utils.regex_library import classify_token, fast_classify_token
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .drain.masks_application import MaskApplier
 
 TOKEN_SPLIT = re.compile(r"\s+")
+WILDCARD = "<*>"
+MAX_CACHED_TOKENS = 1 << 17
 
 
 def tokenize(line: str) -> List[str]:
     return [tok for tok in TOKEN_SPLIT.split(line.strip()) if tok]
 
 
+class TokenClassCache:
+    """Memoise the class placeholder for repeated tokens.
+
+    Log vocabularies are heavily skewed, so most tokens are classified once.
+    The cache is simply cleared when it reaches ``max_size`` entries to keep
+    high-cardinality streams from growing it without bound.
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_TOKENS):
+        self.max_size = max_size
+        self._masked: Dict[str, str] = {WILDCARD: WILDCARD}
+
+    def __len__(self) -> int:
+        return len(self._masked)
+
+    def clear(self) -> None:
+        self._masked = {WILDCARD: WILDCARD}
+
+    def mask(self, token: str) -> str:
+        masked = self._masked.get(token)
+        if masked is None:
+            cls = fast_classify_token(token)
+            masked = f"<{cls}>" if cls else token
+            if len(self._masked) >= self.max_size:
+                self.clear()
+            self._masked[token] = masked
+        return masked
+
+    def mask_all(self, tokens: Sequence[str]) -> List[str]:
+        cached = self._masked.get
+        mask = self.mask
+        return [cached(token) or mask(token) for token in tokens]
+
+
+TOKEN_CLASS_CACHE = TokenClassCache()
+
+
 def mask_tokens(tokens: Sequence[str]) -> List[str]:
+    return TOKEN_CLASS_CACHE.mask_all(tokens)
+
+
+def mask_tokens_reference(tokens: Sequence[str]) -> List[str]:
+    """Unoptimised per-class classification, kept as the behavioural reference."""
+
     masked: List[str] = []
     for token in tokens:
         cls = classify_token(token)
         masked.append(f"<{cls}>" if cls else token)
     return masked
+
+
+def preprocess_line(line: str, applier: Optional[MaskApplier] = None) -> List[str]:
+    """Mask, split and classify ``line`` in one pass over its tokens.
+
+    Equivalent to ``mask_tokens(tokenize(applier.apply(line)))``: mask
+    substitutions still run in order over the whole line (later masks may
+    match text produced by earlier ones), but splitting and classification
+    happen in a single scan with memoised, single-regex token classes.
+    """
+
+    if applier is not None:
+        line = applier.apply(line)
+    return TOKEN_CLASS_CACHE.mask_all(line.split())
@@ -0,0 +1,88 @@
+"""Pluggable regex engines for masks and token classes."""
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+from ..logging_utils import get_logger
+
+try:  # Optional linear-time engine (``google-re2`` or another ``re2`` module)
+    import re2  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    re2 = None
+
+LOGGER = get_logger(__name__)
+
+BACKEND_ENV = "DEEPPARSE_REGEX_BACKEND"
+BACKEND_CHOICES = ("auto", "re", "re2")
+
+
+class CompiledRegex(NamedTuple):
+    """A compiled pattern and the name of the engine that actually compiled it."""
+
+    pattern: str
+    regex: Any
+    backend: str
+
+
+class RegexBackend:
+    """Compile patterns with one engine, falling back to stdlib ``re`` per pattern.
+
+    Linear-time engines such as RE2 reject backreferences and lookaround;
+    such a pattern is compiled with ``re`` instead and reported through
+    :attr:`CompiledRegex.backend`, so one unusual mask never disables the
+    faster engine for the rest of a bundle.  Compiled objects expose the
+    ``re.Pattern`` methods the parser uses (``sub``, ``match``,
+    ``finditer``).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compile_fn: Callable[[str], Any],
+        unsupported: Tuple[Type[BaseException], ...] = (Exception,),
+    ):
+        self.name = name
+        self._compile = compile_fn
+        self._unsupported = unsupported
+
+    def __repr__(self) -> str:
+        return f"RegexBackend({self.name!r})"
+
+    def compile(self, pattern: str) -> CompiledRegex:
+        if self.name != STDLIB.name:
+            try:
+                return CompiledRegex(pattern, self._compile(pattern), self.name)
+            except self._unsupported as exc:
+                LOGGER.debug("%s cannot compile %r (%s); using re", self.name, pattern, exc)
+        return CompiledRegex(pattern, re.compile(pattern), STDLIB.name)
+
+
+STDLIB = RegexBackend("re", re.compile)
+RE2: Optional[RegexBackend] = RegexBackend("re2", re2.compile) if re2 is not None else None
+
+
+def available_backends() -> Dict[str, RegexBackend]:
+    backends = {STDLIB.name: STDLIB}
+    if RE2 is not None:
+        backends[RE2.name] = RE2
+    return backends
+
+
+def get_backend(name: Optional[str] = None) -> RegexBackend:
+    """Resolve ``name`` (default: ``$DEEPPARSE_REGEX_BACKEND`` or ``auto``).
+
+    ``auto`` picks RE2 when an ``re2`` module is installed and stdlib ``re``
+    otherwise.  Note that RE2 treats ``\\d``/``\\w`` as ASCII-only.
+    """
+
+    name = (name or os.environ.get(BACKEND_ENV) or "auto").lower()
+    if name not in BACKEND_CHOICES:
+        raise ValueError(f"Unknown regex backend {name!r}; choose from {', '.join(BACKEND_CHOICES)}")
+    if name == "auto":
+        return RE2 or STDLIB
+    backend = available_backends().get(name)
+    if backend is None:
+        raise ValueError(f"Regex backend {name!r} requested but the re2 module is not installed")
+    return backend
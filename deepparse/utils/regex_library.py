@@ -3,7 +3,9 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
+
+from .regex_backend import get_backend
 
 
 @dataclass(frozen=True)
@@ -67,6 +69,33 @@ def classify_token(token: str) -> str | None:
     return None
 
 
+# All classes in one alternation: the regex engine tries the alternatives in
+# order, so the first named group to match is the class ``classify_token``
+# reports.  ``_PatternWrapper.match`` also accepts each class's sample text.
+_CLASS_REGEX = get_backend().compile("|".join(f"(?P<{cls.name}>{cls.pattern})" for cls in REGEX_CLASSES))
+_CLASS_PATTERN = _CLASS_REGEX.regex
+_CLASS_RANK = {cls.name: rank for rank, cls in enumerate(REGEX_CLASSES)}
+_SAMPLE_RANK: Dict[str, int] = {}
+for _rank, _cls in enumerate(REGEX_CLASSES):
+    _SAMPLE_RANK.setdefault(_cls._sample_text(), _rank)
+
+
+def _matched_class(match) -> str:
+    if _CLASS_REGEX.backend == "re":
+        return match.lastgroup
+    # Other engines may not report ``lastgroup``; only the winning alternative's group is set.
+    return next(name for name, value in match.groupdict().items() if value is not None)
+
+
+def fast_classify_token(token: str) -> Optional[str]:
+    """Single-regex equivalent of :func:`classify_token`."""
+
+    match = _CLASS_PATTERN.match(token)
+    rank = _CLASS_RANK[_matched_class(match)] if match is not None else len(REGEX_CLASSES)
+    rank = min(rank, _SAMPLE_RANK.get(token, rank))
+    return REGEX_CLASSES[rank].name if rank < len(REGEX_CLASSES) else None
+
+
 def validate_regexes(regexes: Iterable[str], strict: bool = False) -> List[str]:
     compiled: List[str] = []
     for regex in regexes:
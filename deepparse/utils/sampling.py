@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import hashlib
+import heapq
 from typing import Iterable, List, Sequence
 
 from .regex_library import classify_token
@@ -47,6 +48,17 @@ def deterministic_sample(logs: Sequence[str], k: int) -> List[str]:
     return selected[:k]
 
 
+def held_out_sample(logs: Sequence[str], k: int, exclude: Iterable[str] = ()) -> List[str]:
+    """Pick ``k`` distinct lines by stable hash order, skipping ``exclude``.
+
+    Used to score synthesised masks on lines the synthesiser did not see.
+    """
+
+    excluded = set(exclude)
+    candidates = {line for line in logs if line not in excluded}
+    return heapq.nsmallest(k, candidates, key=stable_hash)
+
+
 def deterministic_indices(logs: Sequence[str], k: int) -> List[int]:
     sample = deterministic_sample(logs, k)
     return [logs.index(line) for line in sample]
@@ -0,0 +1,53 @@
+import json
+
+from click.testing import CliRunner
+
+from deepparse.cli import cli
+from deepparse.evaluation.bench_history import append_run, compare_runs, load_runs
+from deepparse.evaluation.timing_bench import TIMING_STAGES, run_timing_benchmark
+from deepparse.io_paths import build_paths
+
+
+def test_timing_benchmark_appends_runs_to_history(tmp_path):
+    paths = build_paths(tmp_path / "data", tmp_path / "masks", tmp_path / "out", tmp_path / "logs")
+    (paths.dataset_dir / "Mini").mkdir()
+    lines = [f"worker {i % 5} finished job {i}" for i in range(40)]
+    (paths.dataset_dir / "Mini" / "raw.log").write_text("\n".join(lines), encoding="utf-8")
+    mask_path = paths.mask_dir / "Mini.json"
+    mask_path.write_text(json.dumps([{"label": "NUMBER", "pattern": r"\d+", "justification": ""}]))
+    history = tmp_path / "history.jsonl"
+
+    for run_id in ("a", "b"):
+        result = run_timing_benchmark(
+            "Mini", paths, mask_path, 20, paths.output_dir / "timing.csv", repeats=3,
+            history_path=history, run_id=run_id,
+        )
+        assert result.run_id == run_id
+        assert all(len(result.stages[stage]) == 3 for stage in TIMING_STAGES)
+
+    runs = load_runs(history)
+    assert list(runs) == ["a", "b"]
+    record = runs["a"][0]
+    assert record["n_logs"] == 20 and record["config"]["repeats"] == 3
+    assert {"git_revision", "python", "cpu"} <= set(record["environment"])
+
+
+def test_compare_runs_is_noise_aware(tmp_path):
+    history = tmp_path / "history.jsonl"
+    append_run(history, "old", "Mini", 10, {"total": [1.0, 1.01, 0.99], "noisy": [1.0, 1.5, 0.6]}, {})
+    append_run(history, "new", "Mini", 10, {"total": [1.3, 1.31, 1.29], "noisy": [1.3, 0.8, 1.9]}, {})
+    runs = load_runs(history)
+
+    verdicts = {c.stage: c.verdict for c in compare_runs(runs["old"], runs["new"])}
+    assert verdicts == {"total": "regression", "noisy": "unchanged"}
+    reverse = {c.stage: c.verdict for c in compare_runs(runs["new"], runs["old"])}
+    assert reverse["total"] == "improvement"
+
+    runner = CliRunner()
+    failed = runner.invoke(cli, ["bench-compare", "--history", str(history)])
+    assert failed.exit_code == 1
+    assert "regression" in failed.output
+    passed = runner.invoke(
+        cli, ["bench-compare", "--history", str(history), "--baseline", "new", "--candidate", "old"]
+    )
+    assert passed.exit_code == 0, passed.output
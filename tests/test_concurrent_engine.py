@@ -0,0 +1,89 @@
+import sys
+import threading
+
+import pytest
+
+from deepparse.drain.concurrent import ConcurrentDrainEngine, LockedTokenInterner
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.evaluation.thread_bench import run_thread_scaling
+from deepparse.masks_types import Mask
+
+NUMBERS = [Mask("NUMBER", r"\b\d+\b", "numbers")]
+
+
+def _lines(n):
+    return [
+        f"svc{i % 7} {'GET' if i % 3 else 'PUT'} request {i} served in {i * 3} ms by node{i % 5} status {i % 2}"
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_single_thread_matches_sequential_engine():
+    lines = _lines(500)
+    expected = DrainEngine(masks=NUMBERS, max_clusters_per_bucket=2).parse(lines)
+    engine = ConcurrentDrainEngine(masks=NUMBERS, max_clusters_per_bucket=2)
+    assert engine.parse_parallel(lines, threads=1) == expected
+    with pytest.raises(ValueError):
+        ConcurrentDrainEngine(max_clusters=10)
+
+
+def test_stress_many_producers_keep_the_tree_consistent(fast_switching):
+    lines = _lines(4000)
+    sequential = DrainEngine(masks=NUMBERS)
+    sequential.parse(lines)
+    engine = ConcurrentDrainEngine(masks=NUMBERS, lock_stripes=4)
+    seen = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            seen.extend(template.count(" ") for template in engine.templates().values())
+
+    watcher = threading.Thread(target=reader)
+    watcher.start()
+    try:
+        parsed = engine.parse_parallel(lines, threads=8)
+    finally:
+        done.set()
+        watcher.join()
+
+    for line, template in zip(lines, parsed):
+        tokens = engine.preprocess(line)
+        assert all(t == tok or t == "<*>" for t, tok in zip(template.split(), tokens))
+    clusters = [cluster for bucket in engine.clusters.values() for cluster in bucket]
+    assert sum(cluster.size for cluster in clusters) == len(lines)
+    assert sorted(c.cluster_id for c in clusters) == sorted(engine._live)
+    assert sorted(engine.templates().values()) == sorted(
+        cluster.template_str() for bucket in sequential.clusters.values() for cluster in bucket
+    )
+    for bucket in engine.clusters.values():
+        for index, cluster in enumerate(bucket):
+            assert bucket.row(index) == engine.interner.lookup_many(cluster.template)
+    width = len(engine.preprocess(lines[0]))
+    assert set(seen) <= {width - 1}  # readers only ever saw whole templates
+
+
+def test_locked_interner_hands_out_unique_ids(fast_switching):
+    interner = LockedTokenInterner()
+    tokens = [f"tok{i}" for i in range(2000)]
+    threads = [threading.Thread(target=interner.intern_many, args=(tokens,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(interner) == len(tokens) + 1
+    assert interner.tokens(interner.intern_many(tokens)) == tokens
+
+
+def test_thread_scaling_benchmark_reports_each_count():
+    rows = run_thread_scaling("Demo", _lines(600), NUMBERS, threads=[1, 2], repeats=1)
+    assert [row.threads for row in rows] == [1, 2] and rows[0].speedup == 1.0
+    assert all(row.n_logs == 600 and row.clusters == rows[0].clusters for row in rows)
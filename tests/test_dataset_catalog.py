@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+
+from deepparse.dataset_catalog import DatasetCatalog
+from deepparse.dataset_loader import iter_log_lines, load_dataset, load_many
+from deepparse.io_paths import build_paths
+
+
+def _paths(tmp_path):
+    return build_paths(tmp_path / "data", tmp_path / "masks", tmp_path / "out", tmp_path / "logs")
+
+
+def _write(paths, name, text):
+    root = paths.dataset_dir / name
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "raw.log").write_text(text, encoding="utf-8")
+    return root
+
+
+def test_streamed_lines_and_checksum_match_full_read(tmp_path):
+    paths = _paths(tmp_path)
+    text = "  first line \n\n\tsecond\x0bthird\r\nfourth\rfifth \n"
+    root = _write(paths, "Odd", text)
+    expected = [line.strip() for line in text.splitlines() if line.strip()]
+    assert list(iter_log_lines(root / "raw.log")) == expected
+
+    dataset = DatasetCatalog(paths).load("Odd")
+    assert dataset.logs == expected
+    assert dataset.checksum == hashlib.sha256("\n".join(expected).encode("utf-8")).hexdigest()
+    assert DatasetCatalog(paths).manifest("Odd").checksum == dataset.checksum
+
+
+def test_manifest_is_trusted_until_the_file_changes(tmp_path):
+    paths = _paths(tmp_path)
+    root = _write(paths, "App", "a 1\nb 2\n")
+    manifest_path = root / "manifest.json"
+    manifest_path.write_text(json.dumps({"name": "App", "logs": 2, "checksum": "x", "synthetic": {"seed": 3}}))
+    catalog = DatasetCatalog(paths)
+
+    fresh = catalog.load("App")
+    manifest = json.loads(manifest_path.read_text())
+    assert manifest["checksum"] == fresh.checksum and manifest["synthetic"] == {"seed": 3}
+    assert manifest["bytes"] == (root / "raw.log").stat().st_size
+
+    # An unchanged file is not re-hashed: a planted checksum is returned as-is.
+    manifest_path.write_text(json.dumps(dict(manifest, checksum="planted")))
+    assert catalog.load("App").checksum == "planted"
+    assert catalog.manifest("App", verify=True).checksum == fresh.checksum
+
+    (root / "raw.log").write_text("a 1\nb 2\nc 3\n", encoding="utf-8")
+    os.utime(root / "raw.log", ns=(1, 1))
+    changed = catalog.load("App")
+    assert changed.checksum == load_dataset("App", paths).checksum != fresh.checksum
+
+
+def test_concurrent_loading_preserves_order(tmp_path):
+    paths = _paths(tmp_path)
+    names = [f"D{i}" for i in range(6)]
+    for i, name in enumerate(names):
+        _write(paths, name, "\n".join(f"{name} line {j}" for j in range(i + 1)))
+
+    loaded = DatasetCatalog(paths).load_many(names, workers=3)
+    assert [dataset.name for dataset in loaded] == names
+    assert [len(dataset.logs) for dataset in loaded] == list(range(1, 7))
+    assert [d.logs for d in load_many(names, paths, workers=3)] == [d.logs for d in loaded]
@@ -0,0 +1,93 @@
+import json
+
+from deepparse.drain.concurrent import ConcurrentDrainEngine
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.drain.stats import WindowedTemplateStats
+from deepparse.index import build_template_index
+
+
+JOBS = ["backup", "index", "mail", "report", "sync", "purge", "scan", "audit", "build"]
+HOSTS = ["alpha", "beta", "gamma"]
+
+
+def _lines(n):
+    return [f"job {JOBS[i % 9]} state {'up' if i % 2 else 'down'} on {HOSTS[i % 3]} rc ok" for i in range(n)]
+
+
+def _covers(template, line):
+    return all(t == tok or t == "<*>" for t, tok in zip(template.split(), line.split()))
+
+
+def test_bucket_trigger_keeps_candidates_short():
+    lines = _lines(600)
+    plain = DrainEngine(depth=1, similarity_threshold=0.95)
+    plain.parse(lines)
+    engine = DrainEngine(depth=1, similarity_threshold=0.95, compact_bucket_size=4, compaction_max_diff=2)
+    parsed = engine.parse(lines)
+
+    assert max(len(bucket) for bucket in plain.clusters.values()) == 18
+    assert max(len(bucket) for bucket in engine.clusters.values()) < 4
+    assert all(_covers(template, line) for template, line in zip(parsed, lines))
+    assert sum(cluster.size for bucket in engine.clusters.values() for cluster in bucket) == len(lines)
+    stats = engine.compaction_stats
+    assert (stats.passes, stats.merged, engine.cluster_count) == (1, 3, 1)
+    assert len(engine._merged_ids) == stats.merged
+    assert all(engine.resolve_cluster_id(old) in engine._live for old in engine._merged_ids)
+
+
+def test_explicit_compaction_survives_snapshots():
+    engine = DrainEngine(depth=1, similarity_threshold=0.95)
+    engine.parse(_lines(60))
+    before = engine.cluster_count
+    assert engine.compact() == before - 1
+    (survivor,) = engine._live.values()
+    assert survivor.cluster_id == 0 and survivor.size == 60
+    assert survivor.template_str() == "job <*> state <*> on <*> rc ok"
+
+    restored = DrainEngine.from_state(json.loads(json.dumps(engine.to_state())))
+    assert restored.resolve_cluster_id(before - 1) == 0
+    assert restored.compaction_stats == engine.compaction_stats
+    assert restored.parse(_lines(5)) == ["job <*> state <*> on <*> rc ok"] * 5
+
+
+def test_periodic_compaction_and_concurrent_engine_agree():
+    lines = _lines(300)
+    periodic = DrainEngine(depth=1, similarity_threshold=0.95, compact_every=300)
+    periodic.parse(lines)
+    concurrent = ConcurrentDrainEngine(depth=1, similarity_threshold=0.95)
+    concurrent.parse_parallel(lines, threads=2)
+    concurrent.compact()
+    assert periodic.compaction_stats.passes == 1
+    assert sorted(concurrent.templates().values()) == ["job <*> state <*> on <*> rc ok"]
+    assert [c.template_str() for c in periodic._live.values()] == ["job <*> state <*> on <*> rc ok"]
+
+
+def test_index_and_stats_follow_merged_ids(tmp_path):
+    lines = _lines(120)
+    raw = tmp_path / "raw.log"
+    raw.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    stats = WindowedTemplateStats(window_seconds=60)
+    engine = DrainEngine(depth=1, similarity_threshold=0.95, compact_every=40, stats=stats)
+    with build_template_index(raw, engine, tmp_path / "idx") as index:
+        entries = index.templates()
+        assert [entry.template_id for entry in entries] == sorted(engine._live)
+        assert sum(entry.count for entry in entries) == len(lines)
+        numbers = sorted(n for entry in entries for n in index.line_numbers(entry.template_id))
+        assert numbers == list(range(len(lines)))
+        for entry in entries:
+            assert entry.template == engine._live[entry.template_id].template_str()
+            assert all(_covers(entry.template, line) for line in index.read_lines(entry.template_id))
+    assert {key for key, _ in stats.top_k(100)} <= set(engine._live) and stats.total() == len(lines)
+
+
+def test_merged_ids_stay_flat_and_are_pruned_with_their_survivor():
+    engine = DrainEngine(
+        depth=1, similarity_threshold=0.95, compact_bucket_size=4, compaction_max_diff=2, max_clusters=8
+    )
+    for i, line in enumerate(_lines(3000)):
+        engine.add_log(f"p{(i // 50) % 10} {line}")  # buckets rotate and are evicted
+    assert engine.compaction_stats.merged > 0
+    assert all(root in engine._live for root in engine._merged_ids.values())
+    assert len(engine._merged_ids) < engine.compaction_stats.merged
+    restored = DrainEngine.from_state(json.loads(json.dumps(engine.to_state())))
+    assert restored._merged_ids == engine._merged_ids
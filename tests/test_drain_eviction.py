@@ -0,0 +1,44 @@
+import pytest
+
+from deepparse.drain.drain_engine import DrainEngine
+
+
+def _unique_lines(count):
+    return [f"event{i} payload{i} stage{i}" for i in range(count)]
+
+
+def test_global_limit_evicts_least_recently_seen():
+    engine = DrainEngine(max_clusters=3)
+    engine.parse(_unique_lines(3))
+    engine.add_log("event0 payload0 stage0")
+    engine.add_log("event3 payload3 stage3")
+    templates = {cluster.template_str() for bucket in engine.clusters.values() for cluster in bucket}
+    assert engine.cluster_count == 3
+    assert "event1 payload1 stage1" not in templates
+    assert engine.eviction_stats.global_evictions == 1
+    assert engine.eviction_stats.evicted_lines == 1
+
+
+def test_lfu_keeps_frequent_clusters():
+    engine = DrainEngine(max_clusters=2, eviction_policy="lfu")
+    engine.parse(["hot path a", "hot path a", "cold path b"])
+    engine.add_log("new path c")
+    templates = {cluster.template_str() for bucket in engine.clusters.values() for cluster in bucket}
+    assert templates == {"hot path a", "new path c"}
+
+
+def test_bucket_limit_bounds_candidates():
+    engine = DrainEngine(similarity_threshold=0.9, max_clusters_per_bucket=4)
+    engine.parse([f"job start on host a{i} b{i}" for i in range(50)])
+    (bucket,) = engine.clusters.values()
+    assert len(bucket) == 4
+    assert [cluster.cluster_id for cluster in bucket] == [46, 47, 48, 49]
+    assert engine.eviction_stats.bucket_evictions == 46
+    assert engine.eviction_stats.to_dict()["evicted"] == 46
+
+
+def test_invalid_eviction_settings_rejected():
+    with pytest.raises(ValueError):
+        DrainEngine(eviction_policy="random")
+    with pytest.raises(ValueError):
+        DrainEngine(max_clusters=0)
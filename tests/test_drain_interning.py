@@ -0,0 +1,57 @@
+from deepparse.drain.buckets import VECTORISE_MIN_CLUSTERS, ClusterBucket
+from deepparse.drain.drain_engine import DrainCluster, DrainEngine
+from deepparse.drain.interning import MISSING_ID, WILDCARD, WILDCARD_ID, TokenInterner
+
+
+def test_interner_reserves_wildcard_id():
+    interner = TokenInterner()
+    assert interner.intern(WILDCARD) == WILDCARD_ID
+    ids = interner.intern_many(["a", "b", "a"])
+    assert ids[0] == ids[2] != ids[1]
+    assert interner.tokens(ids) == ["a", "b", "a"]
+
+
+def test_bucket_scores_match_string_similarity():
+    interner = TokenInterner()
+    templates = [[f"t{i}", "x", WILDCARD, f"v{i % 3}"] for i in range(VECTORISE_MIN_CLUSTERS * 2)]
+    bucket = ClusterBucket(width=4)
+    for template in templates:
+        bucket.append(DrainCluster(template=list(template)), interner.intern_many(template))
+    line = ["t3", "x", "anything", "v0"]
+    counts = bucket.match_counts(interner.intern_many(line))
+    expected = [DrainCluster(template=list(t)).similarity(line) * 4 for t in templates]
+    assert counts == expected
+    index, score = bucket.best_match(interner.intern_many(line))
+    assert index == 3 and score == 1.0
+
+
+def test_engine_generalises_templates_in_crowded_bucket():
+    engine = DrainEngine(similarity_threshold=0.75)
+    logs = [f"job start on host a{i} b{i} c{i} d{i}" for i in range(20)]
+    engine.parse(logs)
+    (bucket,) = engine.clusters.values()
+    assert len(bucket) == 20
+    template = engine.add_log("job start on host a7 b7 c7 other").template_str()
+    assert template == "job start on host a7 b7 c7 <*>"
+    assert engine.interner.tokens(bucket.row(7)) == bucket[7].template
+
+
+def test_interner_forgets_tokens_released_by_every_template():
+    interner = TokenInterner()
+    first = interner.acquire_many(["a", "b", WILDCARD])
+    interner.acquire_many(["a", "c"])
+    assert interner.lookup_many(["a", "zzz"]) == [first[0], MISSING_ID] and len(interner) == 4
+    interner.release(first)
+    assert interner.lookup_many(["a", "b"]) == [first[0], MISSING_ID] and len(interner) == 3
+    assert interner.acquire_many(["d"]) == [first[1]]  # freed ids are reused
+
+
+def test_interner_stays_bounded_under_cluster_churn():
+    engine = DrainEngine(max_clusters=10, max_clusters_per_bucket=2)
+    for i in range(20000):
+        engine.add_log(f"req u{i} p{i % 97} from {'ab'[i % 2]} took s{i * 7}")
+    live = {tok for bucket in engine.clusters.values() for cluster in bucket for tok in cluster.template}
+    assert len(engine.interner) == len(live | {WILDCARD}) <= 10 * 6 + 1
+    for bucket in engine.clusters.values():
+        for index, cluster in enumerate(bucket):
+            assert engine.interner.tokens(bucket.row(index)) == cluster.template
@@ -0,0 +1,54 @@
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.drain.pool import EnginePool
+from deepparse.masks_types import Mask
+
+NUMBERS = [Mask("NUMBER", r"\b\d+\b", "numbers")]
+HEX = [Mask("HEX", r"0x[0-9a-f]+", "hex")]
+
+
+def _source_lines(source, n):
+    return [f"{source} request {i % 5} served in {i * 3} ms by node{i % 2} 0x{i:x}" for i in range(n)]
+
+
+def test_pool_matches_dedicated_engines_across_spills(tmp_path):
+    sources = {"api": NUMBERS, "db": NUMBERS, "cache": HEX}
+    pool = EnginePool(sources.__getitem__, tmp_path, max_resident=1, engine_options={"max_clusters": 4})
+    lines = {source: _source_lines(source, 30) for source in sources}
+    records = [(source, lines[source][i]) for i in range(30) for source in sources]
+    pooled = pool.parse(records)
+
+    for source, masks in sources.items():
+        expected = DrainEngine(masks=masks, max_clusters=4).parse(lines[source])
+        assert [t for (s, _), t in zip(records, pooled) if s == source] == expected
+    assert len(pool.appliers) == 2  # api and db share one compiled bundle
+    assert pool.stats.created == 3 and pool.stats.spilled == pool.stats.restored + 2
+    assert pool.resident == ["cache"] and pool.sources() == ["api", "cache", "db"]
+    assert len(list(tmp_path.iterdir())) == 2
+
+    pool.discard_spilled()
+    assert list(tmp_path.iterdir()) == [] and pool.sources() == ["cache"]
+
+
+def test_pool_shares_applier_and_respects_cluster_cap(tmp_path):
+    pool = EnginePool(lambda source: NUMBERS, tmp_path, max_resident=10, max_resident_clusters=3)
+    for source in ("a", "b", "c"):
+        pool.add_log(source, f"{source} started")
+        pool.add_log(source, f"{source} stopped with code 3")
+    assert pool.resident == ["c"] and pool.stats.spilled == 2
+    assert pool.engine("a").applier is pool.engine("b").applier  # restored engines reuse it too
+    assert pool.resident == ["b"] and pool.stats.restored == 2
+
+
+def test_running_cluster_total_tracks_resident_engines(tmp_path):
+    pool = EnginePool(
+        lambda source: NUMBERS,
+        tmp_path,
+        max_resident=2,
+        max_resident_clusters=6,
+        engine_options={"max_clusters": 3},
+    )
+    for i in range(200):
+        pool.add_log(f"s{i % 4}", f"s{i % 4} op{i % 7} done in {i} ms")
+        resident = [pool.engine(source) for source in pool.resident]
+        assert pool._resident_clusters == sum(engine.cluster_count for engine in resident) <= 6
+    assert pool.stats.spilled > 0 and pool.stats.restored > 0
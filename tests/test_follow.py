@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from deepparse.drain.concurrent import ConcurrentDrainEngine
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.follow import LogFollower
+from deepparse.masks_types import Mask
+
+MASKS = [Mask(label="NUMBER", pattern=r"\d+", justification="numbers")]
+
+
+def _append(path, text):
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+def test_follower_handles_partial_lines_rotation_and_truncation(tmp_path):
+    log = tmp_path / "service.log"
+    seen = []
+    follower = LogFollower(
+        [log],
+        DrainEngine(masks=MASKS),
+        on_batch=lambda path, lines, templates: seen.extend(zip(lines, templates)),
+    )
+    _append(log, "request 1 ok\nrequest 2 ok\nrequest 3")
+    assert follower.poll_once() == 2
+    _append(log, " ok\n")
+    assert follower.poll_once() == 1
+    assert seen[-1] == ("request 3 ok", "request <*> ok")
+
+    _append(log, "request 4 ok\n")
+    os.rename(log, tmp_path / "service.log.1")
+    _append(log, "shutdown 5\n")
+    assert follower.poll_once() == 2
+    assert [line for line, _ in seen[-2:]] == ["request 4 ok", "shutdown 5"]
+
+    log.write_text("boot 6\n", encoding="utf-8")
+    assert follower.poll_once() == 1
+    assert seen[-1][0] == "boot 6"
+    follower.close()
+
+
+def test_follower_resumes_from_checkpoint(tmp_path):
+    log = tmp_path / "service.log"
+    checkpoint = tmp_path / "ckpt.json"
+    _append(log, "user 1 login\nuser 2 login\n")
+    first = LogFollower.resume([log], checkpoint, lambda: DrainEngine(masks=MASKS))
+    assert first.poll_once() == 2
+    first.close()
+
+    _append(log, "user 3 login\n")
+    seen = []
+    second = LogFollower.resume(
+        [log],
+        checkpoint,
+        lambda: DrainEngine(masks=MASKS),
+        on_batch=lambda path, lines, templates: seen.extend(lines),
+    )
+    assert second.engine.cluster_count == 1
+    assert second.poll_once() == 1
+    assert seen == ["user 3 login"]
+    assert second.lines_processed == 3
+    (bucket,) = second.engine.clusters.values()
+    assert bucket[0].size == 3
+    second.close()
+
+
+def test_resume_builds_through_factory_and_rejects_other_settings(tmp_path):
+    log = tmp_path / "service.log"
+    checkpoint = tmp_path / "ckpt.json"
+    _append(log, "user 1 login\n")
+    first = LogFollower.resume([log], checkpoint, lambda: ConcurrentDrainEngine(masks=MASKS))
+    assert first.poll_once() == 1
+    first.close()
+
+    resumed = LogFollower.resume([log], checkpoint, lambda: ConcurrentDrainEngine(masks=MASKS))
+    assert isinstance(resumed.engine, ConcurrentDrainEngine) and resumed.engine.cluster_count == 1
+    resumed.close()
+    with pytest.raises(ValueError, match="masks"):
+        LogFollower.resume([log], checkpoint, DrainEngine)
+
+
+def test_long_backlog_checkpoints_between_batches(tmp_path):
+    log = tmp_path / "service.log"
+    checkpoint = tmp_path / "ckpt.json"
+    _append(log, "".join(f"user {i} login\n" for i in range(5)))
+    checkpointed = []
+
+    def on_batch(path, lines, templates):
+        if checkpoint.exists():
+            checkpointed.append(json.loads(checkpoint.read_text(encoding="utf-8"))["lines_processed"])
+
+    follower = LogFollower(
+        [log], DrainEngine(masks=MASKS), checkpoint, batch_size=2, checkpoint_interval=0, on_batch=on_batch
+    )
+    assert follower.poll_once() == 5
+    assert checkpointed == [2, 4]
+    follower.close()
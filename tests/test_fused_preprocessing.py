@@ -0,0 +1,44 @@
+import random
+
+from deepparse.drain.masks_application import MaskApplier
+from deepparse.evaluation.preprocess_bench import run_preprocess_benchmark, two_stage_preprocess
+from deepparse.masks_types import Mask
+from deepparse.tokenize import TokenClassCache, preprocess_line
+from deepparse.utils.regex_library import REGEX_CLASSES, classify_token, fast_classify_token
+
+TRICKY = [
+    "<*>", "(TRACE", "INFO", "-3.5", "42", "0x1F", "0xZZ", "10.0.0.1", "999.1.1.1", "/var/log",
+    "2024-01-01T00:00:00", "123e4567-e89b-12d3-a456-426614174000", "<NUMBER>", "x", "/",
+] + [cls._sample_text() for cls in REGEX_CLASSES]
+
+
+def test_fast_classifier_matches_reference_including_sample_quirk():
+    for token in TRICKY:
+        assert fast_classify_token(token) == classify_token(token), token
+
+
+def test_fused_preprocessing_matches_two_stage_on_random_lines():
+    rng = random.Random(11)
+    separators = [" ", "  ", "\t", "　", "\x1c"]
+    masks = [
+        Mask(label="IP", pattern=r"\d+\.\d+\.\d+\.\d+", justification=""),
+        Mask(label="NUM", pattern=r"\b\d+\b", justification=""),
+        Mask(label="SPAN", pattern=r"user \w+", justification=""),
+    ]
+    applier = MaskApplier(masks)
+    for _ in range(500):
+        words = [rng.choice(TRICKY + ["user", "alice", "12", "a1"]) for _ in range(rng.randint(0, 8))]
+        line = "".join(word + rng.choice(separators) for word in words)
+        assert preprocess_line(line, applier) == two_stage_preprocess(line, applier), repr(line)
+
+
+def test_token_class_cache_is_bounded():
+    cache = TokenClassCache(max_size=4)
+    assert cache.mask_all(["a", "1", "b", "c", "d", "2"]) == ["a", "<NUMBER>", "b", "c", "d", "<NUMBER>"]
+    assert len(cache) <= 4
+
+
+def test_preprocess_benchmark_reports_identical_output():
+    logs = [f"job {i} from 10.0.0.{i % 7} took {i % 13} ms" for i in range(200)]
+    result = run_preprocess_benchmark("Mini", logs, [], repeats=1)
+    assert result.identical and result.n_logs == 200 and result.fused_seconds > 0
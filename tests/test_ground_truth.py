@@ -0,0 +1,83 @@
+import csv
+import random
+
+import pytest
+
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.evaluation.eval_runner import EvaluationRunner, load_masks
+from deepparse.ground_truth import load_ground_truth
+from deepparse.metrics import (
+    grouping_accuracy,
+    normalize_template,
+    parsing_accuracy,
+    partition_grouping_accuracy,
+)
+from deepparse.synthetic_corpus import CorpusSpec, generate_corpus
+
+
+def _brute_force_ga(true, pred):
+    correct = 0
+    for i in range(len(true)):
+        same_true = {j for j in range(len(true)) if true[j] == true[i]}
+        same_pred = {j for j in range(len(pred)) if pred[j] == pred[i]}
+        correct += same_true == same_pred
+    return correct / len(true)
+
+
+def test_partition_ga_matches_definition_and_ignores_label_names():
+    rng = random.Random(5)
+    for _ in range(20):
+        true = [rng.randrange(4) for _ in range(30)]
+        pred = [f"t{label}" if rng.random() < 0.8 else f"x{rng.randrange(3)}" for label in true]
+        assert partition_grouping_accuracy(true, pred) == pytest.approx(_brute_force_ga(true, pred))
+    assert partition_grouping_accuracy(["E1", "E1", "E2"], ["a", "a", "b"]) == 1.0
+    assert grouping_accuracy(["E1", "E1", "E2"], ["a", "a", "b"]) == 0.0  # naive GA needs equal ids
+
+
+def test_loader_interns_event_ids_and_finds_loghub_names(tmp_path):
+    root = generate_corpus(CorpusSpec(name="Syn", lines=300, templates=8, seed=2), tmp_path)
+    labels = load_ground_truth(root, "Syn")
+    with (root / "Syn_structured.csv").open() as fh:
+        rows = list(csv.DictReader(fh))
+    assert labels.codes.typecode == "i" and len(labels) == 300
+    assert [labels.event_ids[code] for code in labels.codes] == [row["EventId"] for row in rows]
+    assert list(labels.line_templates()) == [row["EventTemplate"] for row in rows]
+    assert labels.line_templates()[:2] == [rows[0]["EventTemplate"], rows[1]["EventTemplate"]]
+
+    (root / "Syn_structured.csv").rename(root / "Syn_2k.log_structured.csv")
+    (root / "Syn_templates.csv").rename(root / "Syn_2k.log_templates.csv")
+    assert list(load_ground_truth(root, "Syn").codes) == list(labels.codes)
+    assert load_ground_truth(tmp_path, "Missing") is None
+
+
+@pytest.mark.parametrize("cache", [False, True])
+def test_evaluate_dataset_scores_against_loghub_labels(tmp_path, cache):
+    generate_corpus(CorpusSpec(name="Syn", lines=400, templates=10, seed=4), tmp_path / "data")
+    base = tmp_path / "base.yaml"
+    lines = [f"{key}: {tmp_path / key}" for key in ("dataset_dir", "mask_dir", "output_dir", "log_dir")]
+    lines[0] = f"dataset_dir: {tmp_path / 'data'}"
+    if cache:
+        lines.append(f"cache_dir: {tmp_path / 'cache'}")
+    base.write_text("\n".join(lines + ["seed: 1", "load_workers: 2"]) + "\n")
+    config = tmp_path / "eval.yaml"
+    config.write_text(f"base_config: {base}\ndatasets:\n  - Syn\noutput_csv: {tmp_path / 'metrics.csv'}\n")
+
+    runner = EvaluationRunner(config)
+    row = runner.run()[0]
+    labels = load_ground_truth(tmp_path / "data" / "Syn", "Syn")
+    engine = DrainEngine(masks=load_masks(tmp_path / "mask_dir" / "Syn.json"))
+    predicted = engine.parse(runner.catalog.load("Syn").logs)
+    assert row["GA"] == partition_grouping_accuracy(labels.codes, predicted)
+    truth = [normalize_template(template) for template in labels.line_templates()]
+    assert row["PA"] == parsing_accuracy(truth, [normalize_template(template) for template in predicted])
+
+
+def test_correct_parse_scores_pa_against_loghub_labels(tmp_path):
+    root = generate_corpus(CorpusSpec(name="Syn", lines=400, templates=10, seed=4), tmp_path)
+    labels = load_ground_truth(root, "Syn")
+    logs = (root / "raw.log").read_text(encoding="utf-8").splitlines()
+    predicted = DrainEngine().parse(logs)
+    assert parsing_accuracy(labels.line_templates(), predicted) == 0.0  # raw strings never agree
+    truth = [normalize_template(template) for template in labels.line_templates()]
+    assert parsing_accuracy(truth, [normalize_template(template) for template in predicted]) > 0.5
+    assert normalize_template("get  blk_<*> from <IPV4>:<*> <NUMBER>") == "get <*> from <*> <*>"
@@ -0,0 +1,68 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from deepparse.masks_types import Mask
+from deepparse.synth.selection import score_bundle, select_bundle
+from deepparse.utils.sampling import deterministic_sample, held_out_sample
+
+LOGS = [f"user u{i % 4} read block {i * 7} from 10.0.{i % 3}.{i} in {i % 5} ms" for i in range(60)]
+NUMBERS = [Mask("NUM", r"\b\d+\b", "numbers")]
+USERS = [Mask("USER", r"u\d", "users")] + NUMBERS
+
+
+def test_held_out_sample_is_deterministic_and_disjoint():
+    seen = deterministic_sample(LOGS, 10)
+    held_out = held_out_sample(LOGS, 10, exclude=seen)
+    assert held_out == held_out_sample(list(reversed(LOGS)), 10, exclude=seen)
+    assert len(held_out) == 10 and not set(held_out) & set(seen)
+
+
+def test_score_bundle_reports_templates_and_coverage():
+    none = score_bundle(0, [], LOGS, repeats=1)
+    masked = score_bundle(1, USERS, LOGS, repeats=1)
+    assert none.coverage == 0.0 and masked.coverage == 1.0
+    assert masked.templates < none.templates and masked.lines_per_second > 0
+
+
+def test_select_bundle_prefers_fewer_templates_and_skips_invalid():
+    candidates = [[], [Mask("BAD", "(", "")], NUMBERS, USERS]
+    sample = held_out_sample(LOGS, 30)
+    serial, scores = select_bundle(candidates, sample)
+    parallel, _ = select_bundle(candidates, sample, workers=2)
+    assert serial == parallel == USERS
+    assert sorted(score.candidate for score in scores) == [0, 2, 3]
+
+
+def test_select_bundle_from_concurrent_threads_uses_each_callers_sample():
+    other = [f"job {name} failed" for name in ("alpha", "beta", "gamma", "delta")] * 10
+    bundles = [[], NUMBERS, USERS]
+    expected = {
+        id(sample): [score_bundle(i, masks, sample, repeats=1).templates for i, masks in enumerate(bundles)]
+        for sample in (LOGS, other)
+    }
+
+    def run(sample):
+        _, scores = select_bundle(bundles, sample, repeats=1)
+        return [score.templates for score in sorted(scores, key=lambda score: score.candidate)]
+
+    samples = [LOGS, other] * 8
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            assert list(pool.map(run, samples)) == [expected[id(sample)] for sample in samples]
+    finally:
+        sys.setswitchinterval(interval)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        parallel, _ = pool.submit(select_bundle, bundles, LOGS, workers=2, repeats=1).result()
+    assert parallel == USERS
+
+
+def test_catch_all_bundle_loses_despite_fewer_templates():
+    catch_all = [Mask("ANY", r"\S+", "everything")]
+    numbers = score_bundle(0, NUMBERS, LOGS, repeats=1)
+    catch_all_score = score_bundle(1, catch_all, LOGS, repeats=1)
+    assert catch_all_score.templates < numbers.templates and catch_all_score.masked_share == 1.0
+    assert catch_all_score.over_generalised and not numbers.over_generalised
+    selected, _ = select_bundle([catch_all, NUMBERS, [Mask("WORD", r"\w+", "words")]], LOGS, repeats=1)
+    assert selected == NUMBERS
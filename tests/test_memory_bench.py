@@ -0,0 +1,24 @@
+import json
+
+from deepparse.evaluation.memory_bench import STAGES, run_memory_benchmark
+from deepparse.evaluation.tables import build_tables
+from deepparse.io_paths import build_paths
+
+
+def test_memory_benchmark_reports_every_stage_and_builds_table(tmp_path):
+    paths = build_paths(tmp_path / "data", tmp_path / "masks", tmp_path / "out", tmp_path / "logs")
+    (paths.dataset_dir / "Mini").mkdir()
+    lines = [f"worker {i % 5} finished job {i} in {i % 7} ms" for i in range(50)]
+    (paths.dataset_dir / "Mini" / "raw.log").write_text("\n".join(lines), encoding="utf-8")
+    mask_path = paths.mask_dir / "Mini.json"
+    mask_path.write_text(json.dumps([{"label": "NUMBER", "pattern": r"\d+", "justification": ""}]))
+
+    output_csv = paths.output_dir / "memory.csv"
+    results = run_memory_benchmark("Mini", paths, mask_path, [10, 50], output_csv)
+    assert [(r.n_logs, r.stage) for r in results] == [(n, s) for n in (10, 50) for s in STAGES]
+    cluster_rows = [r for r in results if r.stage == "cluster"]
+    assert all(r.clusters >= 1 and r.bytes_per_cluster > 0 for r in cluster_rows)
+    assert all(r.peak_bytes >= 0 for r in results)
+
+    build_tables([output_csv], tmp_path / "tables")
+    assert (tmp_path / "tables" / "table_III.tex").exists()
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.evaluation.eval_runner import (
+    EvaluationRunner,
+    _ground_truth_templates,
+    load_masks,
+)
+from deepparse.metrics import (
+    OnlineAccuracy,
+    grouping_accuracy,
+    parsing_accuracy,
+    partition_grouping_accuracy,
+    template_group_ids,
+)
+from deepparse.synthetic_corpus import CorpusSpec, generate_corpus
+
+
+def test_running_metrics_match_batch_on_every_prefix():
+    rng = random.Random(11)
+    true = [rng.randrange(6) for _ in range(300)]
+    pred = [f"t{label}" if rng.random() < 0.7 else f"t{rng.randrange(8)}" for label in true]
+    names = [f"t{label}" for label in true]
+    online = OnlineAccuracy()
+    exact = OnlineAccuracy("exact")
+    for n, (label, template) in enumerate(zip(true, pred), start=1):
+        online.add(label, template, f"t{label}")
+        exact.add(f"t{label}", template)
+        if n % 17 == 0 or n == len(true):
+            assert online.GA == partition_grouping_accuracy(true[:n], pred[:n])
+            assert online.PA == exact.PA == parsing_accuracy(names[:n], pred[:n])
+            assert exact.GA == grouping_accuracy(names[:n], pred[:n])
+    assert online.groups == 6 and online.lines == 300
+
+
+def test_counts_score_like_repeated_lines():
+    weighted, expanded = OnlineAccuracy(), OnlineAccuracy()
+    for truth, predicted, count in [("a", "x", 3), ("b", "x", 1), ("c", "y", 2), ("a", "x", 2)]:
+        weighted.add(truth, predicted, count=count)
+        for _ in range(count):
+            expanded.add(truth, predicted)
+    assert weighted.result() == expanded.result() == {"GA": 2 / 8, "PA": 0.0, "lines": 8}
+    with pytest.raises(ValueError):
+        OnlineAccuracy("fuzzy")
+
+
+def test_runner_without_labels_matches_batch_metrics(tmp_path):
+    root = generate_corpus(CorpusSpec(name="Syn", lines=300, templates=6, seed=8), tmp_path / "data")
+    for path in root.glob("*_structured.csv"):
+        path.unlink()
+    base = tmp_path / "base.yaml"
+    keys = ("dataset_dir", "mask_dir", "output_dir", "log_dir")
+    lines = [f"{key}: {tmp_path / key}" for key in keys]
+    lines[0] = f"dataset_dir: {tmp_path / 'data'}"
+    base.write_text("\n".join(lines + ["seed: 1", "eval_progress_every: 100"]) + "\n")
+    config = tmp_path / "eval.yaml"
+    config.write_text(f"base_config: {base}\ndatasets:\n  - Syn\noutput_csv: {tmp_path / 'metrics.csv'}\n")
+
+    runner = EvaluationRunner(config)
+    row = runner.evaluate_dataset("Syn")
+    dataset = runner.catalog.load("Syn")
+    predicted = DrainEngine(masks=load_masks(tmp_path / "mask_dir" / "Syn.json")).parse(dataset.logs)
+    truth = _ground_truth_templates(dataset)
+    assert row["GA"] == grouping_accuracy(template_group_ids(truth), template_group_ids(predicted))
+    assert row["PA"] == parsing_accuracy(truth, predicted)
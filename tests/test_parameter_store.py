@@ -0,0 +1,38 @@
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.drain.masks_application import MaskApplier
+from deepparse.extraction import ParameterExtractor, ParameterStore, extract_parameters
+from deepparse.masks_types import Mask
+
+MASKS = [
+    Mask("TIMESTAMP", r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", "timestamps"),
+    Mask("NUMBER", r"-?\d+(?:\.\d+)?", "numbers"),
+]
+
+
+def test_extractor_recovers_masked_and_generalised_values():
+    extractor = ParameterExtractor(MaskApplier(MASKS))
+    template = ["<*>", "<*>", "node<*>", "took", "<*>ms"]
+    values = extractor.extract("2024-01-01 10:00:00 alice node7 took 12ms", template)
+    assert [(v.value, v.value_class) for v in values] == [
+        ("2024-01-01 10:00:00", "TIMESTAMP"),
+        ("alice", None),
+        ("7", "NUMBER"),
+        ("12", "NUMBER"),
+    ]
+    assert extractor.extract("completely different", template) is None
+
+
+def test_columns_are_typed_and_dictionary_encoded(tmp_path):
+    users = ["alice", "bob", "carol"]
+    lines = [f"read {i * 10} bytes from disk by {users[i % 3]} in {i}.5 s" for i in range(6)]
+    store = extract_parameters(lines, DrainEngine(masks=MASKS), tmp_path / "params")
+    reopened = ParameterStore.open(tmp_path / "params")
+    (template_id,) = reopened.template_ids()
+    assert reopened.template(template_id) == "read <*> bytes from disk by <*> in <*> s"
+    assert list(reopened.rows(template_id)) == list(range(6))
+    kinds = [column["kind"] for column in reopened.columns(template_id)]
+    assert kinds == ["int64", "dict", "float64"]
+    assert list(reopened.column(template_id, 0)) == [0, 10, 20, 30, 40, 50]
+    assert reopened.column(template_id, 1) == users * 2
+    assert list(reopened.column(template_id, 2)) == [0.5, 1.5, 2.5, 3.5, 4.5, 5.5]
+    assert store.unaligned == 0
@@ -0,0 +1,31 @@
+import pytest
+
+from deepparse.synth.prompt_packing import TRUNCATION_MARK, approx_token_count, line_signature, pack_prompt
+from deepparse.synth.prompt_templates import MASK_SYNTH_PROMPT
+
+
+def test_lines_sharing_a_token_class_signature_are_sent_once():
+    logs = ["conn from 10.0.0.1 port 5000", "conn from 10.0.0.7 port 443", "user alice logged in"]
+    assert line_signature(logs[0]) == line_signature(logs[1])
+    packed = pack_prompt(logs)
+    assert packed.lines == [logs[0], logs[2]]
+    assert packed.prompt == MASK_SYNTH_PROMPT.format(logs=f"{logs[0]}\n{logs[2]}")
+    assert (packed.sample_lines, packed.unique_lines, packed.truncated) == (3, 2, 0)
+    assert packed.saved_tokens == approx_token_count(logs[1])
+    assert packed.estimated_saved_seconds(2.0) == pytest.approx(2.0 * packed.saved_fraction / (1 - packed.saved_fraction))
+
+
+def test_budget_skips_lines_that_do_not_fit_and_truncates_long_ones():
+    words = lambda text: len(text.split())  # noqa: E731 - custom tokenizer stand-in
+    overhead = words(MASK_SYNTH_PROMPT.format(logs=""))
+    long_line = "payload " + "x" * 500
+    logs = ["alpha beta gamma delta epsilon", long_line, "short"]
+    packed = pack_prompt(logs, token_budget=overhead + 8, max_line_chars=40, count_tokens=words)
+    assert packed.lines == ["alpha beta gamma delta epsilon", "short"]
+    assert packed.prompt_tokens <= overhead + 8 and packed.truncated == 1
+
+    wide = pack_prompt(logs, token_budget=overhead + 20, max_line_chars=40, count_tokens=words)
+    assert wide.lines == [logs[0], long_line[:40] + TRUNCATION_MARK, "short"]
+    assert pack_prompt(["a b c d e f"], token_budget=1, count_tokens=words).lines == ["a b c d e f"]
+    with pytest.raises(ValueError):
+        pack_prompt(logs, token_budget=0)
@@ -0,0 +1,51 @@
+import re
+
+import pytest
+
+from deepparse.drain.masks_application import MaskApplier
+from deepparse.evaluation.regex_bench import run_regex_benchmark
+from deepparse.masks_types import Mask
+from deepparse.utils import regex_backend
+from deepparse.utils.regex_backend import STDLIB, RegexBackend, get_backend
+
+MASKS = [
+    Mask("NUMBER", r"\b\d+\b", "numbers"),
+    Mask("REPEAT", r"(\w+) \1", "doubled words need a backreference"),
+    Mask("USER", r"(?<=user=)\w+", "lookbehind"),
+]
+LINES = ["job 42 done done by user=alice", "retry 7 of 9 for user=bob", "no numbers here"]
+
+
+def _linear_only(pattern):
+    # Stand-in for RE2: refuses backreferences and lookaround.
+    if re.search(r"\\\d|\(\?<?[=!]", pattern):
+        raise ValueError(f"unsupported: {pattern}")
+    return re.compile(pattern)
+
+
+def test_unsupported_masks_fall_back_per_pattern():
+    strict = RegexBackend("linear", _linear_only, (ValueError,))
+    applier = MaskApplier(MASKS, strict)
+    assert applier.fallbacks == ["REPEAT", "USER"]
+    assert [applier.apply(line) for line in LINES] == [MaskApplier(MASKS, STDLIB).apply(line) for line in LINES]
+    assert strict.compile(r"\d+").backend == "linear" and strict.compile(r"(a)\1").backend == "re"
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.setenv(regex_backend.BACKEND_ENV, "re")
+    assert get_backend() is STDLIB
+    with pytest.raises(ValueError):
+        get_backend("pcre")
+    if regex_backend.RE2 is None:
+        assert get_backend("auto") is STDLIB
+        with pytest.raises(ValueError):
+            get_backend("re2")
+    else:  # pragma: no cover - depends on the optional engine
+        assert get_backend("auto") is regex_backend.RE2
+
+
+def test_benchmark_reports_each_backend():
+    strict = RegexBackend("linear", _linear_only, (ValueError,))
+    rows = run_regex_benchmark("Demo", LINES * 20, MASKS, backends=[STDLIB, strict], repeats=1)
+    assert [(row.backend, row.fallbacks, row.mismatches) for row in rows] == [("re", 0, 0), ("linear", 2, 0)]
+    assert all(row.n_logs == 60 and row.lines_per_second > 0 for row in rows)
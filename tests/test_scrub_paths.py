@@ -0,0 +1,54 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[1] / "anonymization" / "scrub_paths.py"
+spec = importlib.util.spec_from_file_location("scrub_paths", SCRIPT)
+scrub_paths = importlib.util.module_from_spec(spec)
+sys.modules["scrub_paths"] = scrub_paths  # worker processes unpickle functions by module name
+spec.loader.exec_module(scrub_paths)
+
+
+def _corpus(tmp_path, lines=400):
+    rows = [
+        f"req {i} from user{i % 7}@corp.example opened /home/user{i % 5}/data_{i % 3}.csv hostname=node{i % 4}"
+        for i in range(lines)
+    ]
+    path = tmp_path / "input.log"
+    path.write_text("\n".join(rows) + "\r\nlast line with ünïcode /srv/x", encoding="utf-8")
+    return path
+
+
+def test_chunked_parallel_scrub_matches_whole_file(tmp_path):
+    source = _corpus(tmp_path)
+    text = source.read_bytes().decode("utf-8")
+    chunks = list(scrub_paths.iter_chunks(source, chunk_size=333))
+    assert len(chunks) > 10 and all(chunk.endswith(b"\n") for chunk in chunks[:-1])
+
+    out = tmp_path / "out.log"
+    report = scrub_paths.scrub_file(source, out, workers=2, chunk_size=333)
+    assert out.read_bytes().decode("utf-8") == scrub_paths.scrub(text)
+    assert report.bytes_in == len(text.encode("utf-8")) and report.chunks == len(chunks)
+    assert report.lines == text.count("\n")
+
+
+def test_keyed_pseudonyms_are_consistent_across_chunks_and_workers(tmp_path):
+    source = _corpus(tmp_path)
+    mapping = {}
+    key = b"secret"
+    serial = tmp_path / "serial.log"
+    parallel = tmp_path / "parallel.log"
+    scrub_paths.scrub_file(source, serial, scrub_paths.Scrubber(key), chunk_size=1 << 20)
+    report = scrub_paths.scrub_file(
+        source, parallel, scrub_paths.Scrubber(key), workers=2, chunk_size=256, mapping=mapping
+    )
+
+    scrubbed = parallel.read_text(encoding="utf-8")
+    assert scrubbed == serial.read_text(encoding="utf-8")
+    assert "corp.example" not in scrubbed and "/home/" not in scrubbed and "node1" not in scrubbed
+    first, second = scrubbed.splitlines()[0], scrubbed.splitlines()[7]
+    assert first.split()[3] == second.split()[3]  # same email -> same token
+    assert mapping[first.split()[3].split("@")[0]] == "user0@corp.example"
+    assert report.mapping_size == len(mapping) == 7 + 15 + 1 + 4
+    other = scrub_paths.Scrubber(b"other key").scrub("user0@corp.example")
+    assert other != first.split()[3]
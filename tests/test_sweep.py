@@ -0,0 +1,22 @@
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.evaluation.sweep import preprocess_corpus, run_sweep
+from deepparse.masks_types import Mask
+
+MASKS = [Mask(label="NUMBER", pattern=r"\d+", justification="numbers")]
+LOGS = [f"conn {i} from host{i % 4} state {'ok' if i % 3 else 'fail'} code {i * 7}" for i in range(40)]
+
+
+def test_preprocessed_corpus_matches_full_pipeline():
+    corpus = preprocess_corpus(LOGS, MASKS)
+    engine = DrainEngine(depth=3, similarity_threshold=0.5)
+    assert engine.parse_tokens(corpus) == DrainEngine(depth=3, similarity_threshold=0.5, masks=MASKS).parse(LOGS)
+
+
+def test_parallel_sweep_matches_serial():
+    corpus = preprocess_corpus(LOGS, MASKS)
+    truth = [" ".join(tokens) for tokens in corpus]
+    serial = run_sweep(corpus, truth, depths=[2, 4], thresholds=[0.5, 0.9])
+    parallel = run_sweep(corpus, truth, depths=[2, 4], thresholds=[0.5, 0.9], workers=2)
+    assert len(serial) == 4
+    strip = [(r.depth, r.similarity_threshold, r.GA, r.PA, r.templates) for r in serial]
+    assert strip == [(r.depth, r.similarity_threshold, r.GA, r.PA, r.templates) for r in parallel]
@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from deepparse.dataset_loader import Dataset
+from deepparse.synth.http_backend import (
+    HttpSynthClient,
+    HttpSynthConfig,
+    SynthHTTPError,
+    synthesize_many_http,
+)
+from deepparse.synth.llm_adapter import synthesize_masks
+
+MASKS = [{"label": "NUMBER", "pattern": r"\d+", "justification": "numbers"}]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802 - http.server API
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            server.peers.add(self.client_address)
+            server.prompts.append(body["messages"][0]["content"])
+            fail = server.failures > 0
+            server.failures -= 1 if fail else 0
+        time.sleep(server.delay)
+        if fail:
+            payload, status = b"busy", 503
+        else:
+            bundles = server.candidates[: body.get("n", 1)]
+            assert body["messages"][0]["content"].startswith("You are DeepParse")
+            choices = [{"message": {"content": "Here are the masks:\n" + json.dumps(b)}} for b in bundles]
+            payload, status = json.dumps({"choices": choices}).encode(), 200
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.lock = threading.Lock()
+    server.requests, server.failures, server.delay, server.peers = 0, 0, 0.0, set()
+    server.prompts = []
+    server.candidates = [MASKS]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **kwargs):
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    return HttpSynthClient(HttpSynthConfig(endpoint=endpoint, timeout=5, **kwargs), sleep=lambda _: None)
+
+
+def test_http_backend_reuses_connections_and_caches(stub_server, tmp_path):
+    samples = [(f"D{i}", [f"job {i} done"]) for i in range(3)]
+    with _client(stub_server, concurrency=1, cache_dir=tmp_path) as client:
+        masks = synthesize_many_http(samples, client)
+        assert {name: [m.pattern for m in found] for name, found in masks.items()} == {
+            name: [r"\d+"] for name, _ in samples
+        }
+        assert client.pool.created == 1 and len(stub_server.peers) == 1
+        synthesize_many_http(samples, client)
+        assert client.cache_hits == 3 and stub_server.requests == 3
+    with _client(stub_server, cache_dir=tmp_path) as fresh:
+        synthesize_many_http(samples, fresh)
+        assert fresh.requests == 0 and stub_server.requests == 3
+
+
+def test_http_backend_retries_then_gives_up(stub_server):
+    stub_server.failures = 2
+    with _client(stub_server, max_retries=2) as client:
+        assert client.complete("You are DeepParse test").startswith("Here are")
+        assert client.requests == 3
+    stub_server.failures = 5
+    with _client(stub_server, max_retries=1) as client:
+        with pytest.raises(SynthHTTPError, match="HTTP 503"):
+            client.complete("You are DeepParse other")
+
+
+def test_http_backend_runs_datasets_concurrently(stub_server):
+    stub_server.delay = 0.3
+    samples = [(f"D{i}", [f"line {i}"]) for i in range(4)]
+    with _client(stub_server, concurrency=4) as client:
+        start = time.perf_counter()
+        synthesize_many_http(samples, client)
+        elapsed = time.perf_counter() - start
+    assert stub_server.requests == 4
+    assert elapsed < 0.3 * 4 * 0.75
+
+
+def test_http_candidates_are_scored_and_best_bundle_kept(stub_server, tmp_path):
+    useless = [{"label": "NONE", "pattern": "zzz", "justification": ""}]
+    broken = [{"label": "BAD", "pattern": "(", "justification": ""}]
+    stub_server.candidates = [useless, broken, MASKS]
+    logs = [f"job {i} finished after {i * 3} ms" for i in range(40)]
+    dataset = Dataset(name="Mini", path=tmp_path, logs=logs)
+    with _client(stub_server) as client:
+        bundle = synthesize_masks(dataset, 10, tmp_path / "Mini.json", mode="http", client=client, candidates=3)
+    assert [mask.pattern for mask in bundle.masks] == [r"\d+"]
+    assert json.loads((tmp_path / "Mini.json").read_text())[0]["pattern"] == r"\d+"
+
+
+def test_http_prompt_is_packed_within_budget(stub_server):
+    logs = [f"job {i} finished after {i * 3} ms" for i in range(200)] + ["disk /dev/sda full"]
+    with _client(stub_server, prompt_tokens=80, max_line_chars=30) as client:
+        synthesize_many_http([("Mini", logs)], client)
+        assert client.prompt_tokens_saved > 1000
+    (prompt,) = stub_server.prompts
+    assert "job 0 finished after 0 ms\ndisk /dev/sda full\n" in prompt and "job 1 " not in prompt
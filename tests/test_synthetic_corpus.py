@@ -0,0 +1,44 @@
+import csv
+import json
+
+from deepparse.dataset_loader import load_dataset
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.io_paths import build_paths
+from deepparse.synthetic_corpus import CorpusSpec, generate_corpus
+
+
+def test_generated_corpus_is_deterministic_and_loghub_shaped(tmp_path):
+    spec = CorpusSpec(name="Syn", lines=500, templates=12, param_cardinality=20, seed=7)
+    root = generate_corpus(spec, tmp_path / "a")
+    again = generate_corpus(spec, tmp_path / "b")
+    assert (root / "raw.log").read_bytes() == (again / "raw.log").read_bytes()
+
+    paths = build_paths(tmp_path / "a", tmp_path / "m", tmp_path / "o", tmp_path / "l")
+    dataset = load_dataset("Syn", paths)
+    manifest = json.loads((root / "manifest.json").read_text())
+    assert manifest["logs"] == len(dataset.logs) == 500
+    assert manifest["checksum"] == dataset.checksum
+
+    with (root / "Syn_templates.csv").open() as fh:
+        templates = list(csv.DictReader(fh))
+    counts = [int(row["Occurrences"]) for row in templates]
+    assert len(templates) == 12 and sum(counts) == 500
+    assert counts[0] > counts[-1]  # Zipfian: the first rank dominates
+
+    with (root / "Syn_structured.csv").open() as fh:
+        rows = list(csv.DictReader(fh))
+    assert [row["Content"] for row in rows] == list(dataset.logs)
+    by_id = {row["EventId"]: row["EventTemplate"] for row in templates}
+    for row in rows:
+        template = row["EventTemplate"].split()
+        assert by_id[row["EventId"]] == row["EventTemplate"]
+        assert all(t == "<*>" or t == c for t, c in zip(template, row["Content"].split()))
+
+
+def test_shared_bucket_corpus_lands_in_one_drain_bucket(tmp_path):
+    spec = CorpusSpec(name="Worst", lines=200, templates=30, shared_bucket=True, seed=3)
+    root = generate_corpus(spec, tmp_path, structured=False)
+    assert not (root / "Worst_structured.csv").exists()
+    engine = DrainEngine()
+    engine.parse((root / "raw.log").read_text().splitlines())
+    assert len(engine.clusters) == 1
@@ -0,0 +1,39 @@
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.index import TemplateIndex, build_template_index
+from deepparse.index.postings import decode_postings, encode_postings
+from deepparse.masks_types import Mask
+
+
+def test_postings_roundtrip_large_gaps():
+    values = [0, 1, 127, 128, 300, 70000, 2**40]
+    assert decode_postings(encode_postings(values)) == values
+
+
+def test_index_drilldown_by_template(tmp_path):
+    raw = tmp_path / "raw.log"
+    lines = [
+        "2024-01-01 10:00:00 open file 1",
+        "",
+        "2024-01-01 10:30:00 close file 2",
+        "2024-01-01 11:05:00 open file 3",
+        "1999-12-31 23:59:59 close file 4",
+        "close file 5",
+    ]
+    raw.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    masks = [
+        Mask("TIMESTAMP", r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", "timestamps"),
+        Mask("NUMBER", r"\d+", "numbers"),
+    ]
+    build_template_index(raw, DrainEngine(masks=masks), tmp_path / "idx").close()
+
+    with TemplateIndex.open(tmp_path / "idx") as index:
+        by_template = {entry.template: entry.template_id for entry in index.templates()}
+        open_id = by_template["<*> open file <*>"]
+        assert index.entry(open_id).count == 2
+        assert index.line_numbers(open_id) == [0, 3]
+        assert index.read_lines(open_id) == [lines[0], lines[3]]
+        raw.unlink()  # hourly counts come from the index alone
+        assert index.hourly_counts(open_id) == {"2024-01-01 10:00": 1, "2024-01-01 11:00": 1}
+        close_id = by_template["<*> close file <*>"]
+        assert index.hourly_counts(close_id) == {"2024-01-01 10:00": 1, "1999-12-31 23:00": 1}
+        assert (tmp_path / "idx" / "templates.csv").read_text(encoding="utf-8").startswith("template_id")
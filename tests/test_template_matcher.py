@@ -0,0 +1,35 @@
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.drain.matcher import TemplateMatcher, match_lines
+from deepparse.masks_types import Mask
+
+MASKS = [Mask("NUMBER", r"\b\d+\b", "numbers")]
+
+
+def test_trie_prefers_literal_edges_and_backtracks_into_wildcards():
+    matcher = TemplateMatcher(
+        [["open", "<*>", "ok"], ["open", "file", "failed"], ["close", "<*>"]], template_ids=[10, 11, 12]
+    )
+    assert matcher.match_tokens(["open", "file", "ok"]) == 10  # literal "file" dead-ends, wildcard wins
+    assert matcher.match_tokens(["open", "file", "failed"]) == 11
+    assert matcher.match_tokens(["close", "x"]) == 12
+    assert matcher.match_tokens(["close", "x", "y"]) is None
+    assert matcher.match_tokens(["open", "dir", "failed"]) is None
+    assert matcher.template(10) == "open <*> ok"
+
+
+def test_frozen_engine_templates_match_in_parallel():
+    train = [f"session {i} opened for user u{i % 3} on port {i}" for i in range(30)]
+    train += [f"disk sd{i % 2} at {i} percent" for i in range(30)]
+    engine = DrainEngine(masks=MASKS)
+    engine.parse(train)
+    matcher = TemplateMatcher.from_engine(engine)
+    assert len(matcher) == engine.cluster_count
+
+    lines = [f"session {i} opened for user u{i % 3} on port {i}" for i in range(100, 400)]
+    lines += ["completely new event"] * 100
+    serial, report = match_lines(matcher, lines)
+    parallel, parallel_report = match_lines(matcher, lines, workers=2, chunk_size=64)
+    assert serial == parallel and report == parallel_report
+    assert report.unmatched == 100 and report.unmatched_fraction == 0.25
+    expected = engine.add_log(lines[0]).cluster_id
+    assert set(report.counts) == {expected}
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.drain.stats import SpaceSaving, WindowedTemplateStats, line_clock, line_timestamp
+from deepparse.masks_types import Mask
+
+MASKS = [Mask("NUMBER", r"\b\d+\b", "numbers")]
+
+
+def _skewed_stream(n, distinct, seed=7):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** 1.2 for rank in range(distinct)]
+    return rng.choices(range(distinct), weights=weights, k=n)
+
+
+def test_exact_counts_until_budget_then_bounded_sketch():
+    stream = _skewed_stream(20000, 2000)
+    truth = {}
+    for key in stream:
+        truth[key] = truth.get(key, 0) + 1
+    exact = WindowedTemplateStats(window_seconds=60, exact_budget=5000)
+    sketched = WindowedTemplateStats(window_seconds=60, exact_budget=50, sketch_width=512)
+    for key in stream:
+        exact.record(key, timestamp=0)
+        sketched.record(key, timestamp=0)
+
+    assert exact.is_exact() and not sketched.is_exact()
+    expected = sorted(truth.items(), key=lambda item: (-item[1], item[0]))[:10]
+    assert exact.top_k(10) == expected
+    window = sketched._windows[0]
+    assert len(window.top.counts) == 50 and len(window.top._heap) <= 4 * 50
+    assert [key for key, _ in sketched.top_k(5)] == [key for key, _ in expected[:5]]
+    for key, count in truth.items():
+        assert sketched.count(key) >= count  # estimates never undercount
+    assert sketched.total() == exact.total() == len(stream)
+
+
+def test_space_saving_error_bound():
+    summary = SpaceSaving(3)
+    for key in [1, 1, 1, 2, 2, 3, 4, 4, 4, 4]:
+        summary.add(key)
+    assert len(summary.counts) == 3
+    for key, count in summary.counts.items():
+        assert count - summary.errors[key] <= [1, 1, 1, 2, 2, 3, 4, 4, 4, 4].count(key) <= count
+
+
+def test_windows_rates_and_spikes():
+    stats = WindowedTemplateStats(window_seconds=10, max_windows=3)
+    for second in range(30):
+        stats.record(1, timestamp=second)
+        if second >= 20:
+            stats.record(2, count=5, timestamp=second)
+    stats.record(3, timestamp=-100)  # older than any retained window
+    stats.record(1, count=10, timestamp=45)
+    stats.record(4, count=10, timestamp=46)
+
+    assert stats.windows() == [10.0, 20.0, 40.0]
+    assert stats.count(1, last=2) == 20 and stats.count(3) == 0
+    assert stats.rate(2, last=2).per_second == pytest.approx(50 / 20)
+    assert stats.spikes(factor=3.0, min_count=5) == [(4, 10, 0.0)]
+    assert stats.spikes(factor=3.0, min_count=11) == []
+    with pytest.raises(ValueError):
+        WindowedTemplateStats(window_seconds=0)
+
+
+def test_engine_records_cluster_counts_by_timestamp():
+    stats = WindowedTemplateStats(window_seconds=3600)
+    engine = DrainEngine(masks=MASKS, stats=stats)
+    lines = [
+        "2024-03-01 10:00:05 job 1 done",
+        "2024-03-01 10:59:59 job 2 done",
+        "2024-03-01 11:00:00 disk 3 full",
+    ]
+    ids = [engine.add_log(line, timestamp=line_timestamp(line)).cluster_id for line in lines]
+    engine.add_log("2024-03-01 11:30:00 job 4 done", count=4, timestamp=line_timestamp("2024-03-01 11:30:00"))
+
+    assert line_timestamp("no clock here") is None
+    assert len(stats.windows()) == 2
+    assert stats.top_k(1) == [(ids[0], 6)]
+    assert stats.top_k(2, last=1) == [(ids[0], 4), (ids[2], 1)]
+
+
+def test_late_lines_fill_free_windows_and_clock_is_never_mixed():
+    stats = WindowedTemplateStats(window_seconds=10, max_windows=3)
+    stats.record(1, timestamp=15)
+    stats.record(1, timestamp=5)
+    assert stats.total() == 2 and stats.windows() == [0.0, 10.0]
+
+    lines = ["boot", "2024-03-01 10:00:05 up", "tick", "2024-03-01 10:00:09 up"]
+    start = line_timestamp(lines[1])
+    assert list(line_clock(lines)) == [start, start, start, start + 4]
+    assert list(line_clock(["a", "b"])) == [0.0, 1.0]
+
+
+def test_merge_folds_counts_in_exact_and_sketched_windows():
+    for budget in (100, 3):
+        stats = WindowedTemplateStats(window_seconds=60, exact_budget=budget)
+        for key in range(8):
+            stats.record(key, count=key + 1, timestamp=0)
+        stats.merge(7, 0)
+        assert stats.total() == 36 and stats.count(0) >= 9
+        assert stats.top_k(1) == [(0, stats.count(0))]
+    assert stats.is_exact() is False
@@ -0,0 +1,56 @@
+import re
+from pathlib import Path
+
+from deepparse import token_cache
+from deepparse.dataset_loader import Dataset
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.evaluation.eval_runner import _ground_truth_templates
+from deepparse.masks_types import Mask
+from deepparse.token_cache import TokenStreamCache
+from deepparse.utils.regex_backend import RegexBackend
+
+MASKS = [Mask(label="NUMBER", pattern=r"\d+", justification="numbers")]
+LOGS = ["job 1 started on 10.0.0.1", "job 2 finished in 0.5s", "job 3 started on 10.0.0.7"]
+
+
+def test_stream_matches_engine_preprocessing(tmp_path):
+    dataset = Dataset(name="Tiny", path=Path("."), logs=LOGS)
+    cache = TokenStreamCache(tmp_path)
+    stream = cache.load(dataset, MASKS)
+    engine = DrainEngine(masks=MASKS)
+    assert list(stream) == [tuple(engine.preprocess(line)) for line in LOGS]
+    assert DrainEngine().parse_tokens(stream) == DrainEngine(masks=MASKS).parse(LOGS)
+    truth = cache.load(dataset, [])
+    assert truth.joined() == _ground_truth_templates(dataset)
+    assert cache.path_for(dataset, MASKS) != cache.path_for(dataset, [])
+    stream.close()
+    truth.close()
+
+
+def test_second_load_reuses_cache(tmp_path, monkeypatch):
+    dataset = Dataset(name="Tiny", path=Path("."), logs=LOGS)
+    TokenStreamCache(tmp_path).load(dataset, MASKS).close()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("cache should not be rebuilt")
+
+    monkeypatch.setattr(token_cache, "_write_stream", fail)
+    stream = TokenStreamCache(tmp_path).load(dataset, MASKS)
+    assert len(stream) == 3
+    assert stream[-1][0] == "job"
+    stream.close()
+
+
+def test_entries_are_keyed_by_regex_backend(tmp_path, monkeypatch):
+    dataset = Dataset(name="Tiny", path=Path("."), logs=LOGS)
+    cache = TokenStreamCache(tmp_path)
+    stream = cache.load(dataset, MASKS)
+    assert stream.meta["regex_backend"] == "re"
+    stream.close()
+    re_path = cache.path_for(dataset, MASKS)
+
+    monkeypatch.setattr(token_cache, "get_backend", lambda: RegexBackend("re2", re.compile))
+    assert cache.path_for(dataset, MASKS) != re_path
+    stream = cache.load(dataset, MASKS)
+    assert stream.meta["regex_backend"] == "re2" and stream.root != re_path
+    stream.close()
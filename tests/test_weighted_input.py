@@ -0,0 +1,57 @@
+import itertools
+
+import pytest
+
+from deepparse.dataset_loader import load_weighted_dataset, parse_counted_lines
+from deepparse.drain.drain_engine import DrainEngine
+from deepparse.io_paths import build_paths
+from deepparse.masks_types import Mask
+from deepparse.metrics import grouping_accuracy, parsing_accuracy
+
+MASKS = [Mask("NUMBER", r"\b\d+\b", "numbers")]
+
+
+def _clusters(engine):
+    return sorted((c.template_str(), c.size) for bucket in engine.clusters.values() for c in bucket)
+
+
+def test_weighted_parse_matches_expanded_parse():
+    lines = [f"job {i % 4} done by worker w{i % 3} status {'ok' if i % 5 else 'failed'}" for i in range(40)]
+    pairs = [(1 + i % 7, line) for i, line in enumerate(lines)]
+    expanded = [line for count, line in pairs for _ in range(count)]
+
+    weighted = DrainEngine(masks=MASKS, max_clusters=3, eviction_policy="lfu")
+    weighted_templates = weighted.parse_weighted(pairs)
+    plain = DrainEngine(masks=MASKS, max_clusters=3, eviction_policy="lfu")
+    plain_templates = plain.parse(expanded)
+
+    assert _clusters(weighted) == _clusters(plain)
+    assert weighted.eviction_stats.to_dict() == plain.eviction_stats.to_dict()
+    repeated = list(itertools.chain.from_iterable([t] * c for (c, _), t in zip(pairs, weighted_templates)))
+    assert repeated == plain_templates
+    with pytest.raises(ValueError):
+        weighted.add_log("job 1 done", count=0)
+
+
+def test_weighted_metrics_equal_expanded_metrics():
+    true, pred, counts = ["a", "b", "c"], ["a", "x", "c"], [5, 3, 2]
+    expand = lambda values: [v for v, c in zip(values, counts) for _ in range(c)]  # noqa: E731
+    assert grouping_accuracy(true, pred, counts) == grouping_accuracy(expand(true), expand(pred)) == 0.7
+    assert parsing_accuracy(true, pred, counts) == parsing_accuracy(expand(true), expand(pred))
+    with pytest.raises(ValueError):
+        parsing_accuracy(true, pred, [1])
+
+
+def test_uniq_c_records_load_as_weighted_dataset(tmp_path):
+    assert parse_counted_lines(["   12 open  file", "3\tclose file", "", "0 skipped"]) == (
+        [12, 3],
+        ["open  file", "close file"],
+    )
+    with pytest.raises(ValueError, match="Line 1"):
+        parse_counted_lines(["no count here"])
+
+    paths = build_paths(tmp_path / "data", tmp_path / "m", tmp_path / "o", tmp_path / "l")
+    (paths.dataset_dir / "Agg").mkdir()
+    (paths.dataset_dir / "Agg" / "counts.log").write_text("      4 a b\n      2 a c\n", encoding="utf-8")
+    dataset = load_weighted_dataset("Agg", paths)
+    assert dataset.total == 6 and dataset.expanded() == ["a b"] * 4 + ["a c"] * 2